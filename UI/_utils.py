@@ -4,5 +4,7 @@ import enum
 class StatusbarVariants(str, enum.Enum):
     need_config: str = 'Ожидает загрузки конфигурации'
     config_loading: str = 'Загрузка конфигурации...'
+    config_loading_progress: str = 'Загрузка конфигурации: группа {} из {}'
     config_loaded: str = 'Конфигурация загружена'
-    config_loading_error: str = 'Ошибка загрузки конфигурации'
\ No newline at end of file
+    config_loading_error: str = 'Ошибка загрузки конфигурации'
+    config_loading_queued: str = 'Конфигурация {} будет загружена после текущей'
\ No newline at end of file
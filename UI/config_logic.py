@@ -1,10 +1,9 @@
-from typing import Optional
+from typing import Any, Optional
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QAbstractItemModel, QModelIndex, QThread, Signal
 from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox
 
 from UI._utils import StatusbarVariants
-from cache.configInfo import Ui_configInfo
 from cache.config import Ui_Config
 from cache.configAbout import Ui_configAbout
 from datatype import ParserConfig, PropertyGroup
@@ -22,9 +21,33 @@ def colorize_sources(source: str):
     return source
 
 
+class ConfigLoader(QThread):
+    """Загружает конфигурацию в отдельном потоке и сообщает о ходе загрузки сигналами."""
+
+    progress = Signal(int, int)
+    loaded = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+
+    def run(self) -> None:
+        try:
+            config = ParserConfig.load(self.file_path, progress=self.progress.emit)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.loaded.emit(config)
+
+
 class ConfigLogic(QWidget):
+    config_loaded = Signal(object)
+
     about: Optional["ConfigAbout"] = None
     config: Optional[ParserConfig] = None
+    loader: Optional[ConfigLoader] = None
+    queued_path: Optional[str] = None
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -34,6 +57,8 @@ class ConfigLogic(QWidget):
 
         self.config = None
         self.about = None
+        self.loader = None
+        self.queued_path = None
 
         self.ui.selectFile.clicked.connect(self.select_file)
 
@@ -70,7 +95,20 @@ class ConfigLogic(QWidget):
                 self.load_from_file(file_path)
 
     def load_from_file(self, file_path: str):
+        """
+        Запускает загрузку конфигурации в отдельном потоке, окно при этом не блокируется.
+
+        Загрузку нельзя прервать, поэтому файл, выбранный во время загрузки, запоминается
+        (более ранний выбор заменяется) и загружается после неё, а результат текущей загрузки
+        отбрасывается как устаревший.
+        """
+        if self.loader is not None and self.loader.isRunning():
+            self.queued_path = file_path
+            self.parent().setStatusTip(StatusbarVariants.config_loading_queued.value.format(file_path))
+            return
+
         self.parent().setStatusTip(StatusbarVariants.config_loading)
+        self.ui.selectFile.setEnabled(False)
 
         del self.config
         self.config = None
@@ -79,14 +117,40 @@ class ConfigLogic(QWidget):
             self.about.close()
         del self.about
         self.about = None
-        try:
-            self.config = ParserConfig.load(file_path)
-        except Exception as e:
-            self.parent().setStatusTip(StatusbarVariants.config_loading_error)
-            QMessageBox.critical(self, 'Ошибка', f'Произошла ошибка при загрузке конфигурации:\n{e}')
+
+        self.loader = ConfigLoader(file_path, self)
+        self.loader.progress.connect(self._on_progress)
+        self.loader.loaded.connect(self._on_loaded)
+        self.loader.failed.connect(self._on_failed)
+        self.loader.start()
+
+    def _on_progress(self, done: int, total: int):
+        if self.queued_path is None:
+            self.parent().setStatusTip(StatusbarVariants.config_loading_progress.value.format(done, total))
+
+    def _load_queued(self) -> bool:
+        """Запускает загрузку файла, выбранного во время предыдущей загрузки, если он есть."""
+        if self.queued_path is None:
+            return False
+        file_path, self.queued_path = self.queued_path, None
+        # Сигнал завершения приходит до окончания run(), поэтому ждём остановки потока
+        self.loader.wait()
+        self.load_from_file(file_path)
+        return True
+
+    def _on_failed(self, error: str):
+        if self._load_queued():
             return
+        self.ui.selectFile.setEnabled(True)
+        self.parent().setStatusTip(StatusbarVariants.config_loading_error)
+        QMessageBox.critical(self, 'Ошибка', f'Произошла ошибка при загрузке конфигурации:\n{error}')
 
-        self.ui.fileInputLine.setText(file_path)
+    def _on_loaded(self, config: ParserConfig):
+        if self._load_queued():
+            return
+        self.ui.selectFile.setEnabled(True)
+        self.config = config
+        self.ui.fileInputLine.setText(self.loader.file_path)
 
         self.about = ConfigAbout()
         self.about.ui.title.setText(self.config.title)
@@ -95,18 +159,22 @@ class ConfigLogic(QWidget):
 
         self.about.ui.soursesNames.setText('; '.join(map(colorize_sources, self.config.accepted_sources)))
 
-        for prop_group in self.config.property_groups:
-            self.about.ui.scrollAreaWidgetContents.layout().addWidget(ConfigGroupInfo(prop_group))
+        # Свойства групп подгружаются в дерево по мере раскрытия
+        self.about.model = ConfigGroupsModel(self.config.property_groups, self.about)
+        self.about.ui.groupsView.setModel(self.about.model)
 
         # Добавляем логику конфига
         config_layout = self.ui.fileDataContents.layout()
         config_layout.addWidget(self.about)
 
         self.parent().setStatusTip(StatusbarVariants.config_loaded)
+        self.config_loaded.emit(self.config)
 
 
 
 class ConfigAbout(QWidget):
+    model: Optional["ConfigGroupsModel"] = None
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -114,20 +182,79 @@ class ConfigAbout(QWidget):
         self.ui.setupUi(self)
 
 
-class ConfigGroupInfo(QWidget):
-    def __init__(self, prop_group: PropertyGroup, parent=None):
-        super().__init__(parent)
+class ConfigGroupsModel(QAbstractItemModel):
+    """
+    Дерево групп свойств с ленивой подгрузкой.
 
-        self.ui = Ui_configInfo()
-        self.ui.setupUi(self)
-
-        self.prop_group = prop_group
-
-        self.ui.Name.setTitle(prop_group.name)
+    Верхний уровень - группы, дочерние строки - свойства группы. Свойства добавляются
+    в модель только при раскрытии группы и пакетами по ``batch_size``, поэтому большая
+    конфигурация не создаёт ни виджетов, ни строк, пока их не просматривают.
+    """
 
-        for prop in prop_group.properties:
-            self.ui.Fields.addItem(prop.name)
+    COLUMNS = ['Название', 'Тип', 'Сигнатур']
 
-        # self.resize(QSize(200, 300))
-        # self.sizePolicy().setHorizontalPolicy(QSizePolicy.Policy.Fixed)
-        # self.ui.Name.sizePolicy().setHorizontalPolicy(QSizePolicy.Policy.Fixed)
+    def __init__(self, groups: list[PropertyGroup], parent=None, batch_size: int = 100):
+        super().__init__(parent)
+        self._groups = groups
+        self._fetched = [0] * len(groups)
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _is_group(index: QModelIndex) -> bool:
+        # internalId: 0 - строка группы, n + 1 - свойство группы n
+        return index.isValid() and index.internalId() == 0
+
+    def index(self, row: int, column: int, parent: QModelIndex = QModelIndex()) -> QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if parent.isValid():
+            return self.createIndex(row, column, parent.row() + 1)
+        return self.createIndex(row, column, 0)
+
+    def parent(self, index: QModelIndex) -> QModelIndex:
+        if not index.isValid() or index.internalId() == 0:
+            return QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, 0)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._groups)
+        if self._is_group(parent) and parent.column() == 0:
+            return self._fetched[parent.row()]
+        return 0
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.COLUMNS)
+
+    def hasChildren(self, parent: QModelIndex = QModelIndex()) -> bool:
+        if not parent.isValid():
+            return bool(self._groups)
+        return self._is_group(parent) and parent.column() == 0 and bool(self._groups[parent.row()].properties)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        return self._is_group(parent) and self._fetched[parent.row()] < len(self._groups[parent.row()].properties)
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        if not self.canFetchMore(parent):
+            return
+        row = parent.row()
+        first = self._fetched[row]
+        count = min(self.batch_size, len(self._groups[row].properties) - first)
+        self.beginInsertRows(parent, first, first + count - 1)
+        self._fetched[row] += count
+        self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if self._is_group(index):
+            group = self._groups[index.row()]
+            return (group.name, '', len(group.properties))[index.column()]
+        prop = self._groups[index.internalId() - 1].properties[index.row()]
+        signatures = len(prop.signatures) + len(prop.paths) + len(prop.selectors)
+        return (prop.name, prop.type.title if prop.type else '', signatures)[index.column()]
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
@@ -3,12 +3,14 @@ import sys
 from PySide6.QtWidgets import QApplication, QMainWindow
 
 from UI.export_logic import ExportLogic
+from UI.parse_logic import ParseLogic
 from cache.mainwindow import Ui_MainWindow
 from config_logic import ConfigLogic
 
 
 class MainWindow(QMainWindow):
     config_logic: ConfigLogic
+    parse_logic: ParseLogic
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -25,8 +27,25 @@ class MainWindow(QMainWindow):
         export_layout = self.ui.output_area.layout()
         export_layout.addWidget(self.export_logic)
 
+        # Добавляем парсинг и таблицу результатов
+        self.parse_logic = ParseLogic(self.config_logic, self)
+        parsing_layout = self.ui.Parsing.layout()
+        parsing_layout.addWidget(self.parse_logic)
+        # Браузер запускается в фоне сразу после загрузки конфигурации
+        self.config_logic.config_loaded.connect(self.parse_logic.prewarm)
+
         self.setWindowTitle("Веб-парсер")
 
+    def closeEvent(self, event):
+        """
+        Останавливает поток парсинга перед закрытием окна. Пока браузер закрывается,
+        окно остаётся отзывчивым и закрывается по завершении потока.
+        """
+        if self.parse_logic.shutdown(self.close):
+            event.ignore()
+            return
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,300 @@
+import asyncio
+import threading
+from typing import Any, Callable, Optional
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QThread, QTimer, Signal
+from PySide6.QtWidgets import QWidget, QHeaderView, QMessageBox
+
+from UI._utils import StatusbarVariants
+from cache.parseLogic import Ui_ParseLogic
+from datatype import ParserConfig, ParseResult
+
+
+class ParseWorker(QThread):
+    """
+    Поток с собственным циклом событий asyncio, в котором работают WebPageParser и браузер.
+
+    Окно не блокируется на время навигации: задачи передаются в цикл через
+    :meth:`submit`, результаты возвращаются сигналами (доставляются в поток окна очередью Qt).
+    """
+
+    result_ready = Signal(object)
+    failed = Signal(str)
+    pending_changed = Signal(int)
+
+    config: ParserConfig
+
+    def __init__(self, config: ParserConfig, parent=None):
+        super().__init__(parent)
+        self.config = config
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._parser = None
+        self._started = threading.Event()
+        self._pending = 0
+
+    def run(self) -> None:
+        from parser.get_page import PageExtractor
+
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._create_parser()
+        self._started.set()
+        try:
+            self._loop.run_forever()
+            if PageExtractor._instance is not None:
+                self._loop.run_until_complete(PageExtractor.close())
+        finally:
+            self._loop.close()
+
+    def _create_parser(self) -> None:
+        from parser import WebPageParser
+
+        self._parser = WebPageParser(config=self.config)
+
+    def set_config(self, config: ParserConfig) -> None:
+        """
+        Меняет конфигурацию без перезапуска потока и браузера. Запросы в работе
+        завершаются со старой конфигурацией.
+
+        :param config: Новая конфигурация.
+        """
+        self.config = config
+        if self._loop is not None and self.isRunning():
+            self._loop.call_soon_threadsafe(self._create_parser)
+
+    def _ensure_running(self) -> None:
+        if not self.isRunning():
+            self.start()
+        self._started.wait()
+
+    def submit(self, url: str) -> None:
+        """
+        Ставит URL в очередь на парсинг. Вызывается из потока окна.
+
+        :param url: URL товара.
+        """
+        self._ensure_running()
+        asyncio.run_coroutine_threadsafe(self._parse(url), self._loop)
+
+    def prewarm(self) -> None:
+        """Запускает поток и браузер заранее, чтобы первый URL не ждал запуска Chromium."""
+        from parser.get_page import PageExtractor
+
+        self._ensure_running()
+        self._loop.call_soon_threadsafe(PageExtractor.prewarm)
+
+    async def _parse(self, url: str) -> None:
+        self._pending += 1
+        self.pending_changed.emit(self._pending)
+        try:
+            result = await self._parser.parse(url)
+            if result.properties:
+                self.result_ready.emit(result)
+            else:
+                self.failed.emit(url)
+        finally:
+            self._pending -= 1
+            self.pending_changed.emit(self._pending)
+
+    def stop(self) -> None:
+        """
+        Останавливает цикл событий; браузер закрывается в рабочем потоке. Не блокирует окно:
+        о завершении сообщает сигнал ``finished``.
+        """
+        if self._loop is not None and self.isRunning():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Модель таблицы результатов парсинга.
+
+    Результаты накапливаются и вставляются пакетами не чаще раза в ``flush_interval`` мс
+    (один beginInsertRows на пакет), поэтому представление не перерисовывается на каждую
+    строку и остаётся отзывчивым на десятках тысяч строк. Столбцы свойств добавляются
+    по мере появления новых свойств.
+    """
+
+    FIXED_COLUMNS = ['Источник', 'Группа', 'Заполнено']
+
+    def __init__(self, parent=None, flush_interval: int = 100):
+        super().__init__(parent)
+        self._rows: list[tuple[ParseResult, dict[str, Any]]] = []
+        self._columns: list[str] = []
+        self._column_index: dict[str, int] = {}
+        self._pending: list[ParseResult] = []
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_interval)
+        self._timer.timeout.connect(self.flush)
+
+    def add_result(self, result: ParseResult) -> None:
+        """Добавляет результат в очередь на вставку."""
+        self._pending.append(result)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Вставляет накопленные результаты одним пакетом."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+
+        new_columns = []
+        for result in pending:
+            for prop in result.properties:
+                if prop.name not in self._column_index and prop.name not in new_columns:
+                    new_columns.append(prop.name)
+        if new_columns:
+            first = len(self.FIXED_COLUMNS) + len(self._columns)
+            self.beginInsertColumns(QModelIndex(), first, first + len(new_columns) - 1)
+            for name in new_columns:
+                self._column_index[name] = len(self._columns)
+                self._columns.append(name)
+            self.endInsertColumns()
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+        self._rows.extend((result, {prop.name: prop.value for prop in result.properties}) for result in pending)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._rows.clear()
+        self._pending.clear()
+        self._columns.clear()
+        self._column_index.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.FIXED_COLUMNS) + len(self._columns)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        result, values = self._rows[index.row()]
+        column = index.column()
+
+        if column == 0:
+            value = result.source
+        elif column == 1:
+            value = result.name
+        elif column == 2:
+            value = f'{result.rate:.0%}'
+        else:
+            value = values.get(self._columns[column - len(self.FIXED_COLUMNS)])
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return '' if value is None else str(value)
+        if role == Qt.ItemDataRole.TextAlignmentRole and isinstance(value, (int, float)):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if role == Qt.ItemDataRole.ToolTipRole and column == 0:
+            return value
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Vertical:
+            return section + 1
+        if section < len(self.FIXED_COLUMNS):
+            return self.FIXED_COLUMNS[section]
+        return self._columns[section - len(self.FIXED_COLUMNS)]
+
+
+class ParseLogic(QWidget):
+    worker: Optional[ParseWorker] = None
+
+    def __init__(self, config_logic, parent=None):
+        super().__init__(parent)
+
+        self.ui = Ui_ParseLogic()
+        self.ui.setupUi(self)
+
+        self.config_logic = config_logic
+        self.worker = None
+        self._stopping: Optional[ParseWorker] = None
+        self.failed = 0
+
+        self.model = ResultsTableModel(self)
+        self.ui.resultsView.setModel(self.model)
+        # Фиксированная высота строк: представлению не нужно измерять каждую строку
+        vertical_header = self.ui.resultsView.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(vertical_header.minimumSectionSize())
+        self.ui.resultsView.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+
+        self.ui.parseButton.clicked.connect(self.parse_input)
+        self.ui.urlInput.returnPressed.connect(self.parse_input)
+        self.ui.clearButton.clicked.connect(self.clear)
+
+    def _worker(self) -> Optional[ParseWorker]:
+        """Возвращает рабочий поток, передавая ему текущую конфигурацию при её смене."""
+        config = self.config_logic.config
+        if config is None:
+            return None
+        if self.worker is not None and self.worker.config is not config:
+            self.worker.set_config(config)
+        if self.worker is None:
+            self.worker = ParseWorker(config, self)
+            self.worker.result_ready.connect(self.model.add_result)
+            self.worker.failed.connect(self._on_failed)
+            self.worker.pending_changed.connect(self._on_pending_changed)
+        return self.worker
+
+    def parse_input(self) -> None:
+        urls = self.ui.urlInput.text().split()
+        if not urls:
+            return
+        worker = self._worker()
+        if worker is None:
+            QMessageBox.warning(self, 'Парсинг', StatusbarVariants.need_config.value)
+            return
+        for url in urls:
+            worker.submit(url)
+        self.ui.urlInput.clear()
+
+    def clear(self) -> None:
+        self.model.clear()
+        self.failed = 0
+        self._on_pending_changed(0)
+
+    def _on_failed(self, url: str) -> None:
+        self.failed += 1
+
+    def _on_pending_changed(self, pending: int) -> None:
+        if pending:
+            self.ui.progressLabel.setText(
+                f'В очереди: {pending}, получено: {self.model.rowCount()}, ошибок: {self.failed}'
+            )
+        else:
+            self.ui.progressLabel.setText(f'Получено: {self.model.rowCount()}, ошибок: {self.failed}')
+
+    def prewarm(self, config: Optional[ParserConfig] = None) -> None:
+        """Запускает браузер в фоне после загрузки конфигурации."""
+        worker = self._worker()
+        if worker is not None:
+            worker.prewarm()
+
+    def shutdown(self, finished: Optional[Callable[[], None]] = None) -> bool:
+        """
+        Останавливает рабочий поток (при закрытии окна), не дожидаясь закрытия браузера.
+
+        :param finished: Вызывается, когда поток завершится.
+        :return: True, если поток ещё завершается и ``finished`` будет вызван позже.
+        """
+        if self._stopping is not None and self._stopping.isRunning():
+            return True
+        worker, self.worker = self.worker, None
+        if worker is None or not worker.isRunning():
+            return False
+        # Ссылка на поток хранится до его завершения
+        self._stopping = worker
+        if finished is not None:
+            worker.finished.connect(finished)
+        worker.stop()
+        return True
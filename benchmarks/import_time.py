@@ -0,0 +1,94 @@
+"""
+Проверка времени импорта пакетов и отсутствия тяжёлых зависимостей при импорте.
+
+Каждый модуль импортируется в отдельном процессе с ``-X importtime``. Проверка
+не проходит, если суммарное время импорта модуля превышает бюджет или если при
+импорте загружается модуль из списка отложенных (playwright, pyperclip, xlwings и т.п.).
+
+Пример::
+
+    python -m benchmarks.import_time --budget 150
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которые должны импортироваться лениво, при первом использовании
+DEFERRED = ['playwright', 'pyperclip', 'xlwings', 'pythoncom', 'win32com', 'pandas', 'openpyxl', 'PySide6',
+            'http.server', 'psutil']
+
+DEFAULT_MODULES = ['datatype', 'metrics', 'storage', 'excel', 'parser']
+
+_PROBE = """
+import sys
+import {module}
+print(sorted(name for name in sys.modules if name.split('.')[0] in {roots!r} or name in {deferred!r}))
+"""
+
+
+def measure(module: str, deferred: list[str] = DEFERRED) -> dict:
+    """
+    Замеряет импорт модуля в отдельном процессе.
+
+    :param module: Имя модуля.
+    :param deferred: Модули, которые не должны загружаться при импорте.
+    :return: Словарь: время импорта, мс; самые медленные вложенные импорты; загруженные отложенные модули.
+    """
+    roots = sorted({name.split('.')[0] for name in deferred})
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module, roots=roots, deferred=deferred)],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {'module': module, 'error': completed.stderr.strip().splitlines()[-1]}
+
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        timings.append((name.strip(), int(cumulative) / 1000))
+
+    loaded = json.loads(completed.stdout.strip().splitlines()[-1].replace("'", '"'))
+    total = next((ms for name, ms in reversed(timings) if name == module), 0.)
+    return {
+        'module': module,
+        'ms': total,
+        'slowest': sorted(timings, key=lambda item: item[1], reverse=True)[1:6],
+        'deferred_loaded': [name for name in loaded if name in deferred or name.split('.')[0] in deferred],
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Время импорта пакетов')
+    arg_parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    arg_parser.add_argument('--budget', type=float, default=150., help='Бюджет времени импорта модуля, мс')
+    args = arg_parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        report = measure(module)
+        if 'error' in report:
+            print(f'{module:<12} ошибка импорта: {report["error"]}')
+            failed = True
+            continue
+
+        over_budget = report['ms'] > args.budget
+        status = 'ПРЕВЫШЕН БЮДЖЕТ' if over_budget else 'ok'
+        print(f'{module:<12} {report["ms"]:8.1f} мс  {status}')
+        for name, ms in report['slowest']:
+            print(f'    {name:<40} {ms:8.1f} мс')
+        if report['deferred_loaded']:
+            print(f'    загружены при импорте: {", ".join(report["deferred_loaded"])}')
+        failed |= over_budget or bool(report['deferred_loaded'])
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+Нагрузочный тест PageExtractor + WebPageParser против локальной имитации маркетплейса.
+
+Запускает benchmarks.marketplace в отдельном процессе, разбирает заданное количество
+страниц с указанной параллельностью и выводит страниц/с, задержки p50/p99 и RSS
+(процесс парсера вместе с браузером).
+
+Для сравнения холодного и тёплого запуска тест запускается дважды с одним и тем же
+``--profile-dir`` (или ``--storage-state``): в отчёте указывается профиль (cold/warm),
+доля капч и задержки.
+
+С ``--trace trace.json`` записывается трасса по каждому URL в формате Chrome trace-event
+(открывается в https://ui.perfetto.dev): видно очередь, навигацию, капчи и простои.
+
+Пример::
+
+    python -m benchmarks.loadtest --pages 200 --concurrency 8 --latency 0.3 --captcha-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import socket
+import statistics
+import sys
+import time
+from typing import Optional, TYPE_CHECKING
+
+import psutil
+
+from benchmarks.marketplace import create_app, product_url
+from benchmarks.run import CONFIG_PATH
+from datatype import ParserConfig
+
+if TYPE_CHECKING:
+    from parser.get_page import BrowserSettings
+
+logger = logging.getLogger(__name__)
+
+
+def _serve(port: int, options: dict) -> None:
+    from aiohttp import web
+
+    web.run_app(create_app(**options), host='127.0.0.1', port=port, print=None, handle_signals=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_port(port: int, timeout: float = 10.) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=.2).close()
+            return
+        except OSError:
+            time.sleep(.1)
+    raise TimeoutError(f'Имитация маркетплейса не запустилась на порту {port}')
+
+
+def rss() -> int:
+    """Суммарный RSS процесса и всех дочерних (браузер), байт."""
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+async def drive(base: str, pages: int, concurrency: int, governor: bool,
+                browser_settings: Optional["BrowserSettings"] = None, rss_interval: float = .5) -> dict:
+    """
+    Разбирает ``pages`` страниц с параллельностью ``concurrency``.
+
+    RSS замеряется отдельной задачей раз в ``rss_interval`` секунд в потоке, чтобы обход
+    дерева процессов не задерживал цикл событий и не искажал задержки.
+
+    :return: Отчёт с производительностью, задержками и потреблением памяти.
+    """
+    from parser import WebPageParser
+    from parser.get_page import PageExtractor
+    from parser.get_page._governor import GovernorSettings
+
+    # Без регулятора: постоянные пределы, AIMD не снижает их при ошибках, капчах и замедлениях
+    settings = GovernorSettings() if governor else GovernorSettings(
+        initial_concurrency=concurrency, max_concurrency=concurrency, initial_rate=1e6, max_rate=1e6, burst=1e6,
+        decrease_factor=1., target_latency=float('inf')
+    )
+    launch_started = time.perf_counter()
+    extractor = await PageExtractor.init(governor_settings=settings, browser_settings=browser_settings)
+    launch = time.perf_counter() - launch_started
+    profile = extractor.profile
+    parser = WebPageParser(config=ParserConfig.load(CONFIG_PATH))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    empty = 0
+    peak_rss = rss()
+
+    async def sample_rss() -> None:
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, await asyncio.to_thread(rss))
+            await asyncio.sleep(rss_interval)
+
+    async def one(product_id: int) -> None:
+        nonlocal empty
+        async with semaphore:
+            started = time.perf_counter()
+            result = await parser.parse(product_url(product_id, base))
+            latencies.append(time.perf_counter() - started)
+            empty += not result.source
+
+    sampler = asyncio.create_task(sample_rss())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(product_id) for product_id in range(1, pages + 1)))
+    finally:
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        peak_rss = max(peak_rss, await asyncio.to_thread(rss))
+        governors = PageExtractor.governor_stats()
+        sessions = extractor.sessions
+        await PageExtractor.close()
+
+    requests = sum(g['requests'] for g in governors)
+    # Неудачные запросы: ответы 429/5xx, исключения и капчи (по итогам запросов в регуляторе)
+    failures = sum(g['errors'] + g['challenges'] for g in governors)
+    return {
+        'profile': profile,
+        'browser_launch': launch,
+        'browser_sessions': sessions,
+        'captcha_rate': sum(g['challenges'] for g in governors) / requests if requests else 0.,
+        'pages': pages,
+        'concurrency': concurrency,
+        'failures': failures,
+        'failure_rate': failures / requests if requests else 0.,
+        'empty_results': empty,
+        'elapsed': elapsed,
+        'pages_per_sec': pages / elapsed,
+        'p50': statistics.median(latencies),
+        'p99': percentile(latencies, .99),
+        'peak_rss_mb': peak_rss / 2 ** 20,
+        'governors': governors,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Нагрузочный тест парсера')
+    arg_parser.add_argument('--pages', type=int, default=100)
+    arg_parser.add_argument('--concurrency', type=int, default=4)
+    arg_parser.add_argument('--governor', action='store_true', help='Включить регулятор нагрузки на хост')
+    arg_parser.add_argument('--latency', type=float, default=.2)
+    arg_parser.add_argument('--jitter', type=float, default=.5)
+    arg_parser.add_argument('--error-rate', type=float, default=0.)
+    arg_parser.add_argument('--captcha-rate', type=float, default=0.)
+    arg_parser.add_argument('--captcha-solve', type=float, default=3.)
+    arg_parser.add_argument('--page-size', type=int, default=1_500_000)
+    arg_parser.add_argument('--headless', action='store_true', help='Запускать браузер без окна')
+    arg_parser.add_argument('--profile-dir', help='Каталог постоянного профиля браузера')
+    arg_parser.add_argument('--storage-state', help='Файл сохранённого состояния браузера')
+    arg_parser.add_argument('--recycle-pages', type=int, help='Пересоздавать контекст после N страниц')
+    arg_parser.add_argument('--recycle-rss-mb', type=float, help='Перезапускать браузер при превышении RSS, МБ')
+    arg_parser.add_argument('--json', metavar='PATH', help='Сохранить отчёт в JSON')
+    arg_parser.add_argument('--trace', metavar='PATH', help='Сохранить трассу по URL (Chrome trace-event)')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for name in ('parser', 'datatype'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, daemon=True, args=(port, {
+        'latency': args.latency, 'jitter': args.jitter, 'error_rate': args.error_rate,
+        'captcha_rate': args.captcha_rate, 'captcha_solve': args.captcha_solve, 'page_size': args.page_size,
+    }))
+    server.start()
+    try:
+        _wait_port(port)
+        from parser.get_page import BrowserSettings
+        from metrics import TRACER
+
+        if args.trace:
+            TRACER.enable()
+
+        browser_settings = BrowserSettings(args.headless, args.profile_dir, args.storage_state,
+                                           args.recycle_pages, args.recycle_rss_mb)
+        report = asyncio.run(drive(f'http://127.0.0.1:{port}', args.pages, args.concurrency, args.governor,
+                                   browser_settings))
+    finally:
+        server.terminate()
+        if args.trace:
+            TRACER.dump_json(args.trace)
+
+    logger.info('Страниц: %s (неудачных запросов %s, %.1f%%; пустых результатов %s), параллельность %s',
+                report['pages'], report['failures'], report['failure_rate'] * 100, report['empty_results'],
+                report['concurrency'])
+    logger.info('Профиль браузера: %s, запуск %.2f с, доля капч %.1f%%', report['profile'],
+                report['browser_launch'], report['captcha_rate'] * 100)
+    logger.info('Производительность: %.2f страниц/с', report['pages_per_sec'])
+    logger.info('Задержка: p50 %.3f с, p99 %.3f с', report['p50'], report['p99'])
+    logger.info('Пиковый RSS (с браузером): %.0f МБ, сессий браузера: %s', report['peak_rss_mb'],
+                report['browser_sessions'])
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
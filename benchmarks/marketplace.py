@@ -0,0 +1,194 @@
+"""
+Локальная имитация маркетплейса для нагрузочных тестов.
+
+Генерирует страницы товаров в формате Яндекс Маркета (document.title, JSON-состояние
+в <noframes> и <script>) заданного размера, с настраиваемой задержкой, долей ошибок
+и страницей капчи «Вы не робот?». Страница товара запрашивает те же данные из
+``/api/product/<id>``, как это делает клиентский код маркетплейса.
+
+Пример::
+
+    python -m benchmarks.marketplace --port 8800 --latency 0.3 --error-rate 0.02 --captcha-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+from functools import lru_cache
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+_BRANDS = {
+    'AMD': ['Ryzen 5 7600X', 'Ryzen 7 7800X3D', 'Ryzen 9 7900X', 'Ryzen 5 5600', 'Ryzen 7 5700X'],
+    'Intel': ['Core i3-12100F', 'Core i5-13400F', 'Core i7-14700K', 'Core i9-14900K', 'Pentium G4400'],
+}
+_SOCKETS = {'AMD': ['AM4', 'AM5'], 'Intel': ['LGA1200', 'LGA1700']}
+
+
+def _spec(rnd: random.Random, name: str, value: str) -> dict:
+    return {
+        'value': value,
+        'transition': {'params': {'hid': '91019', 'glfilter': f'{rnd.randint(10 ** 6, 10 ** 7)}:{rnd.randint(1, 99)}'},
+                       'type': 'catalog'},
+        'name': name,
+    }
+
+
+def product_url(product_id: int, base: str = '') -> str:
+    """URL страницы товара с заданным идентификатором."""
+    return f'{base}/product--cpu-{product_id}/{product_id}'
+
+
+def _product_state(rnd: random.Random, product_id: int) -> tuple[str, int, dict]:
+    """Генерирует заголовок, цену и JSON-состояние карточки товара."""
+    brand = rnd.choice(list(_BRANDS))
+    model = rnd.choice(_BRANDS[brand])
+    title = f'{brand} {model}, {rnd.choice(["BOX", "OEM"])}'
+    cores = rnd.choice([4, 6, 8, 12, 16])
+    price = rnd.randint(50, 900) * 100
+
+    state = {
+        'widgets': {'@card/ProductCard': {'product': {
+            'id': product_id,
+            'brand': brand,
+            'title': title,
+            'offers': [
+                {'price': {'value': price + i * 350, 'currency': 'RUR'}, 'type': 'withoutDiscount',
+                 'discountPercent': rnd.randint(0, 30), 'shop': {'name': f'Магазин {i}'}}
+                for i in range(rnd.randint(3, 20))
+            ],
+            'specs': {'groups': [
+                {'name': 'Общие', 'items': [
+                    _spec(rnd, 'Сокет', rnd.choice(_SOCKETS[brand])),
+                    _spec(rnd, 'Тип памяти', rnd.choice(['DDR4', 'DDR5', 'DDR4, DDR5'])),
+                    _spec(rnd, 'Техпроцесс', f'{rnd.choice([5, 7, 10, 14])} нм'),
+                    _spec(rnd, 'Частота', f'{rnd.randint(25, 45) * 100} МГц'),
+                    _spec(rnd, 'Тепловыделение', f'{rnd.choice([35, 58, 65, 105, 125, 170])} Вт'),
+                ]},
+                {'name': 'Ядро', 'items': [
+                    {'name': 'Ядро процессора'},
+                    {'value': f'{cores} шт.', 'name': 'Количество ядер'},
+                    {'name': 'Количество потоков', 'value': str(cores * 2)},
+                ]},
+            ]},
+        }}},
+    }
+    return title, price, state
+
+
+def product_api(product_id: int) -> dict:
+    """Ответ API карточки товара: то же состояние, что и в разметке страницы."""
+    return _product_state(random.Random(product_id), product_id)[2]
+
+
+def product_page(product_id: int, page_size: int = 1_500_000) -> str:
+    """
+    Генерирует страницу товара. Одинаковый идентификатор даёт одинаковую страницу.
+
+    :param product_id: Идентификатор товара.
+    :param page_size: Примерный размер страницы, символов.
+    :return: HTML страницы.
+    """
+    rnd = random.Random(product_id)
+    title, price, state = _product_state(rnd, product_id)
+    blob = json.dumps(state, ensure_ascii=False, separators=(',', ':'))
+
+    # Отзывы и аналитика составляют основную массу реальной страницы
+    reviews = []
+    filler_size = max(page_size - 2 * len(blob), 0)
+    while filler_size > 0:
+        review = json.dumps({'author': f'user{rnd.randint(1, 10 ** 6)}', 'grade': rnd.randint(1, 5),
+                             'text': 'Отличный процессор, рекомендую. ' * rnd.randint(5, 40)},
+                            ensure_ascii=False, separators=(',', ':'))
+        reviews.append(review)
+        filler_size -= len(review)
+
+    return (
+        '<!DOCTYPE html>\n<html lang="ru"><head><meta charset="utf-8">'
+        f'<title>{title} — купить по выгодной цене на Яндекс Маркете</title>'
+        f'<script>document.title="Процессор {title} — купить по выгодной цене на Яндекс Маркете";</script>'
+        '</head><body><div id="root"><div class="product">'
+        f'<h1>Процессор {title}</h1><span class="price">{price} ₽</span></div></div>'
+        f'<noframes data-apiary="state">{blob}</noframes>'
+        f'<script type="application/json" id="apiary-state">{blob}</script>'
+        f'<script type="application/json" id="reviews">[{",".join(reviews)}]</script>'
+        f'<script>fetch("/api/product/{product_id}");</script>'
+        '</body></html>\n'
+    )
+
+
+def captcha_page(solve_after: float) -> str:
+    """
+    Страница капчи. Через ``solve_after`` секунд «решается» и переходит на страницу товара.
+    """
+    return (
+        '<!DOCTYPE html>\n<html lang="ru"><head><meta charset="utf-8"><title>Вы не робот?</title></head>'
+        '<body><h1>Вы не робот?</h1><p>Подтвердите, что запросы отправляли вы, а не робот.</p>'
+        '<script>setTimeout(function () {'
+        'var u = new URL(location.href); u.searchParams.set("solved", "1"); location.replace(u);'
+        f'}}, {int(solve_after * 1000)});</script>'
+        '</body></html>\n'
+    )
+
+
+def create_app(latency: float = .2, jitter: float = .5, error_rate: float = 0., captcha_rate: float = 0.,
+               captcha_solve: float = 3., page_size: int = 1_500_000, seed: int = 0) -> web.Application:
+    """
+    Создаёт приложение aiohttp имитации маркетплейса.
+
+    :param latency: Медианная задержка ответа, с.
+    :param jitter: Разброс задержки (сигма логнормального распределения).
+    :param error_rate: Доля ответов 503.
+    :param captcha_rate: Доля ответов со страницей капчи.
+    :param captcha_solve: Через сколько секунд капча «решается».
+    :param page_size: Примерный размер страницы товара, символов.
+    :param seed: Начальное значение генератора случайных чисел.
+    """
+    rnd = random.Random(seed)
+    render = lru_cache(maxsize=1024)(lambda product_id: product_page(product_id, page_size))
+
+    async def product(request: web.Request) -> web.Response:
+        if latency > 0:
+            await asyncio.sleep(rnd.lognormvariate(0, jitter) * latency)
+        if rnd.random() < error_rate:
+            return web.Response(status=503, text='Service Unavailable')
+        if 'solved' not in request.query and rnd.random() < captcha_rate:
+            return web.Response(text=captcha_page(captcha_solve), content_type='text/html')
+        return web.Response(text=render(int(request.match_info['product_id'])), content_type='text/html')
+
+    async def api(request: web.Request) -> web.Response:
+        if latency > 0:
+            await asyncio.sleep(rnd.lognormvariate(0, jitter) * latency / 2)
+        return web.json_response(product_api(int(request.match_info['product_id'])))
+
+    app = web.Application()
+    app.router.add_get('/product--{slug}/{product_id:\\d+}', product)
+    app.router.add_get('/product/{product_id:\\d+}', product)
+    app.router.add_get('/api/product/{product_id:\\d+}', api)
+    return app
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser(description='Имитация маркетплейса')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8800)
+    arg_parser.add_argument('--latency', type=float, default=.2)
+    arg_parser.add_argument('--jitter', type=float, default=.5)
+    arg_parser.add_argument('--error-rate', type=float, default=0.)
+    arg_parser.add_argument('--captcha-rate', type=float, default=0.)
+    arg_parser.add_argument('--captcha-solve', type=float, default=3.)
+    arg_parser.add_argument('--page-size', type=int, default=1_500_000)
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    web.run_app(
+        create_app(args.latency, args.jitter, args.error_rate, args.captcha_rate, args.captcha_solve, args.page_size),
+        host=args.host, port=args.port, print=None
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Набор бенчмарков парсера.
+
+Микробенчмарки: Property.match, PropertyGroup.pars, ParserConfig.load и декодирование DataType
+на корпусе сохранённых страниц (datatype/corpus) и тестовой конфигурации (UI/cfg.zip).
+Сквозной бенчмарк (--e2e) запускает WebPageParser.parse против локального HTTP-сервера,
+раздающего страницы корпуса (нужен Playwright).
+
+Примеры::
+
+    python -m benchmarks.run --save local
+    python -m benchmarks.run --compare local --tolerance 0.5
+
+Сравнение идёт по отношению ко времени калибровочной нагрузки (чистый Python), замеряемой
+вплотную к каждой серии: общее замедление машины (троттлинг, соседи по хосту) сокращается.
+Из серий берётся медиана отношений.
+Бенчмарк, которого нет в базовых результатах, считается ошибкой сравнения - после
+добавления бенчмарков базовые результаты нужно пересоздать (--save).
+"""
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+import timeit
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from datatype import ParserConfig, JsonPath, PageState
+from datatype._lint import CORPUS_DIR, load_corpus
+from datatype._utils import INTEGER, FLOAT, STRING
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(ROOT, 'UI', 'cfg.zip')
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+logger = logging.getLogger(__name__)
+
+
+def calibration() -> object:
+    """Калибровочная нагрузка: чистый Python без кода парсера."""
+    return sorted(str(i * 7919 % 10007) for i in range(2000))
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = .1, calibration_number: int = 20) -> dict:
+    """
+    Замеряет время одного вызова функции.
+
+    :param func: Функция без аргументов.
+    :param repeat: Количество серий.
+    :param min_time: Минимальная длительность серии, с.
+    :param calibration_number: Количество вызовов калибровочной нагрузки после каждой серии.
+    :return: Словарь со статистикой времени одного вызова, с, и медианой отношения
+        ко времени калибровочной нагрузки (``relative``).
+    """
+    timer = timeit.Timer(func)
+    calibration_timer = timeit.Timer(calibration)
+    number, spent = timer.autorange()
+    number = max(1, int(number * min_time / max(spent, 1e-9)))
+    runs = []
+    relative = []
+    for _ in range(repeat):
+        runs.append(timer.timeit(number) / number)
+        relative.append(runs[-1] / (calibration_timer.timeit(calibration_number) / calibration_number))
+    return {
+        'relative': statistics.median(relative),
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'mean': statistics.fmean(runs),
+        'stdev': statistics.stdev(runs) if len(runs) > 1 else 0.,
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def micro_benchmarks(config: ParserConfig, pages: list[tuple[str, str]]) -> dict[str, Callable[[], object]]:
+    """Формирует набор микробенчмарков."""
+    benches = {}
+    group = config.property_groups[0]
+
+    for page_name, text in pages:
+        page = page_name.removesuffix('.html')
+        for prop in group.properties:
+            benches[f'property_match/{page}/{prop.name}'] = functools.partial(prop.match, text)
+        benches[f'group_pars/{page}'] = functools.partial(group.pars, text, page)
+        # Разбор JSON-состояния и поиск по пути (новая страница на каждый вызов - без кеша)
+        benches[f'json_path/{page}'] = functools.partial(
+            lambda path, html: path.find(PageState(html)), JsonPath('**.items[name=Сокет].value'), text
+        )
+
+    benches['config_load'] = functools.partial(ParserConfig.load, CONFIG_PATH)
+
+    for data_type, samples in ((INTEGER, ['12', '4700', '45990']), (FLOAT, ['3.3', '4.70']),
+                               (STRING, ['AMD', 'Intel Core i3-12100F'])):
+        benches[f'datatype_decode/{data_type.title}'] = functools.partial(
+            lambda dt, values: [dt(v) for v in values], data_type, samples
+        )
+    return benches
+
+
+def e2e_benchmark(config: ParserConfig, pages: list[tuple[str, str]], rounds: int = 3) -> dict[str, dict]:
+    """
+    Сквозной бенчмарк WebPageParser.parse против локального сервера с корпусом.
+
+    :param config: Конфигурация парсера.
+    :param pages: Страницы корпуса.
+    :param rounds: Количество проходов по корпусу.
+    :return: Статистика времени разбора одной страницы.
+    """
+    from parser import WebPageParser
+    from parser.get_page import PageExtractor
+
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=CORPUS_DIR)
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+
+    async def run() -> list[float]:
+        parser = WebPageParser(config=config)
+        await PageExtractor.init()
+        timings = []
+        try:
+            for _ in range(rounds):
+                for page_name, _ in pages:
+                    started = time.perf_counter()
+                    await parser.parse(f'{base}/{page_name}')
+                    timings.append(time.perf_counter() - started)
+        finally:
+            await PageExtractor.close()
+        return timings
+
+    try:
+        timings = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    return {'e2e/parse': {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.,
+        'number': 1,
+        'repeat': len(timings),
+    }}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Сравнивает результаты с базовыми по отношению ко времени калибровочной нагрузки.
+
+    :return: Список описаний регрессий. Бенчмарки, отсутствующие в базовых результатах, не сравниваются.
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        # Сквозной бенчмарк не калибруется: он ограничен вводом-выводом, а не процессором
+        key = 'relative' if 'relative' in stats and 'relative' in base else 'median'
+        ratio = stats[key] / base[key] if base[key] else 1.
+        if ratio > 1 + tolerance:
+            regressions.append(f'{name}: {base["median"] * 1e6:.1f} -> {stats["median"] * 1e6:.1f} мкс (x{ratio:.2f})')
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Бенчмарки парсера')
+    arg_parser.add_argument('--filter', default='', help='Запускать только бенчмарки, содержащие строку')
+    arg_parser.add_argument('--e2e', action='store_true', help='Добавить сквозной бенчмарк (нужен Playwright)')
+    arg_parser.add_argument('--scale', type=int, default=0, help='Увеличить страницы корпуса до размера, символов')
+    arg_parser.add_argument('--save', metavar='NAME', help='Сохранить результаты как базовые')
+    arg_parser.add_argument('--compare', metavar='NAME', help='Сравнить с базовыми результатами')
+    arg_parser.add_argument('--tolerance', type=float, default=.5, help='Допустимое замедление (доля)')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    logging.getLogger('datatype').setLevel(logging.WARNING)
+
+    config = ParserConfig.load(CONFIG_PATH)
+    pages = load_corpus(CORPUS_DIR, args.scale)
+
+    results = {}
+    for name, func in micro_benchmarks(config, pages).items():
+        if args.filter in name:
+            results[name] = measure(func)
+            logger.info('%-60s %12.2f мкс', name, results[name]['median'] * 1e6)
+
+    if args.e2e and 'e2e' in f'e2e/{args.filter}':
+        results.update(e2e_benchmark(config, [(n, t) for n, t in load_corpus(CORPUS_DIR) if 'adversarial' not in n]))
+        logger.info('%-60s %12.2f мс', 'e2e/parse', results['e2e/parse']['median'] * 1e3)
+
+    if args.save:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        with open(os.path.join(BASELINES_DIR, f'{args.save}.json'), 'w', encoding='utf-8') as file:
+            json.dump({
+                'meta': {
+                    'python': sys.version.split()[0],
+                    'platform': platform.platform(),
+                    'machine': platform.machine(),
+                    'scale': args.scale,
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                },
+                'results': results,
+            }, file, ensure_ascii=False, indent=2)
+        logger.info('Базовые результаты сохранены: %s', args.save)
+
+    if args.compare:
+        with open(os.path.join(BASELINES_DIR, f'{args.compare}.json'), 'r', encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        missing = [name for name in results if name not in baseline]
+        for name in missing:
+            logger.error('Нет в базовых результатах %s: %s (пересоздайте их с --save)', args.compare, name)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            logger.warning('Регрессия: %s', regression)
+        if regressions or missing:
+            return 1
+        logger.info('Регрессий относительно %s нет.', args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
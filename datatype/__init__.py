@@ -1,4 +1,7 @@
 from ._parser_config_class import ParserConfig, PropertyGroup, Property
-from ._classes import DataType, PropertyResult, ParseResult
+from ._classes import DataType, PropertyResult, ParseResult, SignatureStats
 from ._utils import get_datatype
+from ._json_state import JsonPath, PageState
+from ._selectors import DomSelector
+from ._identity import IdentityRule, canonical_url
 
@@ -1,5 +1,6 @@
-from dataclasses import dataclass, asdict
-from typing import Any
+import json
+from dataclasses import dataclass, asdict, field
+from typing import Any, Optional
 
 from datatype._utils import DataType
 
@@ -53,6 +54,44 @@ class ParseResult:
         return sum(prop.value is not None for prop in self.properties) / len(self.properties)
 
 
+@dataclass
+class SignatureStats:
+    """
+    Статистика использования сигнатуры свойства.
+
+    :var pattern: Текст сигнатуры.
+    :var hits: Количество совпадений.
+    :var misses: Количество проверок без совпадения.
+    :var time: Суммарное время поиска, с.
+    """
+    pattern: str
+    hits: int = 0
+    misses: int = 0
+    time: float = 0.
+
+    @property
+    def calls(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.calls if self.calls else 0.
+
+    @property
+    def mean_time(self) -> float:
+        return self.time / self.calls if self.calls else 0.
+
+    def to_dict(self) -> dict:
+        return {
+            'pattern': self.pattern,
+            'hits': self.hits,
+            'misses': self.misses,
+            'time': self.time,
+            'hit_rate': self.hit_rate,
+            'mean_time': self.mean_time,
+        }
+
+
 @dataclass
 class PageResult:
     """
@@ -60,10 +99,25 @@ class PageResult:
 
     :var url: URL страницы.
     :var content: Содержимое страницы.
+    :var payloads: JSON-ответы API, перехваченные при загрузке: URL ответа -> тело.
+    :var dom: Значения DOM-селекторов, полученные в браузере: ключ селектора -> значение.
     """
     url: str
     title: str
     content: str
+    payloads: dict[str, Any] = field(default_factory=dict)
+    dom: dict[str, Optional[str]] = field(default_factory=dict)
+
+    @property
+    def payload_text(self) -> str:
+        """
+        Перехваченные ответы в виде текста (по одному JSON на строку) для поиска сигнатур.
+
+        JSON записывается без пробелов после разделителей, как в разметке страницы,
+        поэтому к ответам применимы те же сигнатуры (``"brand":"([^"]+)"``).
+        """
+        return '\n'.join(json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+                         for payload in self.payloads.values())
 
     def to_dict(self) -> dict:
         """Преобразует объект в словарь."""
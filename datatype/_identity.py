@@ -0,0 +1,77 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+@dataclass
+class IdentityRule:
+    """
+    Правило определения товара по URL для одного источника.
+
+    Товар определяется хостом, идентификатором из пути и значимыми параметрами запроса
+    (например, ``sku``). Канонический URL строится по шаблону пути, поэтому ссылки
+    с разными ЧПУ-частями на один товар совпадают, а разные SKU одного товара - нет.
+
+    :var host: Хост источника (без ``www.`` и порта).
+    :var id_pattern: Регулярное выражение с группой, выделяющее идентификатор товара из пути.
+    :var params: Параметры запроса, входящие в идентичность товара.
+    :var path: Шаблон пути канонического URL, ``{id}`` - идентификатор товара.
+    """
+    host: str
+    id_pattern: str = r'/(\d+)(?:/|$)'
+    params: list[str] = field(default_factory=lambda: ['sku'])
+    path: str = '/product/{id}'
+
+    def __post_init__(self) -> None:
+        self._id_re = re.compile(self.id_pattern)
+
+    def matches(self, host: str) -> bool:
+        return host.removeprefix('www.') == self.host
+
+    def canonical_url(self, url: str) -> Optional[str]:
+        """
+        Строит канонический URL товара.
+
+        :param url: Исходный URL.
+        :return: Канонический URL или None, если идентификатор товара в пути не найден.
+        """
+        parts = urlsplit(url)
+        match = self._id_re.search(parts.path)
+        if not match:
+            return None
+        query = sorted((k, v) for k, v in parse_qsl(parts.query) if k in self.params)
+        netloc = parts.netloc.removeprefix('www.')
+        canonical = f'{parts.scheme or "https"}://{netloc}{self.path.format(id=match.group(1))}'
+        return f'{canonical}?{urlencode(query)}' if query else canonical
+
+    @classmethod
+    def from_config(cls, config: dict) -> "IdentityRule":
+        return cls(**{k: v for k, v in config.items() if k in ('host', 'id_pattern', 'params', 'path')})
+
+    def to_config(self) -> dict:
+        return {'host': self.host, 'id_pattern': self.id_pattern, 'params': self.params, 'path': self.path}
+
+
+# Правила по умолчанию, если в конфигурации они не заданы
+DEFAULT_IDENTITY_RULES = [IdentityRule('market.yandex.ru')]
+
+
+def canonical_url(url: str, rules: list[IdentityRule]) -> str:
+    """
+    Приводит URL товара к каноническому виду по первому подходящему правилу.
+
+    Если правило для хоста не задано или идентификатор не найден, у URL отбрасываются
+    параметры запроса и фрагмент.
+
+    :param url: Исходный URL.
+    :param rules: Правила источников.
+    :return: Канонический URL.
+    """
+    host = urlsplit(url).hostname or ''
+    for rule in rules:
+        if rule.matches(host):
+            canonical = rule.canonical_url(url)
+            if canonical is not None:
+                return canonical
+    return url.split('#', maxsplit=1)[0].split('?', maxsplit=1)[0]
@@ -0,0 +1,197 @@
+import json
+import re
+import time
+from typing import Any, Iterator, Optional
+
+from metrics import METRICS
+
+# Элемент пути: **, *, "ключ", ключ, [индекс] или [поле=значение]
+_TOKEN = re.compile(r'\*\*|\*|"(?:[^"\\]|\\.)*"|[^.\[\]"]+|\[[^\]]*\]|\.')
+
+# Теги, в которых страница передаёт JSON-состояние: <noframes>{...}</noframes>, <script type="application/json">
+_OPEN_TAG = re.compile(r'<(noframes|script)\b[^>]*>')
+
+_MISSING = object()
+
+
+class JsonPath:
+    """
+    Сигнатура свойства, адресующая значение в JSON-состоянии страницы.
+
+    Синтаксис пути - элементы через точку:
+
+    - ``ключ`` или ``"ключ с .точками"`` - значение по ключу объекта;
+    - ``*`` - любой дочерний элемент;
+    - ``**`` - любой вложенный элемент на любой глубине (включая текущий);
+    - ``[0]`` - элемент списка по индексу;
+    - ``[поле=значение]`` - элементы списка (или сам объект), у которых поле равно значению.
+
+    Пример: ``**.items[name=Сокет].value``.
+
+    :var path: Текст пути.
+    :var pattern: Регулярное выражение с группой, применяемое к найденному значению (необязательно).
+    """
+
+    path: str
+    pattern: Optional[re.Pattern]
+
+    def __init__(self, path: str, pattern: Optional[str] = None) -> None:
+        self.path = path
+        self.pattern = re.compile(pattern) if pattern else None
+        self._steps = self._compile(path)
+
+    @staticmethod
+    def _compile(path: str) -> list[tuple]:
+        tokens = _TOKEN.findall(path)
+        if ''.join(tokens) != path:
+            raise ValueError(f'Некорректный путь JSON: {path!r}')
+
+        steps = []
+        for token in tokens:
+            if token == '.':
+                continue
+            if token == '**':
+                steps.append(('descend',))
+            elif token == '*':
+                steps.append(('any',))
+            elif token.startswith('"'):
+                steps.append(('key', json.loads(token)))
+            elif token.startswith('['):
+                inner = token[1:-1].strip()
+                if re.fullmatch(r'-?\d+', inner):
+                    steps.append(('index', int(inner)))
+                elif '=' in inner:
+                    key, value = inner.split('=', 1)
+                    steps.append(('filter', key.strip(), value.strip()))
+                else:
+                    raise ValueError(f'Некорректный фильтр {token!r} в пути JSON: {path!r}')
+            else:
+                steps.append(('key', token))
+        return steps
+
+    @staticmethod
+    def _descendants(node: Any) -> Iterator[Any]:
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            if isinstance(current, dict):
+                stack.extend(reversed(list(current.values())))
+            elif isinstance(current, list):
+                stack.extend(reversed(current))
+
+    @staticmethod
+    def _accepts(node: Any, key: str, value: str) -> bool:
+        return isinstance(node, dict) and key in node and str(node[key]) == value
+
+    def _walk(self, node: Any, step: int = 0) -> Iterator[Any]:
+        if step == len(self._steps):
+            yield node
+            return
+
+        kind, *args = self._steps[step]
+        if kind == 'key':
+            if isinstance(node, dict) and args[0] in node:
+                yield from self._walk(node[args[0]], step + 1)
+        elif kind == 'index':
+            if isinstance(node, list) and -len(node) <= args[0] < len(node):
+                yield from self._walk(node[args[0]], step + 1)
+        elif kind == 'any':
+            children = node.values() if isinstance(node, dict) else node if isinstance(node, list) else ()
+            for child in children:
+                yield from self._walk(child, step + 1)
+        elif kind == 'filter':
+            candidates = node if isinstance(node, list) else [node]
+            for child in candidates:
+                if self._accepts(child, *args):
+                    yield from self._walk(child, step + 1)
+        else:
+            for child in self._descendants(node):
+                yield from self._walk(child, step + 1)
+
+    def find(self, state: "PageState") -> Optional[str]:
+        """
+        Ищет первое скалярное значение по пути во всех документах состояния страницы.
+
+        :param state: Состояние страницы.
+        :return: Значение в виде строки (после применения ``pattern``) или None.
+        """
+        for document in state.documents():
+            for value in self._walk(document):
+                if value is None or isinstance(value, (dict, list)):
+                    continue
+                value = str(value).lower() if isinstance(value, bool) else str(value)
+                if self.pattern is None:
+                    return value
+                match = self.pattern.search(value)
+                if match:
+                    return match.group(1) if match.groups() else match.group(0)
+        return None
+
+    def to_config(self) -> dict:
+        res = {'path': self.path}
+        if self.pattern is not None:
+            res['pattern'] = self.pattern.pattern
+        return res
+
+    def __repr__(self) -> str:
+        return f'JsonPath({self.path!r})'
+
+
+class PageState:
+    """
+    Состояние одной страницы: перехваченные ответы API, JSON-блоки из разметки
+    и значения DOM-селекторов, полученные из браузера.
+
+    Блоки разбираются лениво и не более одного раза, поэтому один экземпляр передаётся
+    всем группам свойств страницы.
+
+    :var dom: Значения DOM-селекторов: ключ селектора -> значение.
+    """
+
+    dom: dict[str, Optional[str]]
+
+    def __init__(self, html: str, payloads: Optional[dict[str, Any]] = None,
+                 dom: Optional[dict[str, Optional[str]]] = None) -> None:
+        self.dom = dom or {}
+        self._documents: list[Any] = list((payloads or {}).values())
+        self._html = html or ''
+        self._blobs = self._iter_blobs()
+        self._seen: set[int] = set()
+
+    def _iter_blobs(self) -> Iterator[str]:
+        """Перебирает содержимое тегов, похожее на JSON (закрывающий тег ищется без регулярного выражения)."""
+        html = self._html
+        position = 0
+        while match := _OPEN_TAG.search(html, position):
+            end = html.find(f'</{match.group(1)}>', match.end())
+            if end < 0:
+                return
+            text = html[match.end():end].strip()
+            if text[:1] in ('{', '['):
+                yield text
+            position = end
+
+    def _next_document(self) -> Any:
+        for text in self._blobs:
+            key = hash(text)
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            started = time.perf_counter()
+            try:
+                document = json.loads(text)
+            except ValueError:
+                continue
+            finally:
+                METRICS.observe_stage('state_parse', time.perf_counter() - started)
+            self._documents.append(document)
+            return document
+        return _MISSING
+
+    def documents(self) -> Iterator[Any]:
+        """Перебирает документы состояния, разбирая очередной блок только при необходимости."""
+        index = 0
+        while index < len(self._documents) or self._next_document() is not _MISSING:
+            yield self._documents[index]
+            index += 1
@@ -0,0 +1,139 @@
+import logging
+import multiprocessing
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datatype._parser_config_class import ParserConfig
+
+# Встроенный корпус страниц для проверки сигнатур
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+
+_logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SignatureIssue:
+    """
+    Замечание к сигнатуре, найденное при проверке на корпусе страниц.
+
+    :var group: Имя группы (None для общих свойств).
+    :var property: Имя свойства.
+    :var pattern: Текст сигнатуры.
+    :var page: Имя страницы корпуса, на которой превышен порог.
+    :var time: Время поиска, с (для прерванного поиска - время до прерывания).
+    :var timed_out: Поиск был прерван по жёсткому таймауту.
+    """
+    group: Optional[str]
+    property: str
+    pattern: str
+    page: str
+    time: float
+    timed_out: bool = False
+
+    def __str__(self) -> str:
+        _time = f'> {self.time:.2f}' if self.timed_out else f'{self.time:.3f}'
+        return f'{self.group or "common"}/{self.property}: {self.pattern!r} на {self.page} - {_time} с'
+
+
+def load_corpus(corpus_dir: str = CORPUS_DIR, scale_to: int = 0) -> list[tuple[str, str]]:
+    """
+    Загружает страницы корпуса.
+
+    :param corpus_dir: Каталог с файлами .html.
+    :param scale_to: Минимальный размер страницы в символах: меньшие страницы повторяются до этого размера.
+    :return: Список пар (имя файла, текст страницы).
+    """
+    pages = []
+    for file_name in sorted(os.listdir(corpus_dir)):
+        if not file_name.endswith('.html'):
+            continue
+        with open(os.path.join(corpus_dir, file_name), 'r', encoding='utf-8') as file:
+            text = file.read()
+        if text and len(text) < scale_to:
+            text = text * -(-scale_to // len(text))
+        pages.append((file_name, text))
+    return pages
+
+
+_worker_pages: list[tuple[str, str]] = []
+
+
+def _init_worker(corpus_dir: str, scale_to: int) -> None:
+    global _worker_pages
+    _worker_pages = load_corpus(corpus_dir, scale_to)
+
+
+def _time_signature(pattern: str) -> list[tuple[str, float]]:
+    """Замеряет время поиска сигнатуры на каждой странице корпуса (выполняется в дочернем процессе)."""
+    compiled = re.compile(pattern)
+    timings = []
+    for name, text in _worker_pages:
+        started = time.perf_counter()
+        compiled.search(text)
+        timings.append((name, time.perf_counter() - started))
+    return timings
+
+
+def lint_signatures(
+        config: "ParserConfig",
+        corpus_dir: Optional[str] = None,
+        threshold: float = .05,
+        scale_to: int = 3_000_000,
+        hard_timeout: float = 5.,
+        logger: Optional[logging.Logger] = None
+) -> list[SignatureIssue]:
+    """
+    Проверяет все сигнатуры конфигурации на корпусе страниц и отмечает медленные.
+
+    Поиск выполняется в дочернем процессе: сигнатура с катастрофическим перебором прерывается
+    по ``hard_timeout`` и не останавливает проверку остальных.
+
+    :param config: Конфигурация парсера.
+    :param corpus_dir: Каталог корпуса. По умолчанию - встроенный корпус.
+    :param threshold: Порог времени поиска на одной странице, с.
+    :param scale_to: Размер, до которого увеличиваются страницы корпуса (по умолчанию ~3 МБ).
+    :param hard_timeout: Жёсткий таймаут проверки одной сигнатуры на всём корпусе, с.
+    :param logger: Объект логгера.
+    :return: Список замечаний.
+    """
+    logger = logger or _logger
+    corpus_dir = corpus_dir or CORPUS_DIR
+
+    # Одна и та же сигнатура может встречаться в нескольких свойствах и группах
+    owners: dict[str, list[tuple[Optional[str], str]]] = {}
+    for group in config.property_groups:
+        for prop in group.properties:
+            if prop.common:
+                continue
+            for sig in prop.signatures:
+                owners.setdefault(sig.pattern, []).append((group.name, prop.name))
+    for prop in config.common_properties:
+        for sig in prop.signatures:
+            owners.setdefault(sig.pattern, []).append((None, prop.name))
+
+    issues = []
+    pool = multiprocessing.Pool(1, initializer=_init_worker, initargs=(corpus_dir, scale_to))
+    try:
+        for pattern, places in owners.items():
+            task = pool.apply_async(_time_signature, (pattern,))
+            try:
+                slow = [(page, spent, False) for page, spent in task.get(hard_timeout) if spent > threshold]
+            except multiprocessing.TimeoutError:
+                slow = [('*', hard_timeout, True)]
+                pool.terminate()
+                pool = multiprocessing.Pool(1, initializer=_init_worker, initargs=(corpus_dir, scale_to))
+
+            for page, spent, timed_out in slow:
+                for group_name, prop_name in places:
+                    issues.append(SignatureIssue(group_name, prop_name, pattern, page, spent, timed_out))
+    finally:
+        pool.terminate()
+
+    for issue in issues:
+        logger.warning("Медленная сигнатура: %s", issue)
+    logger.debug("Проверено сигнатур: %s, замечаний: %s", len(owners), len(issues))
+    return issues
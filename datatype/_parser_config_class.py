@@ -1,15 +1,27 @@
 import json
 import logging
 import re
+import threading
+import time
 import zipfile
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from io import TextIOWrapper
 from re import Pattern
-from typing import Optional, Any
+from typing import Callable, Optional, Any
 
-from datatype._classes import DataType, PropertyResult
+from datatype._classes import DataType, PropertyResult, SignatureStats
 from datatype._utils import get_datatype
 from datatype._classes import ParseResult
+from datatype._identity import IdentityRule, DEFAULT_IDENTITY_RULES, canonical_url
+from datatype._json_state import JsonPath, PageState
+from datatype._selectors import DomSelector
+from metrics import METRICS
+
+try:
+    import regex
+except ImportError:  # без модуля regex поиск нельзя прервать, бюджет проверяется между сигнатурами
+    regex = None
 
 
 class ParserConfig:
@@ -30,6 +42,11 @@ class ParserConfig:
     :var author: Автор парсера.
     :var version: Версия парсера.
     :var accepted_sources: Список допустимых источников.
+    :var extraction_regions: CSS-селекторы областей страницы, в которых ищутся сигнатуры
+        (например, ``script[type="application/json"]``, ``noframes``). Пустой список - вся страница.
+    :var api_patterns: Регулярные выражения URL ответов API, JSON-тела которых перехватываются
+        при загрузке страницы. По ним ищутся свойства с источником ``api``.
+    :var identity_rules: Правила определения товара по URL для каждого источника.
 
     :var property_groups: Список групп свойств.
     """
@@ -39,9 +56,13 @@ class ParserConfig:
     author: str
     version: str
     accepted_sources: list[str]
+    extraction_regions: list[str]
+    api_patterns: list[str]
+    identity_rules: list[IdentityRule]
 
     property_groups: list["PropertyGroup"]
     common_properties: list["Property"]
+    lint_issues: list
 
     _logger: logging.Logger = logging.getLogger(__name__)
 
@@ -54,7 +75,10 @@ class ParserConfig:
             accepted_sources: list[str],
             property_groups: list["PropertyGroup"],
             common_properties: list["Property"],
-            logger: Optional[logging.Logger] = None
+            logger: Optional[logging.Logger] = None,
+            extraction_regions: Optional[list[str]] = None,
+            api_patterns: Optional[list[str]] = None,
+            identity_rules: Optional[list[IdentityRule]] = None
     ):
         if logger is not None:
             self._logger = logger
@@ -65,16 +89,32 @@ class ParserConfig:
         self.accepted_sources = accepted_sources
         self.property_groups = property_groups
         self.common_properties = common_properties
+        self.extraction_regions = list(extraction_regions or [])
+        self.api_patterns = list(api_patterns or [])
+        self.identity_rules = list(identity_rules or DEFAULT_IDENTITY_RULES)
+        self.lint_issues = []
 
         self._logger.debug("Конфигурация парсера создана.")
 
     @classmethod
-    def load(cls, file_path: str, logger: Optional[logging.Logger] = logging.getLogger(__name__)) -> "ParserConfig":
+    def load(
+            cls,
+            file_path: str,
+            logger: Optional[logging.Logger] = logging.getLogger(__name__),
+            lint: bool = False,
+            lint_corpus: Optional[str] = None,
+            lint_threshold: float = .05,
+            progress: Optional[Callable[[int, int], None]] = None
+    ) -> "ParserConfig":
         """
         Загружает конфигурацию парсера из файла.
 
         :param file_path: Путь к файлу.
         :param logger: Объект логгера.
+        :param lint: Проверить сигнатуры на корпусе страниц (результат - в lint_issues).
+        :param lint_corpus: Каталог корпуса для проверки. По умолчанию - встроенный корпус.
+        :param lint_threshold: Порог времени поиска сигнатуры на одной странице, с.
+        :param progress: Функция, вызываемая после чтения каждого файла группы: (прочитано, всего).
         :return: Инициализированный экземпляр класса ParserConfig
         """
 
@@ -99,13 +139,15 @@ class ParserConfig:
                         _common_prop = [Property.from_config(prop, common=True) for prop in json.load(text_file)]
                 _filelist.remove('common.json')
 
-            for json_file in _filelist:
+            for position, json_file in enumerate(_filelist, 1):
                 with zip_ref.open(json_file) as file:
                     with TextIOWrapper(file, encoding='utf-8') as text_file:
                         _property_groups.append(PropertyGroup.from_config(json.load(text_file)))
                         _property_groups[-1].properties.extend(_common_prop)
+                if progress is not None:
+                    progress(position, len(_filelist))
 
-        return cls(
+        config = cls(
             title=metadata.get('title', '-'),
             description=metadata.get('description', None),
             author=metadata.get('author', '-'),
@@ -113,9 +155,115 @@ class ParserConfig:
             accepted_sources=metadata.get('accepted_sources', []),
             property_groups=_property_groups,
             common_properties=_common_prop,
-            logger=logger
+            logger=logger,
+            extraction_regions=metadata.get('extraction_regions', []),
+            api_patterns=metadata.get('api_patterns', []),
+            identity_rules=[IdentityRule.from_config(rule) for rule in metadata.get('identity', [])]
         )
 
+        if lint:
+            from datatype._lint import lint_signatures
+            config.lint_issues = lint_signatures(config, lint_corpus, lint_threshold, logger=logger)
+
+        return config
+
+    def canonical_url(self, url: str) -> str:
+        """
+        Приводит URL товара к каноническому виду по правилам источников.
+
+        :param url: Исходный URL.
+        :return: Канонический URL: хост, идентификатор товара и значимые параметры (``sku``).
+        """
+        return canonical_url(url, self.identity_rules)
+
+    @property
+    def dom_selectors(self) -> list[DomSelector]:
+        """Уникальные DOM-селекторы всех свойств (по ключу) для получения одним вызовом в браузере."""
+        _selectors = {}
+        for prop in self.all_properties:
+            for selector in prop.selectors:
+                _selectors.setdefault(selector.key, selector)
+        return list(_selectors.values())
+
+    @property
+    def all_properties(self) -> list["Property"]:
+        """Уникальные свойства конфигурации: свойства групп и общие свойства (по одному разу)."""
+        _seen = set()
+        _properties = []
+        for prop in [prop for group in self.property_groups for prop in group.properties] + self.common_properties:
+            if id(prop) not in _seen:
+                _seen.add(id(prop))
+                _properties.append(prop)
+        return _properties
+
+    def enable_profiling(self, adaptive: bool = False) -> "ParserConfig":
+        """
+        Включает сбор статистики по сигнатурам всех свойств.
+
+        :param adaptive: Менять порядок проверки сигнатур по доле совпадений и стоимости.
+        :return: Ссылка на текущий экземпляр.
+        """
+        for prop in self.all_properties:
+            prop.enable_profiling(adaptive=adaptive)
+        self._logger.debug("Профилирование сигнатур включено (адаптивный порядок: %s).", adaptive)
+        return self
+
+    def disable_profiling(self) -> "ParserConfig":
+        """
+        Отключает сбор статистики и возвращает порядок сигнатур из конфигурации.
+
+        :return: Ссылка на текущий экземпляр.
+        """
+        for prop in self.all_properties:
+            prop.disable_profiling()
+        return self
+
+    def signature_report(self) -> list[dict]:
+        """
+        Формирует отчёт по сигнатурам: время, количество совпадений и промахов.
+
+        Общие свойства попадают в отчёт один раз с группой ``None``.
+
+        :return: Список словарей, по одному на сигнатуру.
+        """
+        _report = []
+        _groups = [(group.name, [p for p in group.properties if not p.common]) for group in self.property_groups]
+        for group_name, properties in _groups + [(None, self.common_properties)]:
+            for prop in properties:
+                if prop.stats is None:
+                    continue
+                for position, stats in enumerate(prop.stats):
+                    _report.append({
+                        'group': group_name,
+                        'property': prop.name,
+                        'index': position,
+                        'order': prop.order.index(position),
+                        **stats.to_dict()
+                    })
+        return _report
+
+    def set_time_budget(self, seconds: Optional[float]) -> "ParserConfig":
+        """
+        Задаёт бюджет времени на поиск одного свойства на странице.
+
+        :param seconds: Бюджет, с. None - без ограничения.
+        :return: Ссылка на текущий экземпляр.
+        """
+        for prop in self.all_properties:
+            prop.set_time_budget(seconds)
+        if seconds is not None and regex is None:
+            self._logger.warning("Модуль regex не установлен: поиск по сигнатуре не может быть прерван, "
+                                 "бюджет проверяется только между сигнатурами.")
+        return self
+
+    def runaway_report(self) -> list[dict]:
+        """
+        Возвращает записи о поисках, превысивших бюджет времени.
+
+        :return: Список словарей с именем свойства, сигнатурой, размером текста и затраченным временем.
+        """
+        return [{'property': prop.name, **record} for prop in self.all_properties for record in prop.runaways]
+
     # def add_prop_from_config(self, config: dict) -> "ParserConfig":
     #     self.property_groups.append(PropertyGroup.from_config(config))
     #     return self
@@ -127,6 +275,9 @@ class ParserConfig:
             'author': self.author,
             'version': self.version,
             'accepted_sources': self.accepted_sources,
+            'extraction_regions': self.extraction_regions,
+            'api_patterns': self.api_patterns,
+            'identity': [rule.to_config() for rule in self.identity_rules],
             'property_groups': [group.dict for group in self.property_groups],
             'common_properties': [prop.dict for prop in self.common_properties]
         }
@@ -162,22 +313,66 @@ class ParserConfig:
         return self
 
 
+class _BudgetExceeded(Exception):
+    """Бюджет времени поиска свойства исчерпан."""
+
+    def __init__(self, index: int) -> None:
+        super().__init__(index)
+        self.index = index
+
+
 @dataclass
 class Property:
-    """Класс, представляющий отдельное свойство для парсинга."""
+    """
+    Класс, представляющий отдельное свойство для парсинга.
+
+    Сигнатуры бывают трёх видов: регулярные выражения (строки в конфигурации), пути в JSON-состоянии
+    страницы (объекты ``{"path": "...", "pattern": "..."}``, см. :class:`JsonPath`) и селекторы
+    отрисованной страницы (``{"css": "..."}`` или ``{"xpath": "..."}``, см. :class:`DomSelector`).
+    Сначала проверяются пути, затем селекторы, затем регулярные выражения.
+    """
     name: str
     type: DataType
     signatures: list[Pattern]
     common: bool = False
+    source: str = 'html'
+    paths: list[JsonPath] = field(default_factory=list)
+    selectors: list[DomSelector] = field(default_factory=list)
     _logger: logging.Logger = logging.getLogger(__name__)
 
-    def match(self, text: str) -> Optional[Any]:
+    # Профилирование сигнатур (см. enable_profiling)
+    stats: Optional[list[SignatureStats]] = field(default=None, init=False, repr=False, compare=False)
+    adaptive: bool = field(default=False, init=False, repr=False, compare=False)
+    probe_interval: int = field(default=16, init=False, repr=False, compare=False)
+    reorder_interval: int = field(default=64, init=False, repr=False, compare=False)
+    _order: Optional[list[int]] = field(default=None, init=False, repr=False, compare=False)
+    _conflicts: set = field(default_factory=set, init=False, repr=False, compare=False)
+    _probes: int = field(default=0, init=False, repr=False, compare=False)
+    _calls: int = field(default=0, init=False, repr=False, compare=False)
+    # Статистика обновляется из потоков извлечения (asyncio.to_thread)
+    _stats_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+
+    # Ограничение времени поиска (см. set_time_budget)
+    budget: Optional[float] = field(default=None, init=False, repr=False, compare=False)
+    runaways: deque = field(default_factory=lambda: deque(maxlen=100), init=False, repr=False, compare=False)
+    _guarded: Optional[list] = field(default=None, init=False, repr=False, compare=False)
+
+    def match(self, text: str, state: Optional[PageState] = None) -> Optional[Any]:
         """
         Ищет значение свойства в тексте с использованием сигнатур.
 
         :param text: Текст для поиска.
+        :param state: Состояние страницы для сигнатур-путей и DOM-селекторов.
         :return: Найденное значение с приведением к указанному типу или None.
         """
+        if state is not None and (self.paths or self.selectors):
+            value = self._match_state(state)
+            if value is not None:
+                return self._convert_type(value)
+
+        if self.stats is not None or self.budget is not None:
+            return self._match_instrumented(text)
+
         for pattern in self.signatures:
             match = pattern.search(text)
             if match:
@@ -187,6 +382,174 @@ class Property:
         self._logger.debug("Совпадение для свойства '%s' не найдено.", self.name)
         return None
 
+    def _match_state(self, state: PageState) -> Optional[str]:
+        """Ищет значение по путям JSON-состояния и DOM-селекторам."""
+        for signature in [*self.paths, *self.selectors]:
+            value = signature.find(state)
+            if value is not None:
+                self._logger.debug("Найдено значение свойства '%s' по %r: %s", self.name, signature, value)
+                return value
+        return None
+
+    @property
+    def order(self) -> list[int]:
+        """Порядок проверки сигнатур (индексы в списке signatures)."""
+        return self._order if self._order is not None else list(range(len(self.signatures)))
+
+    def enable_profiling(self, adaptive: bool = False) -> "Property":
+        """
+        Включает сбор статистики по сигнатурам.
+
+        В адаптивном режиме сигнатуры периодически переупорядочиваются по ожидаемой стоимости
+        совпадения (среднее время / доля совпадений). Результат не зависит от порядка: при
+        совпадении проверяются ещё не проверенные сигнатуры, стоящие в конфигурации раньше,
+        и возвращается результат первой по конфигурации. Пары, совпавшие на одном тексте,
+        запоминаются и в дальнейшем сохраняют порядок из конфигурации. Каждые ``probe_interval``
+        вызовов проверяются все сигнатуры, чтобы статистика была и у редко проверяемых.
+
+        :param adaptive: Менять порядок проверки сигнатур.
+        :return: Ссылка на текущий экземпляр.
+        """
+        self.stats = [SignatureStats(pattern=sig.pattern) for sig in self.signatures]
+        self.adaptive = adaptive
+        self._order = None
+        self._conflicts = set()
+        self._probes = 0
+        self._calls = 0
+        return self
+
+    def disable_profiling(self) -> "Property":
+        """
+        Отключает сбор статистики и возвращает порядок сигнатур из конфигурации.
+
+        :return: Ссылка на текущий экземпляр.
+        """
+        self.stats = None
+        self.adaptive = False
+        self._order = None
+        return self
+
+    def set_time_budget(self, seconds: Optional[float]) -> "Property":
+        """
+        Задаёт бюджет времени на поиск свойства в одном тексте.
+
+        Если установлен модуль ``regex``, поиск прерывается по истечении бюджета; иначе бюджет
+        проверяется перед каждой следующей сигнатурой. Превышения записываются в ``runaways``.
+
+        :param seconds: Бюджет, с. None - без ограничения.
+        :return: Ссылка на текущий экземпляр.
+        """
+        self.budget = seconds
+        self._guarded = None
+        if seconds is not None and regex is not None:
+            self._guarded = [regex.compile(sig.pattern, sig.flags) for sig in self.signatures]
+        return self
+
+    def _search(self, index: int, text: str, deadline: Optional[float] = None) -> Optional[re.Match]:
+        """Ищет сигнатуру с учётом статистики и бюджета времени."""
+        started = time.perf_counter()
+        if deadline is not None and started >= deadline:
+            raise _BudgetExceeded(index)
+
+        if deadline is not None and self._guarded is not None:
+            try:
+                match = self._guarded[index].search(text, concurrent=True, timeout=deadline - started)
+            except TimeoutError:
+                raise _BudgetExceeded(index)
+        else:
+            match = self.signatures[index].search(text)
+
+        if self.stats is not None:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                stats = self.stats[index]
+                stats.time += elapsed
+                if match:
+                    stats.hits += 1
+                else:
+                    stats.misses += 1
+        return match
+
+    def _match_instrumented(self, text: str) -> Optional[Any]:
+        with self._stats_lock:
+            self._calls += 1
+            calls = self._calls
+            probe = self.adaptive and calls % self.probe_interval == 0
+            if probe:
+                self._probes += 1
+        found = None
+        started = time.perf_counter()
+        deadline = started + self.budget if self.budget is not None else None
+
+        try:
+            if probe:
+                # Пробный вызов: проверяем все сигнатуры, запоминаем совпадающие вместе
+                matched = [(i, m) for i in range(len(self.signatures)) if (m := self._search(i, text, deadline))]
+                with self._stats_lock:
+                    self._conflicts.update((a, b) for a, _ in matched for b, _ in matched if a < b)
+                if matched:
+                    found = matched[0][1]
+            else:
+                checked = set()
+                for index in self.order:
+                    checked.add(index)
+                    found = self._search(index, text, deadline)
+                    if found:
+                        # Сигнатуры, стоящие в конфигурации раньше и ещё не проверенные, проверяются,
+                        # чтобы результат совпадал с проверкой в порядке конфигурации
+                        for earlier in range(index):
+                            if earlier in checked:
+                                continue
+                            match = self._search(earlier, text, deadline)
+                            if match:
+                                with self._stats_lock:
+                                    self._conflicts.add((earlier, index))
+                                found = match
+                                break
+                        break
+        except _BudgetExceeded as e:
+            spent = time.perf_counter() - started
+            self.runaways.append({'pattern': self.signatures[e.index].pattern, 'size': len(text), 'time': spent})
+            METRICS.inc('signature_runaways', property=self.name)
+            self._logger.warning("Поиск свойства '%s' прерван: бюджет %.3f с превышен (%.3f с) на сигнатуре %r",
+                                 self.name, self.budget, spent, self.signatures[e.index].pattern)
+            return None
+
+        if self.adaptive and calls % self.reorder_interval == 0 and self._probes >= 4:
+            with self._stats_lock:
+                self._reorder()
+
+        if found:
+            value = found.group(1)
+            self._logger.debug("Найдено совпадение для свойства '%s': %s", self.name, value)
+            return self._convert_type(value)
+        self._logger.debug("Совпадение для свойства '%s' не найдено.", self.name)
+        return None
+
+    def _reorder(self) -> None:
+        """
+        Упорядочивает сигнатуры по возрастанию ожидаемой стоимости совпадения,
+        сохраняя порядок конфигурации для пар, совпадавших на одном тексте.
+        """
+        def _cost(index: int) -> float:
+            stats = self.stats[index]
+            return stats.mean_time / max(stats.hit_rate, 1e-6)
+
+        remaining = list(range(len(self.signatures)))
+        order = []
+        while remaining:
+            ready = [
+                i for i in remaining
+                if not any((j, i) in self._conflicts for j in remaining if j < i)
+            ]
+            best = min(ready, key=_cost)
+            order.append(best)
+            remaining.remove(best)
+
+        if order != self.order:
+            self._logger.debug("Порядок сигнатур свойства '%s' изменён: %s", self.name, order)
+        self._order = order
+
     def _convert_type(self, value: str):
         """
         Преобразует строковое значение в указанный тип.
@@ -201,18 +564,25 @@ class Property:
             return None
 
         try:
-            return self.type(value)
+            with METRICS.stage('convert'):
+                return self.type(value)
         except (ValueError, TypeError) as e:
             self._logger.error("Ошибка преобразования значения '%s' к типу '%s': %s", value, self.type, e)
             return None
 
     @classmethod
     def from_config(cls, config: dict, common: bool = False) -> 'Property':
+        signatures = config.get('signatures', [])
         return cls(
             name=config.get('name', ''),
             type=get_datatype(config.get('type', "string")),
-            signatures=[re.compile(sig) for sig in config.get('signatures', [])],
-            common=common or config.get('common', False)
+            signatures=[re.compile(sig) for sig in signatures if isinstance(sig, str)],
+            common=common or config.get('common', False),
+            source=config.get('source', 'html'),
+            paths=[JsonPath(sig['path'], sig.get('pattern')) for sig in signatures
+                   if isinstance(sig, dict) and 'path' in sig],
+            selectors=[DomSelector.from_config(sig) for sig in signatures
+                       if isinstance(sig, dict) and ('css' in sig or 'xpath' in sig)]
         )
 
     @property
@@ -220,11 +590,15 @@ class Property:
         res = {
             'name': self.name,
             'type': self.type.title,
-            'signatures': [sig.pattern for sig in self.signatures]
+            'signatures': [path.to_config() for path in self.paths]
+                          + [selector.to_config() for selector in self.selectors]
+                          + [sig.pattern for sig in self.signatures]
         }
 
         if self.common:
             res['common'] = True
+        if self.source != 'html':
+            res['source'] = self.source
 
         return res
 
@@ -266,10 +640,42 @@ class PropertyGroup:
     def dict(self) -> dict:
         return self.to_config()
 
-    def pars(self, html: str, source: str) -> "ParseResult":
+    def ready(self, html: str, required: float = 1., payloads: Optional[str] = None,
+              state: Optional[PageState] = None) -> bool:
+        """
+        Проверяет, достаточно ли в тексте данных для извлечения группы.
+
+        Значения не преобразуются и статистика сигнатур не собирается.
+
+        :param html: Текст страницы.
+        :param required: Доля свойств, для которых должна найтись хотя бы одна сигнатура.
+        :param payloads: Текст перехваченных ответов API. Если не задан, свойства с источником ``api``
+            не учитываются.
+        :param state: Состояние страницы для сигнатур-путей и DOM-селекторов. Свойства только
+            с DOM-селекторами учитываются, если в состоянии есть значения селекторов.
+        :return: True, если данных достаточно.
+        """
+        properties = [
+            prop for prop in self.properties
+            if (payloads is not None or prop.source != 'api')
+            and (prop.signatures or prop.paths or (state is not None and state.dom))
+        ]
+        if not properties:
+            return True
+        found = 0
+        for prop in properties:
+            if state is not None and prop._match_state(state) is not None:
+                found += 1
+            elif any(sig.search(payloads if prop.source == 'api' else html) for sig in prop.signatures):
+                found += 1
+        return found / len(properties) >= required
+
+    def pars(self, html: str, source: str, payloads: str = '', state: Optional[PageState] = None) -> "ParseResult":
         _properties = []
-        for prop in self.properties:
-            _properties.append(PropertyResult(name=prop.name, value=prop.match(html), type=prop.type))
+        with METRICS.stage('extract', group=self.name):
+            for prop in self.properties:
+                text = payloads if prop.source == 'api' else html
+                _properties.append(PropertyResult(name=prop.name, value=prop.match(text, state), type=prop.type))
 
         return ParseResult(
             name=self.name,
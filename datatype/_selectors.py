@@ -0,0 +1,74 @@
+import re
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datatype._json_state import PageState
+
+
+class DomSelector:
+    """
+    Сигнатура свойства, выбирающая элемент отрисованной страницы по CSS или XPath.
+
+    Значения всех селекторов страницы получаются в браузере одним вызовом ``page.evaluate``
+    (см. ``PageExtractor.get``) и передаются в :class:`PageState` как словарь ``key -> значение``.
+
+    :var kind: Тип селектора: ``css`` или ``xpath``.
+    :var query: Текст селектора.
+    :var attr: Имя атрибута элемента. Если не указано, берётся текст элемента.
+    :var pattern: Регулярное выражение с группой, применяемое к значению (необязательно).
+    """
+
+    kind: str
+    query: str
+    attr: Optional[str]
+    pattern: Optional[re.Pattern]
+
+    def __init__(self, kind: str, query: str, attr: Optional[str] = None, pattern: Optional[str] = None) -> None:
+        if kind not in ('css', 'xpath'):
+            raise ValueError(f'Неизвестный тип селектора: {kind!r}')
+        self.kind = kind
+        self.query = query
+        self.attr = attr
+        self.pattern = re.compile(pattern) if pattern else None
+
+    @property
+    def key(self) -> str:
+        """Ключ значения селектора в словаре, возвращаемом из браузера."""
+        return f'{self.kind}:{self.query}' + (f'@{self.attr}' if self.attr else '')
+
+    @classmethod
+    def from_config(cls, config: dict) -> "DomSelector":
+        kind = 'xpath' if 'xpath' in config else 'css'
+        return cls(kind, config[kind], config.get('attr'), config.get('pattern'))
+
+    def to_config(self) -> dict:
+        res = {self.kind: self.query}
+        if self.attr:
+            res['attr'] = self.attr
+        if self.pattern is not None:
+            res['pattern'] = self.pattern.pattern
+        return res
+
+    def to_request(self) -> dict:
+        """Описание селектора для передачи в браузер."""
+        return {'key': self.key, 'kind': self.kind, 'query': self.query, 'attr': self.attr}
+
+    def find(self, state: "PageState") -> Optional[str]:
+        """
+        Возвращает значение селектора, полученное из браузера.
+
+        :param state: Состояние страницы.
+        :return: Значение (после применения ``pattern``) или None.
+        """
+        value = state.dom.get(self.key)
+        if not value:
+            return None
+        if self.pattern is None:
+            return value
+        match = self.pattern.search(value)
+        if match:
+            return match.group(1) if match.groups() else match.group(0)
+        return None
+
+    def __repr__(self) -> str:
+        return f'DomSelector({self.key!r})'
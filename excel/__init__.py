@@ -1 +1,2 @@
-from .excel import logger
\ No newline at end of file
+from ._utils import logger, DataType, NUMBER_FORMATS, column_formats, appended_rows
+from .file_sink import FileTableSink
@@ -0,0 +1,99 @@
+import logging
+from contextlib import contextmanager
+from enum import Enum
+from typing import Iterable, Iterator
+
+from datatype import Property
+
+# Настройка логирования
+logger = logging.getLogger('excel')
+handler = logging.StreamHandler()
+formatter = logging.Formatter(
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+logger.setLevel(logging.INFO)
+
+
+class DataType(Enum):
+    """Перечисление типов данных для форматирования."""
+    BOOLEAN = 'BOOLEAN'
+    INTEGER = 'INTEGER'
+    FLOAT = 'FLOAT'
+    STRING = 'STRING'
+    DATE = 'DATE'
+    HZ = 'HZ'
+    DPI = 'DPI'
+    INCH = 'INCH'
+    RUB = 'RUB'
+
+
+# Форматы чисел Excel для каждого типа данных
+NUMBER_FORMATS = {
+    DataType.DATE: 'YYYY-MM-DD',
+    DataType.INTEGER: '0',
+    DataType.FLOAT: '0.00',
+    # Пример: заменяем 1/0 на Да/Нет
+    # Коды формата - в инвариантной (английской) записи: её ожидают NumberFormat и openpyxl
+    DataType.BOOLEAN: '[Color43]"Да";[Red]"Нет";[Red]"Нет"',
+    DataType.STRING: '@',
+    DataType.HZ: '0" Hz"',
+    DataType.DPI: '0"dpi"',
+    DataType.INCH: '0\\"',
+    DataType.RUB: '_-* # ##0 ₽_-;-* # ##0 ₽_-;_-* "-" ₽_-;_-@_-',
+}
+
+# Соответствие типов свойств конфигурации (datatype.DataType.title) типам форматирования
+CONFIG_TYPES = {
+    'integer': DataType.INTEGER,
+    'number': DataType.INTEGER,
+    'float': DataType.FLOAT,
+    'string': DataType.STRING,
+    'boolean': DataType.BOOLEAN,
+}
+
+
+def column_formats(properties: Iterable[Property]) -> dict[str, DataType]:
+    """
+    Сопоставляет столбцам типы форматирования по типам свойств конфигурации.
+
+    Если свойство с одним именем встречается в нескольких группах, используется первое.
+
+    :param properties: Свойства конфигурации.
+    :return: Словарь "имя столбца -> тип данных".
+    """
+    formats = {}
+    for prop in properties:
+        if prop.name in formats or prop.type is None:
+            continue
+        data_type = CONFIG_TYPES.get(prop.type.title)
+        if data_type is not None:
+            formats[prop.name] = data_type
+    return formats
+
+
+@contextmanager
+def appended_rows(table, count: int) -> Iterator[int]:
+    """
+    Расширяет таблицу Excel (ListObject) на ``count`` строк снизу.
+
+    Пустая таблица содержит строку вставки, поэтому позиция считается по ListRows, а строка итогов
+    на время расширения и записи отключается, чтобы данные не легли на неё.
+
+    :param table: Таблица (COM-объект ListObject).
+    :param count: Количество добавляемых строк.
+    :return: Номер строки листа, с которой начинаются добавленные строки.
+    """
+    show_totals = table.ShowTotals
+    if show_totals:
+        table.ShowTotals = False
+    try:
+        header = table.HeaderRowRange
+        rows = table.ListRows.Count
+        table.Resize(header.Resize(1 + rows + count))
+        yield header.Row + 1 + rows
+    finally:
+        if show_totals:
+            table.ShowTotals = True
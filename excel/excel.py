@@ -1,38 +1,22 @@
 # excel_table_manager.py
 
 import asyncio
-import logging
 from concurrent.futures import ThreadPoolExecutor
-from enum import Enum
+from contextlib import asynccontextmanager
 from functools import wraps
-from typing import List
-
-import pythoncom
-import xlwings as xw
-
-# Настройка логирования
-logger = logging.getLogger(__name__)
-handler = logging.StreamHandler()
-formatter = logging.Formatter(
-    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-handler.setFormatter(formatter)
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
-
-
-class DataType(Enum):
-    """Перечисление типов данных для форматирования."""
-    BOOLEAN = 'BOOLEAN'
-    INTEGER = 'INTEGER'
-    FLOAT = 'FLOAT'
-    STRING = 'STRING'
-    DATE = 'DATE'
-    HZ = 'HZ'
-    DPI = 'DPI'
-    INCH = 'INCH'
-    RUB = 'RUB'
+from typing import AsyncIterator, List, Optional, TYPE_CHECKING
+
+from datatype import ParserConfig
+from metrics import METRICS
+from excel._utils import logger, DataType, NUMBER_FORMATS, column_formats, appended_rows
+
+if TYPE_CHECKING:
+    # xlwings и pywin32 импортируются в потоке Excel при первом подключении
+    import xlwings as xw
+
+# Константы Excel
+XL_CALCULATION_MANUAL = -4135
+XL_SRC_RANGE = 1
 
 
 def com_init(func):
@@ -42,6 +26,8 @@ def com_init(func):
 
     @wraps(func)
     def wrapper(*args, **kwargs):
+        import pythoncom
+
         pythoncom.CoInitialize()
         try:
             return func(*args, **kwargs)
@@ -57,7 +43,10 @@ class _ExcelWorker:
     Выполняется в отдельном потоке.
     """
 
-    sheet: xw.Sheet
+    sheet: "xw.Sheet"
+    _bulk_depth: int = 0
+    _bulk_state: Optional[tuple] = None
+    _refresh_pending: bool = False
 
     @com_init
     def __init__(self, workbook_name: str, table_name: str) -> None:
@@ -67,6 +56,8 @@ class _ExcelWorker:
         :param workbook_name: Имя открытой книги Excel.
         :param table_name: Имя таблицы, созданной с помощью Ctrl+T.
         """
+        import xlwings as xw
+
         self.workbook_name = workbook_name
         try:
             self.workbook = xw.books[self.workbook_name]
@@ -145,6 +136,60 @@ class _ExcelWorker:
         except Exception as e:
             logger.error(f'Ошибка при добавлении строки: {e}')
 
+    def _add_rows_sync(self, rows: List[dict | list]) -> None:
+        """Синхронно добавляет несколько строк одним расширением таблицы и одной записью блока."""
+        if not self.table:
+            logger.error('Таблица не подключена.')
+            return
+        if not rows:
+            return
+        try:
+            headers = [cell.value for cell in self.sheet.range(self.table.HeaderRowRange.Address)]
+            values = [
+                [row.get(header, None) for header in headers] if isinstance(row, dict) else list(row)
+                for row in rows
+            ]
+
+            with appended_rows(self.table, len(values)) as first_row:
+                self.sheet.range((first_row, self.table.HeaderRowRange.Column)).value = values
+
+            logger.info(f'Добавлено строк: {len(values)}.')
+        except Exception as e:
+            logger.error(f'Ошибка при добавлении строк: {e}')
+
+    def _upsert_sync(self, rows: List[dict], key: str) -> None:
+        """Синхронно обновляет строки с совпадающим ключом и добавляет остальные."""
+        if not self.table:
+            logger.error('Таблица не подключена.')
+            return
+        try:
+            headers = [cell.value for cell in self.sheet.range(self.table.HeaderRowRange.Address)]
+            if key not in headers:
+                logger.error(f'Ключевой столбец {key} не найден.')
+                return
+
+            key_index = headers.index(key)
+            existing = {}
+            if self.table.ListRows.Count:
+                body = self.sheet.range(self.table.DataBodyRange.Address).options(ndim=2).value
+                existing = {row[key_index]: i for i, row in enumerate(body)}
+            else:
+                body = []
+
+            new_rows = []
+            for row_data in rows:
+                index = existing.get(row_data.get(key))
+                if index is None:
+                    new_rows.append(row_data)
+                    continue
+                merged = [row_data.get(header, body[index][i]) for i, header in enumerate(headers)]
+                self.table.ListRows(index + 1).Range.Value = merged
+
+            logger.info(f'Обновлено строк: {len(rows) - len(new_rows)}.')
+            self._add_rows_sync(new_rows)
+        except Exception as e:
+            logger.error(f'Ошибка при обновлении строк по ключу: {e}')
+
     def _delete_row_sync(self, index: int) -> None:
         """Синхронно удаляет строку из таблицы по индексу."""
         if not self.table:
@@ -184,40 +229,106 @@ class _ExcelWorker:
                 return
             col_index = headers.index(column_name) + 1
             column = self.table.ListColumns(col_index)
-            if data_type == DataType.DATE:
-                column.Range.NumberFormat = 'YYYY-MM-DD'
-            elif data_type == DataType.INTEGER:
-                column.Range.NumberFormat = '0'
-            elif data_type == DataType.FLOAT:
-                column.Range.NumberFormat = '0.00'
-            elif data_type == DataType.BOOLEAN:
-                # Пример: заменяем 1/0 на Да/Нет
-                column.Range.NumberFormat = '[Цвет 43]"Да";[Красный]"Нет";[Красный]"Нет"'
-            elif data_type == DataType.STRING:
-                column.Range.NumberFormat = '@'
-            elif data_type == DataType.HZ:
-                column.Range.NumberFormat = '0" Hz"'
-            elif data_type == DataType.DPI:
-                column.Range.NumberFormat = '0"dpi"'
-            elif data_type == DataType.INCH:
-                column.Range.NumberFormat = '0\\"'
-            elif data_type == DataType.RUB:
-                column.Range.NumberFormat = '_-* # ##0 ₽_-;-* # ##0 ₽_-;_-* "-" ₽_-;_-@_-'
+            column.Range.NumberFormat = NUMBER_FORMATS[data_type]
             logger.info(f'Столбец {column_name} отформатирован как {data_type.value}.')
         except Exception as e:
             logger.error(f'Ошибка при форматировании столбца: {e}')
 
+    def _format_columns_sync(self, formats: dict[str, DataType]) -> None:
+        """Синхронно форматирует несколько столбцов за один проход по заголовкам."""
+        if not self.table:
+            logger.error('Таблица не подключена.')
+            return
+        try:
+            headers = [cell.value for cell in self.sheet.range(self.table.HeaderRowRange.Address)]
+            formatted = 0
+            for column_name, data_type in formats.items():
+                if column_name not in headers:
+                    logger.debug(f'Столбец {column_name} не найден, форматирование пропущено.')
+                    continue
+                column = self.table.ListColumns(headers.index(column_name) + 1)
+                column.Range.NumberFormat = NUMBER_FORMATS[data_type]
+                formatted += 1
+            logger.info(f'Отформатировано столбцов: {formatted} из {len(formats)}.')
+        except Exception as e:
+            logger.error(f'Ошибка при форматировании столбцов: {e}')
+
     def _refresh_table_sync(self) -> None:
         """Синхронно обновляет диапазон таблицы после изменений."""
         if not self.workbook:
             logger.error('Книга не подключена.')
             return
+        if self._bulk_depth:
+            # Внутри пакетного редактирования обновление выполняется один раз при выходе
+            self._refresh_pending = True
+            return
         try:
-            self.workbook.api.RefreshAll()
+            if self.table.SourceType != XL_SRC_RANGE:
+                self.table.Refresh()
+            self.table.Range.Calculate()
             logger.info('Таблица обновлена.')
         except Exception as e:
             logger.error(f'Ошибка при обновлении таблицы: {e}')
 
+    def _begin_bulk_sync(self) -> None:
+        """
+        Синхронно начинает пакетное редактирование: отключает обновление экрана,
+        события и автоматический пересчёт. Вложенные вызовы учитываются счётчиком.
+
+        Если настройки переключить не удалось, уже изменённые восстанавливаются, а пакетное
+        редактирование не начинается (счётчик не увеличивается).
+        """
+        if self._bulk_depth:
+            self._bulk_depth += 1
+            return
+        app = self.workbook.app.api
+        state = None
+        try:
+            state = (app.ScreenUpdating, app.EnableEvents, app.Calculation)
+            app.ScreenUpdating = False
+            app.EnableEvents = False
+            app.Calculation = XL_CALCULATION_MANUAL
+        except Exception as e:
+            logger.error(f'Ошибка при начале пакетного редактирования: {e}')
+            if state is not None:
+                try:
+                    self._restore_app_state(app, state)
+                except Exception as restore_error:
+                    logger.error(f'Ошибка при восстановлении настроек Excel: {restore_error}')
+            return
+        self._bulk_state = state
+        self._bulk_depth = 1
+        logger.debug('Пакетное редактирование начато.')
+
+    @staticmethod
+    def _restore_app_state(app, state: tuple) -> None:
+        """Восстанавливает обновление экрана, события и режим пересчёта Excel."""
+        screen_updating, enable_events, calculation = state
+        app.Calculation = calculation
+        app.EnableEvents = enable_events
+        app.ScreenUpdating = screen_updating
+
+    def _end_bulk_sync(self) -> None:
+        """Синхронно завершает пакетное редактирование и восстанавливает настройки Excel."""
+        if self._bulk_depth == 0:
+            return
+        self._bulk_depth -= 1
+        if self._bulk_depth > 0:
+            return
+        app = self.workbook.app.api
+        try:
+            if self._bulk_state is not None:
+                self._restore_app_state(app, self._bulk_state)
+            logger.debug('Пакетное редактирование завершено.')
+        except Exception as e:
+            logger.error(f'Ошибка при завершении пакетного редактирования: {e}')
+        finally:
+            self._bulk_state = None
+
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self._refresh_table_sync()
+
 
 class ExcelTableManager:
     """Класс для управления таблицами Excel с использованием xlwings."""
@@ -252,7 +363,31 @@ class ExcelTableManager:
         :param row_data: Словарь с данными для новой строки.
         :return: Ссылка на экземпляр менеджера.
         """
-        await self._loop.run_in_executor(self._executor, self._worker._add_row_sync, row_data)
+        with METRICS.stage('export', target='excel'):
+            await self._loop.run_in_executor(self._executor, self._worker._add_row_sync, row_data)
+        return self
+
+    async def add_rows(self, rows: List[dict | list]) -> 'ExcelTableManager':
+        """
+        Асинхронно добавляет несколько строк в конец таблицы одной операцией.
+
+        :param rows: Список словарей или списков с данными строк.
+        :return: Ссылка на экземпляр менеджера.
+        """
+        with METRICS.stage('export', target='excel'):
+            await self._loop.run_in_executor(self._executor, self._worker._add_rows_sync, rows)
+        return self
+
+    async def upsert(self, rows: List[dict], key: str) -> 'ExcelTableManager':
+        """
+        Асинхронно обновляет строки с совпадающим значением ключевого столбца и добавляет новые.
+
+        :param rows: Список словарей с данными строк.
+        :param key: Имя ключевого столбца.
+        :return: Ссылка на экземпляр менеджера.
+        """
+        with METRICS.stage('export', target='excel'):
+            await self._loop.run_in_executor(self._executor, self._worker._upsert_sync, rows, key)
         return self
 
     async def delete_row(self, index: int) -> 'ExcelTableManager':
@@ -287,6 +422,33 @@ class ExcelTableManager:
         await self._loop.run_in_executor(self._executor, self._worker._format_column_sync, column_name, data_type)
         return self
 
+    async def format_columns(self, config: ParserConfig) -> 'ExcelTableManager':
+        """
+        Асинхронно форматирует все столбцы таблицы по типам свойств конфигурации за один проход.
+
+        :param config: Конфигурация парсера.
+        :return: Ссылка на экземпляр менеджера.
+        """
+        formats = column_formats(config.all_properties)
+        await self._loop.run_in_executor(self._executor, self._worker._format_columns_sync, formats)
+        return self
+
+    @asynccontextmanager
+    async def bulk_edit(self) -> AsyncIterator['ExcelTableManager']:
+        """
+        Асинхронный контекст пакетного редактирования.
+
+        На время блока отключает обновление экрана, события и автоматический пересчёт Excel,
+        а обновления таблицы откладывает до выхода. Настройки восстанавливаются и при ошибке.
+
+        :return: Ссылка на экземпляр менеджера.
+        """
+        await self._loop.run_in_executor(self._executor, self._worker._begin_bulk_sync)
+        try:
+            yield self
+        finally:
+            await self._loop.run_in_executor(self._executor, self._worker._end_bulk_sync)
+
     async def refresh_table(self) -> 'ExcelTableManager':
         """
         Асинхронно обновляет диапазон таблицы после изменений.
@@ -313,6 +475,12 @@ if __name__ == "__main__":
         # await manager.update_row(1, {"Column1": "Обновленное значение"})
         # await manager.format_column("Column2", DataType.RUB)
         # await manager.refresh_table()
+
+        # async with manager.bulk_edit():
+        #     await manager.format_columns(ParserConfig.load('cfg.zip'))
+        #     for row in rows:
+        #         await manager.add_row(row)
+        #     await manager.refresh_table()
         pass
 
 
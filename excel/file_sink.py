@@ -0,0 +1,341 @@
+import asyncio
+import csv
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
+
+from datatype import ParserConfig
+from metrics import METRICS
+from excel._utils import logger, DataType, NUMBER_FORMATS, column_formats
+
+
+class FileTableSink:
+    """
+    Файловый приёмник таблицы (xlsx или CSV), не требующий COM и запущенного Excel.
+
+    Строки пишутся потоково в журнал ``<file_path>.rows.jsonl``, поэтому память не растёт
+    с размером таблицы, а типы значений сохраняются. Итоговый файл собирается из журнала
+    методом :meth:`save` (xlsx - в режиме write-only openpyxl, CSV - построчно), после чего
+    журнал удаляется; следующая запись снова начинает его с содержимого итогового файла.
+
+    Асинхронный интерфейс совпадает с :class:`excel.excel.ExcelTableManager`.
+
+    :var file_path: Путь к итоговому файлу (.xlsx или .csv).
+    :var headers: Заголовки столбцов.
+    :var formats: Типы форматирования столбцов.
+    """
+
+    file_path: str
+    headers: List[str]
+    formats: dict[str, DataType]
+
+    def __init__(self, file_path: str, headers: Optional[List[str]] = None, sheet_name: str = 'Лист1',
+                 delimiter: str = ';') -> None:
+        """
+        Инициализирует приёмник.
+
+        :param file_path: Путь к итоговому файлу (.xlsx или .csv).
+        :param headers: Заголовки столбцов. Если не указаны, берутся из журнала или из первых строк.
+        :param sheet_name: Имя листа для xlsx.
+        :param delimiter: Разделитель для CSV.
+        """
+        self.file_path = file_path
+        self.sheet_name = sheet_name
+        self.delimiter = delimiter
+        self.headers = list(headers or [])
+        self.formats = {}
+        self._journal_path = f'{file_path}.rows.jsonl'
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        if os.path.exists(self._journal_path):
+            self._restore_headers()
+        elif os.path.exists(self.file_path):
+            self._import_file()
+        logger.info(f'FileTableSink инициализирован: {self.file_path}')
+
+    @property
+    def is_xlsx(self) -> bool:
+        return self.file_path.lower().endswith('.xlsx')
+
+    # --- Синхронные операции (выполняются в отдельном потоке) ---
+
+    def _iter_journal(self) -> Iterator[dict]:
+        """Построчно читает журнал."""
+        if not os.path.exists(self._journal_path):
+            return
+        with open(self._journal_path, 'r', encoding='utf-8') as journal:
+            for line in journal:
+                if line.strip():
+                    yield json.loads(line)
+
+    def _restore_headers(self) -> None:
+        """Восстанавливает заголовки по журналу без загрузки его в память."""
+        for row in self._iter_journal():
+            self._extend_headers(row.keys())
+
+    def _ensure_journal(self) -> None:
+        """Начинает журнал с содержимого итогового файла, если журнала нет (например, после save)."""
+        if not os.path.exists(self._journal_path) and os.path.exists(self.file_path):
+            self._import_file()
+
+    def _import_file(self) -> None:
+        """Потоково переносит строки существующего итогового файла в журнал."""
+        if self.is_xlsx:
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(self.file_path, read_only=True)
+            sheet = workbook[self.sheet_name] if self.sheet_name in workbook.sheetnames else workbook.active
+            rows = sheet.iter_rows(values_only=True)
+            headers = [str(h) for h in next(rows, ())]
+            self._extend_headers(headers)
+            self._append_journal(dict(zip(headers, row)) for row in rows)
+            workbook.close()
+        else:
+            with open(self.file_path, 'r', encoding='utf-8-sig', newline='') as file:
+                reader = csv.DictReader(file, delimiter=self.delimiter)
+                self._extend_headers(reader.fieldnames or [])
+                self._append_journal(reader)
+        logger.info(f'Строки из {self.file_path} перенесены в журнал.')
+
+    def _extend_headers(self, keys) -> None:
+        for key in keys:
+            if key not in self.headers:
+                self.headers.append(key)
+
+    def _normalize(self, row_data: dict | list) -> dict:
+        if isinstance(row_data, dict):
+            return row_data
+        if not self.headers:
+            raise ValueError("Строка задана списком, но заголовки столбцов не известны")
+        if len(row_data) != len(self.headers):
+            raise ValueError(f"Количество значений ({len(row_data)}) не совпадает с количеством "
+                             f"столбцов ({len(self.headers)})")
+        return dict(zip(self.headers, row_data))
+
+    def _add_rows_sync(self, rows: Iterable[dict | list]) -> None:
+        """Синхронно дописывает строки в журнал."""
+        self._ensure_journal()
+        self._append_journal(rows)
+
+    def _append_journal(self, rows: Iterable[dict | list]) -> None:
+        count = 0
+        with open(self._journal_path, 'a', encoding='utf-8') as journal:
+            for row_data in rows:
+                row = self._normalize(row_data)
+                self._extend_headers(row.keys())
+                journal.write(json.dumps(row, ensure_ascii=False, default=str))
+                journal.write('\n')
+                count += 1
+        logger.debug(f'Добавлено строк: {count}.')
+
+    def _read_rows_sync(self) -> List[dict]:
+        """Синхронно читает все строки."""
+        self._ensure_journal()
+        return [{header: row.get(header) for header in self.headers} for row in self._iter_journal()]
+
+    def _upsert_sync(self, rows: List[dict], key: str) -> None:
+        """
+        Синхронно обновляет строки с совпадающим ключом и добавляет остальные.
+
+        Входные строки с одинаковым ключом объединяются по порядку (более поздние значения
+        заменяют более ранние). Обновляются все строки таблицы с совпадающим ключом. Строки
+        без ключа (None) ни с чем не сопоставляются и добавляются как есть.
+        Журнал переписывается потоково, в памяти держится только входной пакет.
+        """
+        self._ensure_journal()
+        merged: dict = {}
+        new_rows: List[dict] = []
+        for row in rows:
+            self._extend_headers(row.keys())
+            value = row.get(key)
+            if value is None:
+                new_rows.append(dict(row))
+            elif value in merged:
+                merged[value].update(row)
+            else:
+                merged[value] = dict(row)
+                new_rows.append(merged[value])
+
+        tmp_path = f'{self._journal_path}.tmp'
+        matched = set()
+        updated = 0
+        with open(tmp_path, 'w', encoding='utf-8') as tmp:
+            for row in self._iter_journal():
+                value = row.get(key)
+                new_data = merged.get(value) if value is not None else None
+                if new_data is not None:
+                    row.update(new_data)
+                    matched.add(value)
+                    updated += 1
+                tmp.write(json.dumps(row, ensure_ascii=False, default=str))
+                tmp.write('\n')
+        os.replace(tmp_path, self._journal_path)
+        new_rows = [row for row in new_rows if row.get(key) not in matched]
+        self._add_rows_sync(new_rows)
+        logger.info(f'Обновлено строк: {updated}, добавлено: {len(new_rows)}.')
+
+    def _save_sync(self) -> None:
+        """Синхронно собирает итоговый файл из журнала и удаляет журнал."""
+        if not os.path.exists(self._journal_path) and os.path.exists(self.file_path):
+            # Изменений после прошлого сохранения нет
+            return
+        tmp_path = f'{self.file_path}.tmp'
+        if self.is_xlsx:
+            self._write_xlsx(tmp_path)
+        else:
+            self._write_csv(tmp_path)
+        os.replace(tmp_path, self.file_path)
+        if os.path.exists(self._journal_path):
+            os.remove(self._journal_path)
+        logger.info(f'Файл {self.file_path} сохранён.')
+
+    def _write_csv(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8-sig', newline='') as file:
+            writer = csv.writer(file, delimiter=self.delimiter)
+            writer.writerow(self.headers)
+            for row in self._iter_journal():
+                writer.writerow(['' if row.get(h) is None else row.get(h) for h in self.headers])
+
+    def _write_xlsx(self, path: str) -> None:
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.sheet_name)
+        sheet.append(self.headers)
+
+        number_formats = [
+            NUMBER_FORMATS[self.formats[h]] if h in self.formats else None for h in self.headers
+        ]
+        for row in self._iter_journal():
+            cells = []
+            for header, number_format in zip(self.headers, number_formats):
+                value = row.get(header)
+                if number_format is None or value is None:
+                    cells.append(value)
+                    continue
+                cell = WriteOnlyCell(sheet, value=value)
+                cell.number_format = number_format
+                cells.append(cell)
+            sheet.append(cells)
+        workbook.save(path)
+
+    # --- Асинхронный интерфейс ---
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def read_rows(self) -> List[dict]:
+        """
+        Асинхронно читает строки из таблицы.
+
+        :return: Список словарей с данными строк.
+        """
+        return await self._run(self._read_rows_sync)
+
+    async def add_row(self, row_data: dict | list) -> 'FileTableSink':
+        """
+        Асинхронно добавляет новую строку в таблицу.
+
+        :param row_data: Словарь или список с данными для новой строки.
+        :return: Ссылка на экземпляр приёмника.
+        """
+        with METRICS.stage('export', target='file'):
+            await self._run(self._add_rows_sync, [row_data])
+        return self
+
+    async def add_rows(self, rows: List[dict | list]) -> 'FileTableSink':
+        """
+        Асинхронно добавляет несколько строк в таблицу.
+
+        :param rows: Список словарей или списков с данными строк.
+        :return: Ссылка на экземпляр приёмника.
+        """
+        with METRICS.stage('export', target='file'):
+            await self._run(self._add_rows_sync, rows)
+        return self
+
+    async def upsert(self, rows: List[dict], key: str) -> 'FileTableSink':
+        """
+        Асинхронно обновляет строки с совпадающим значением ключевого столбца и добавляет новые.
+
+        Обновляются все строки с совпадающим ключом; входные строки с одинаковым ключом
+        объединяются по порядку, строки без ключа добавляются.
+
+        :param rows: Список словарей с данными строк.
+        :param key: Имя ключевого столбца.
+        :return: Ссылка на экземпляр приёмника.
+        """
+        with METRICS.stage('export', target='file'):
+            await self._run(self._upsert_sync, rows, key)
+        return self
+
+    async def format_column(self, column_name: str, data_type: DataType) -> 'FileTableSink':
+        """
+        Задаёт тип форматирования столбца. Применяется при сохранении xlsx.
+
+        :param column_name: Имя столбца для форматирования.
+        :param data_type: Тип данных для форматирования.
+        :return: Ссылка на экземпляр приёмника.
+        """
+        # Форматы читаются при сохранении в потоке исполнителя, поэтому меняются там же
+        await self._run(self.formats.__setitem__, column_name, data_type)
+        return self
+
+    async def format_columns(self, config: ParserConfig) -> 'FileTableSink':
+        """
+        Задаёт форматирование всех столбцов по типам свойств конфигурации.
+
+        :param config: Конфигурация парсера.
+        :return: Ссылка на экземпляр приёмника.
+        """
+        await self._run(self.formats.update, column_formats(config.all_properties))
+        return self
+
+    async def save(self) -> 'FileTableSink':
+        """
+        Асинхронно собирает итоговый файл из журнала.
+
+        :return: Ссылка на экземпляр приёмника.
+        """
+        with METRICS.stage('export', target='file'):
+            await self._run(self._save_sync)
+        return self
+
+    async def refresh_table(self) -> 'FileTableSink':
+        """Синоним :meth:`save` для совместимости с ExcelTableManager."""
+        return await self.save()
+
+    def __del__(self):
+        """Закрывает исполнитель при уничтожении экземпляра."""
+        self._executor.shutdown(wait=False)
+
+
+# Пример использования и замер скорости записи
+if __name__ == "__main__":
+    import sys
+    import time
+
+    async def main():
+        path = sys.argv[1] if len(sys.argv) > 1 else 'sink_bench.xlsx'
+        count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+        sink = FileTableSink(path, headers=['Модель', 'Ядра', 'Частота', 'Цена'])
+        await sink.format_column('Цена', DataType.RUB)
+        await sink.format_column('Частота', DataType.INTEGER)
+
+        start = time.perf_counter()
+        batch = 1_000
+        for offset in range(0, count, batch):
+            await sink.add_rows([
+                {'Модель': f'CPU {i}', 'Ядра': i % 32, 'Частота': 3000 + i % 1000, 'Цена': 10_000 + i}
+                for i in range(offset, min(offset + batch, count))
+            ])
+        written = time.perf_counter()
+        await sink.save()
+        saved = time.perf_counter()
+
+        logger.info(f'Запись {count} строк: {written - start:.2f} с, сохранение: {saved - written:.2f} с')
+
+    asyncio.run(main())
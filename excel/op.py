@@ -1,7 +1,11 @@
 import pythoncom
 import win32com.client as win32
-from excel import logger
+from excel import logger, appended_rows
 import os
+from contextlib import nullcontext
+
+
+XL_SHIFT_DOWN = -4121
 
 
 def insert_row_into_table(workbook_path: str, sheet_name: str, table_name: str, position: int, row_data: dict):
@@ -14,6 +18,92 @@ def insert_row_into_table(workbook_path: str, sheet_name: str, table_name: str,
     :param position: Позиция вставки (начиная с 1 для первой строки данных).
     :param row_data: Словарь с данными для новой строки. Ключи соответствуют именам столбцов.
     """
+    insert_rows_into_table(workbook_path, sheet_name, table_name, [(position, row_data)])
+
+
+def _group_positions(rows: list[tuple[int, dict]]) -> list[tuple[int, list[dict]]]:
+    """
+    Сортирует вставки по позиции и объединяет идущие подряд в блоки.
+
+    Позиции задаются в итоговой таблице: строка, вставленная на позицию p, окажется p-й строкой данных.
+
+    :param rows: Пары (позиция, данные строки).
+    :return: Список блоков (позиция первой строки, данные строк блока).
+    """
+    blocks: list[tuple[int, list[dict]]] = []
+    for position, row_data in sorted(rows, key=lambda x: x[0]):
+        if blocks and blocks[-1][0] + len(blocks[-1][1]) == position:
+            blocks[-1][1].append(row_data)
+        else:
+            blocks.append((position, [row_data]))
+    return blocks
+
+
+def _column_runs(columns: list[int]) -> list[tuple[int, int]]:
+    """
+    Объединяет номера столбцов в непрерывные диапазоны.
+
+    :param columns: Номера столбцов (с 0).
+    :return: Список диапазонов (первый столбец, количество столбцов).
+    """
+    runs: list[tuple[int, int]] = []
+    for column in sorted(columns):
+        if runs and runs[-1][0] + runs[-1][1] == column:
+            runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+        else:
+            runs.append((column, 1))
+    return runs
+
+
+def _write_block(sht, headers: list, block: list[dict], first_row: int, first_column: int) -> None:
+    """
+    Записывает переданные столбцы блока строк.
+
+    Столбцы, заданные во всех строках блока, записываются одной записью двумерного массива
+    на каждый непрерывный диапазон, остальные - только в переданные ячейки.
+
+    :param sht: Лист (COM-объект Worksheet).
+    :param headers: Заголовки столбцов таблицы.
+    :param block: Данные строк блока.
+    :param first_row: Номер строки листа, с которой начинается блок.
+    :param first_column: Номер первого столбца таблицы на листе.
+    """
+    supplied = [i for i, header in enumerate(headers) if any(header in row_data for row_data in block)]
+    common = [i for i in supplied if all(headers[i] in row_data for row_data in block)]
+
+    # Столбцы, заданные во всех строках: одна запись двумерного массива на диапазон
+    for first, width in _column_runs(common):
+        target = sht.Range(
+            sht.Cells(first_row, first_column + first),
+            sht.Cells(first_row + len(block) - 1, first_column + first + width - 1)
+        )
+        target.Value = [[row_data[header] for header in headers[first:first + width]] for row_data in block]
+
+    # Столбцы, заданные не во всех строках: только переданные ячейки
+    for i in set(supplied) - set(common):
+        for offset, row_data in enumerate(block):
+            if headers[i] in row_data:
+                sht.Cells(first_row + offset, first_column + i).Value = row_data[headers[i]]
+
+
+def insert_rows_into_table(workbook_path: str, sheet_name: str, table_name: str, rows: list[tuple[int, dict]]):
+    """
+    Вставляет несколько строк в указанную таблицу Excel.
+
+    Вставки сортируются по позиции, идущие подряд строки вставляются одним блоком,
+    книга сохраняется один раз. Записываются только переданные столбцы: формулы вычисляемых
+    столбцов и значения по умолчанию в остальных сохраняются. Столбцы, заданные во всех строках
+    блока, заполняются одной записью двумерного массива на каждый непрерывный диапазон.
+
+    :param workbook_path: Путь к файлу Excel.
+    :param sheet_name: Имя листа, содержащего таблицу.
+    :param table_name: Имя таблицы (ListObject).
+    :param rows: Пары (позиция, данные строки). Позиция начинается с 1 для первой строки данных
+        и указывает место строки в итоговой таблице.
+    """
+    if not rows:
+        return
+
     try:
         # Инициализируем COM для текущего потока
         pythoncom.CoInitialize()
@@ -43,35 +133,45 @@ def insert_row_into_table(workbook_path: str, sheet_name: str, table_name: str,
             logger.error(f'Таблица с именем "{table_name}" не найдена на листе "{sheet_name}".')
             return
 
-        # Вставляем новую строку на указанной позиции
-        logger.info(f'Позиция вставки: {position}')
-        if position < 1 or position > table.ListRows.Count + 1:
-            logger.error(f'Некорректная позиция вставки: {position}')
-            return
-
-        new_list_row = table.ListRows.Add(Position=position, AlwaysInsert=True)
-        logger.info(f'Вставлена новая строка на позиции {position}.')
-
         # Получаем заголовки столбцов таблицы
-
         headers = sht.Range(table.HeaderRowRange.Address).Value[0]
         logger.info(f'Заголовки таблицы: {headers}')
 
-        # Заполняем новую строку данными
-        for header, value in row_data.items():
-            if header in headers:
-                col_index = headers.index(header) + 1
-                sht.Cells(new_list_row.Range.Row, col_index).Value = value
+        for header in {header for _, row_data in rows for header in row_data} - set(headers):
+            logger.warning(f'Столбец "{header}" не найден в таблице.')
+
+        first_column = table.Range.Column
+        header_row = table.HeaderRowRange.Row
+        inserted = 0
+
+        for position, block in _group_positions(rows):
+            count = table.ListRows.Count
+            if position < 1 or position > count + 1:
+                logger.error(f'Некорректная позиция вставки: {position}')
+                continue
+
+            if position <= count:
+                # Вставка внутри таблицы: сдвигаем строки вниз, таблица расширяется сама
+                table.ListRows(position).Range.Resize(len(block)).Insert(Shift=XL_SHIFT_DOWN)
+                extended = nullcontext(header_row + position)
             else:
-                logger.warning(f'Столбец "{header}" не найден в таблице.')
+                # Вставка в конец: одно расширение диапазона таблицы
+                extended = appended_rows(table, len(block))
+
+            with extended as first_row:
+                _write_block(sht, headers, block, first_row, first_column)
 
-        logger.info('Новая строка успешно добавлена и заполнена данными.')
+            inserted += len(block)
+            logger.info(f'Вставлено строк: {len(block)} начиная с позиции {position}.')
+
+        logger.info(f'Всего вставлено строк: {inserted}.')
 
         # Сохраняем рабочую книгу
-        wb.Save()
+        if inserted:
+            wb.Save()
 
     except Exception as e:
-        logger.error(f'Ошибка при вставке строки: {e}')
+        logger.error(f'Ошибка при вставке строк: {e}')
     finally:
         # Деинициализируем COM для текущего потока
         pythoncom.CoUninitialize()
@@ -0,0 +1,10 @@
+from ._registry import MetricsRegistry, Histogram, Counter, METRICS
+from ._trace import Tracer, TRACER
+
+
+def __getattr__(name: str):
+    # HTTP-сервер (и http.server) импортируется только при первом обращении к serve
+    if name == 'serve':
+        from ._server import serve
+        return serve
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,258 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from ._trace import TRACER
+
+PREFIX = 'ymparser'
+
+DEFAULT_BUCKETS = (.001, .005, .01, .025, .05, .1, .25, .5, 1., 2.5, 5., 10., 30., 60.)
+
+
+class Histogram:
+    """
+    Гистограмма наблюдений с фиксированными границами корзин.
+
+    :var buckets: Верхние границы корзин.
+    :var counts: Количество наблюдений в каждой корзине (последняя - +Inf).
+    :var sum: Сумма наблюдений.
+    :var count: Количество наблюдений.
+    """
+    buckets: tuple[float, ...]
+    counts: list[int]
+    sum: float
+    count: int
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'buckets': dict(zip(map(str, self.buckets + (float('inf'),)), self.counts)),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+class Counter:
+    """Монотонно растущий счётчик."""
+    value: float
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def to_dict(self) -> dict:
+        return {'value': self.value}
+
+
+class _Stage:
+    """Контекст замера длительности этапа. При включённой трассировке этап записывается и как интервал."""
+    __slots__ = ('_registry', '_stage', '_labels', '_started')
+
+    def __init__(self, registry: "MetricsRegistry", stage: str, labels: dict) -> None:
+        self._registry = registry
+        self._stage = stage
+        self._labels = labels
+
+    def __enter__(self) -> "_Stage":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        elapsed = time.perf_counter() - self._started
+        if self._registry.enabled:
+            self._registry._observe('stage_seconds', (('stage', self._stage), *sorted(self._labels.items())),
+                                    elapsed)
+        if TRACER.enabled:
+            TRACER.complete(self._stage, elapsed, self._started, **self._labels)
+
+
+class _NoopStage:
+    """Пустой контекст, используемый при отключённых метриках."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopStage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class MetricsRegistry:
+    """
+    Реестр метрик конвейера: гистограммы длительностей этапов и счётчики событий.
+
+    Пока реестр отключён, все методы записи возвращаются сразу, а :meth:`stage`
+    отдаёт общий пустой контекст, поэтому накладные расходы близки к нулю.
+
+    :var enabled: Включён ли сбор метрик.
+    """
+    enabled: bool
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, tuple], Histogram] = {}
+        self._counters: dict[tuple[str, tuple], Counter] = {}
+
+    def enable(self) -> "MetricsRegistry":
+        self.enabled = True
+        return self
+
+    def disable(self) -> "MetricsRegistry":
+        self.enabled = False
+        return self
+
+    def reset(self) -> "MetricsRegistry":
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+        return self
+
+    def stage(self, stage: str, **labels: str):
+        """
+        Контекст замера длительности этапа конвейера (гистограмма ``stage_seconds``
+        и интервал трассировки, если она включена).
+
+        :param stage: Имя этапа.
+        :param labels: Дополнительные метки.
+        """
+        if not self.enabled and not TRACER.enabled:
+            return _NOOP_STAGE
+        return _Stage(self, stage, labels)
+
+    def observe_stage(self, stage: str, seconds: float, **labels: str) -> None:
+        """
+        Записывает уже измеренную длительность этапа.
+
+        :param stage: Имя этапа.
+        :param seconds: Длительность, с.
+        :param labels: Дополнительные метки.
+        """
+        if self.enabled:
+            self._observe('stage_seconds', (('stage', stage), *sorted(labels.items())), seconds)
+        if TRACER.enabled:
+            TRACER.complete(stage, seconds, **labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Записывает наблюдение в гистограмму.
+
+        :param name: Имя гистограммы.
+        :param value: Значение.
+        :param labels: Метки.
+        """
+        if self.enabled:
+            self._observe(name, tuple(sorted(labels.items())), value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """
+        Увеличивает счётчик.
+
+        :param name: Имя счётчика.
+        :param amount: Величина увеличения.
+        :param labels: Метки.
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = Counter()
+            counter.inc(amount)
+
+    def _observe(self, name: str, labels: tuple, value: float) -> None:
+        key = (name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def to_dict(self) -> dict:
+        """Возвращает снимок всех метрик в виде словаря."""
+        with self._lock:
+            return {
+                'histograms': [
+                    {'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), **counter.to_dict()}
+                    for (name, labels), counter in self._counters.items()
+                ],
+            }
+
+    def dump_json(self, file_path: Optional[str] = None) -> str:
+        """
+        Сериализует снимок метрик в JSON.
+
+        :param file_path: Путь к файлу. Если указан, JSON также записывается в файл.
+        :return: Строка JSON.
+        """
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        if file_path is not None:
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        return text
+
+    def to_prometheus(self) -> str:
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        declared = set()
+        for (name, labels), histogram in histograms:
+            full_name = f'{PREFIX}_{name}'
+            if full_name not in declared:
+                declared.add(full_name)
+                lines.append(f'# TYPE {full_name} histogram')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{full_name}_bucket{_format_labels(labels + (("le", le),))} {cumulative}')
+            lines.append(f'{full_name}_sum{_format_labels(labels)} {histogram.sum}')
+            lines.append(f'{full_name}_count{_format_labels(labels)} {histogram.count}')
+
+        for (name, labels), counter in counters:
+            full_name = f'{PREFIX}_{name}_total'
+            if full_name not in declared:
+                declared.add(full_name)
+                lines.append(f'# TYPE {full_name} counter')
+            lines.append(f'{full_name}{_format_labels(labels)} {counter.value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in labels
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+# Общий реестр метрик приложения
+METRICS = MetricsRegistry()
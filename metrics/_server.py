@@ -0,0 +1,48 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from metrics._registry import METRICS, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def serve(port: int = 9108, host: str = '127.0.0.1', registry: MetricsRegistry = METRICS,
+          _logger: Optional[logging.Logger] = logger) -> ThreadingHTTPServer:
+    """
+    Запускает локальный HTTP-сервер метрик в фоновом потоке и включает сбор метрик.
+
+    ``/metrics`` отдаёт текстовый формат Prometheus, ``/metrics.json`` - JSON.
+
+    :param port: Порт.
+    :param host: Адрес. По умолчанию сервер доступен только локально.
+    :param registry: Реестр метрик.
+    :param _logger: Объект логгера.
+    :return: Запущенный сервер (остановка - ``server.shutdown()``).
+    """
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = registry.to_prometheus(), 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body, content_type = registry.dump_json(), 'application/json; charset=utf-8'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            _logger.debug(format, *args)
+
+    registry.enable()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    _logger.info("Сервер метрик запущен: http://%s:%s/metrics", host, port)
+    return server
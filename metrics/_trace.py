@@ -0,0 +1,177 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Дорожка (tid) текущего URL; копируется в задачи asyncio и в asyncio.to_thread вместе с контекстом
+_TRACK: contextvars.ContextVar[int] = contextvars.ContextVar('trace_track', default=0)
+
+
+class _Span:
+    """Контекст записи интервала."""
+    __slots__ = ('_tracer', '_name', '_args', '_started')
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+
+    def __enter__(self) -> "_Span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            self._args['error'] = exc_type.__name__
+        self._tracer.complete(self._name, time.perf_counter() - self._started, self._started, **self._args)
+
+
+class _NoopSpan:
+    """Пустой контекст, используемый при отключённой трассировке."""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Трассировка обработки отдельных URL в формате Chrome trace-event.
+
+    Каждому URL выделяется своя дорожка (tid), на которой интервалы этапов вкладываются
+    друг в друга, поэтому в Perfetto или chrome://tracing видно, где конкретная страница
+    ждала очереди, навигации, капчи или извлечения и что выполнялось параллельно.
+    Пока трассировка отключена, методы записи возвращаются сразу.
+
+    :var enabled: Включена ли трассировка.
+    :var max_events: Предел числа событий; после него новые события отбрасываются.
+    """
+    enabled: bool
+    max_events: int
+
+    def __init__(self, enabled: bool = False, max_events: int = 1_000_000) -> None:
+        self.enabled = enabled
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._events: list[dict] = []
+        self._tracks: dict[str, int] = {}
+        self._dropped = 0
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def enable(self) -> "Tracer":
+        self.enabled = True
+        return self
+
+    def disable(self) -> "Tracer":
+        self.enabled = False
+        return self
+
+    def reset(self) -> "Tracer":
+        with self._lock:
+            self._events.clear()
+            self._tracks.clear()
+            self._dropped = 0
+            self._origin = time.perf_counter()
+        return self
+
+    def _append(self, event: dict) -> None:
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self._dropped += 1
+                return
+            self._events.append(event)
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[int]:
+        """
+        Направляет события внутри блока (и в порождённых им задачах) на дорожку ``name``.
+
+        :param name: Имя дорожки, обычно канонический URL.
+        :return: Идентификатор дорожки.
+        """
+        if not self.enabled:
+            yield 0
+            return
+        with self._lock:
+            tid = self._tracks.get(name)
+            if tid is None:
+                tid = self._tracks[name] = len(self._tracks) + 1
+                self._events.append({'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid,
+                                     'args': {'name': name}})
+        token = _TRACK.set(tid)
+        try:
+            yield tid
+        finally:
+            _TRACK.reset(token)
+
+    def span(self, name: str, **args):
+        """
+        Контекст записи интервала на текущей дорожке.
+
+        :param name: Имя интервала.
+        :param args: Дополнительные сведения, отображаемые в просмотрщике.
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, args)
+
+    def complete(self, name: str, seconds: float, started: Optional[float] = None, **args) -> None:
+        """
+        Записывает уже измеренный интервал.
+
+        :param name: Имя интервала.
+        :param seconds: Длительность, с.
+        :param started: Начало по ``time.perf_counter``. По умолчанию интервал заканчивается сейчас.
+        :param args: Дополнительные сведения.
+        """
+        if not self.enabled:
+            return
+        if started is None:
+            started = time.perf_counter() - seconds
+        self._append({'name': name, 'cat': 'ymparser', 'ph': 'X', 'pid': self._pid, 'tid': _TRACK.get(),
+                      'ts': (started - self._origin) * 1e6, 'dur': seconds * 1e6, 'args': args})
+
+    def instant(self, name: str, **args) -> None:
+        """
+        Записывает мгновенное событие на текущей дорожке.
+
+        :param name: Имя события.
+        :param args: Дополнительные сведения.
+        """
+        if not self.enabled:
+            return
+        self._append({'name': name, 'cat': 'ymparser', 'ph': 'i', 's': 't', 'pid': self._pid, 'tid': _TRACK.get(),
+                      'ts': (time.perf_counter() - self._origin) * 1e6, 'args': args})
+
+    def to_dict(self) -> dict:
+        """Возвращает записанные события в формате Chrome trace-event."""
+        with self._lock:
+            events = list(self._events)
+            dropped = self._dropped
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'dropped_events': dropped}}
+
+    def dump_json(self, file_path: Optional[str] = None) -> str:
+        """
+        Сериализует трассу в JSON.
+
+        :param file_path: Путь к файлу. Если указан, JSON также записывается в файл.
+        :return: Строка JSON.
+        """
+        text = json.dumps(self.to_dict(), ensure_ascii=False)
+        if file_path is not None:
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(text)
+        return text
+
+
+TRACER = Tracer()
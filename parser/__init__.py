@@ -4,11 +4,12 @@ import threading
 import traceback
 from typing import Optional
 
-import pyperclip
-
 from datatype import *
-from parser._utils import clean_url
+from datatype._classes import PageResult
+from metrics import METRICS, TRACER
+from parser._utils import clean_url, extract
 from parser.get_page import PageExtractor
+from storage import ResultStore
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
@@ -34,25 +35,41 @@ class Watchdog:
         self._web_parser = web_parser
 
     async def start(self, background: bool = False):
-        if self._watchdog:
-            self._watchdog.cancel()
+        # События наблюдения пишутся на отдельную дорожку трассы; задача наследует её с контекстом
+        with TRACER.track('watchdog'):
+            if self._watchdog:
+                TRACER.instant('watchdog_restart', background=background)
+                self._watchdog.cancel()
+            else:
+                TRACER.instant('watchdog_start', background=background)
 
-        if background:
-            self._watchdog = asyncio.create_task(self._watch(), name="watchdog")
-            self._logger.info("Наблюдение за буфером обмена запущено в фоновом режиме.")
-        else:
-            self._logger.info("Наблюдение за буфером обмена запущено в интерактивном режиме.")
-            await self._watch()
+            if background:
+                self._watchdog = asyncio.create_task(self._watch(), name="watchdog")
+                self._logger.info("Наблюдение за буфером обмена запущено в фоновом режиме.")
+            else:
+                self._logger.info("Наблюдение за буфером обмена запущено в интерактивном режиме.")
+                await self._watch()
 
     async def _watch(self):
+        import pyperclip
+
         _last_val = pyperclip.paste()
-        while True:
-            await asyncio.sleep(.5)
-            val = pyperclip.paste()
-            if val != _last_val:
-                self._logger.info("Новое значение в буфере обмена: %s", val)
-                threading.Thread(target=self._parse, args=(asyncio.get_event_loop(), val)).start()
-                _last_val = val
+        try:
+            while True:
+                await asyncio.sleep(.5)
+                # Чтение буфера обмена выполняется в цикле событий: долгая проверка видна в трассе
+                with TRACER.span('watchdog_check'):
+                    val = pyperclip.paste()
+                if val != _last_val:
+                    self._logger.info("Новое значение в буфере обмена: %s", val)
+                    # Отметка на дорожке товара: промежуток до начала парсинга - ожидание запуска
+                    with TRACER.track(self._web_parser.canonical_url(val)):
+                        TRACER.instant('watchdog_detected', url=val)
+                    threading.Thread(target=self._parse, args=(asyncio.get_event_loop(), val)).start()
+                    _last_val = val
+        except asyncio.CancelledError:
+            TRACER.instant('watchdog_cancelled')
+            raise
 
     def _parse(self, loop: asyncio.AbstractEventLoop, url: str) -> None:
         _res = asyncio.run_coroutine_threadsafe(self._web_parser.parse(url), loop=loop)  # self._web_parser.parse(url)
@@ -67,15 +84,28 @@ class WebPageParser:
     # _session: Optional[ClientSession] = None
     _watchdog: Optional[Watchdog] = None
     _config: Optional[ParserConfig] = None
+    _store: Optional[ResultStore] = None
+    _in_flight: dict[str, asyncio.Task]
 
-    def __init__(self, config: Optional[ParserConfig] = None, _logger: Optional[logging.Logger] = logger) -> None:
+    def __init__(self, config: Optional[ParserConfig] = None, _logger: Optional[logging.Logger] = logger,
+                 store: Optional[ResultStore] = None, early_extraction: bool = False,
+                 ready_required: float = 1., ready_deadline: float = 10.) -> None:
         """
         Инициализирует WebPageParser.
 
         :param _logger: Объект логгера. Если не указан, используется глобальный логгер.
+        :param store: Хранилище результатов. Если указано, каждый результат сохраняется в историю.
+        :param early_extraction: Не ждать полной загрузки страницы, если данные для групп уже на странице.
+        :param ready_required: Доля свойств группы, которые должны быть найдены для раннего извлечения.
+        :param ready_deadline: Время ожидания данных, после которого страница дожидается полной загрузки, с.
         """
         self.logger = _logger
         self._config = config
+        self._store = store
+        self.early_extraction = early_extraction
+        self.ready_required = ready_required
+        self.ready_deadline = ready_deadline
+        self._in_flight = {}
         self._initialize()
 
     def _initialize(self) -> None:
@@ -127,13 +157,67 @@ class WebPageParser:
     #         logger.debug("Конфигурация загружена из файла: %s", file_path)
     #         return PropertyGroup.from_config(config)
 
+    def _ready(self, html: str) -> bool:
+        """Проверяет, есть ли на странице данные хотя бы для одной группы свойств."""
+        state = PageState(html)
+        return any(group.ready(html, self.ready_required, state=state) for group in self._config.property_groups)
+
+    def _extract(self, page: PageResult, source: str) -> list[ParseResult]:
+        """
+        Извлекает значения свойств всех групп из страницы.
+
+        :param page: Полученная страница.
+        :param source: Источник (URL) для результатов.
+        :return: Результаты по каждой группе.
+        """
+        return extract(self._config, page, source)
+
+    def canonical_url(self, url: str) -> str:
+        """
+        Приводит URL товара к каноническому виду (ключ для дедупликации и хранилища).
+
+        :param url: Исходный URL.
+        :return: Канонический URL.
+        """
+        if self._config is None:
+            return clean_url(url)
+        return self._config.canonical_url(url)
+
     async def parse(self, url: str) -> ParseResult:
         """
         Парсит веб-страницу по указанному URL и извлекает значения свойств.
 
+        Одновременные запросы одного и того же товара (по каноническому URL) объединяются:
+        страница загружается и разбирается один раз, результат получают все вызвавшие.
+
         :param url: URL веб-страницы для парсинга.
         :return: Объект ParseResult с результатами парсинга.
         """
+        source = self.canonical_url(url)
+        task = self._in_flight.get(source)
+        if task is None:
+            # Задача копирует контекст при создании, поэтому все её этапы (в том числе в потоках
+            # извлечения) попадают на дорожку трассы этого товара
+            with TRACER.track(source):
+                task = asyncio.ensure_future(self._parse_page(url, source))
+            self._in_flight[source] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(source, None))
+        else:
+            METRICS.inc('parse_coalesced')
+            with TRACER.track(source):
+                TRACER.instant('parse_coalesced', url=url)
+            self.logger.debug("Запрос %s объединён с уже выполняемым: %s", url, source)
+        # Отмена одного из ожидающих не должна отменять общую загрузку
+        return await asyncio.shield(task)
+
+    async def _parse_page(self, url: str, source: str) -> ParseResult:
+        """
+        Загружает страницу и извлекает значения свойств.
+
+        :param url: URL веб-страницы для загрузки.
+        :param source: Канонический URL товара для результатов.
+        :return: Объект ParseResult с результатами парсинга.
+        """
         # headers = {
         #     'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;'
         #               'q=0.8,application/signed-exchange;v=b3;q=0.9',
@@ -159,15 +243,42 @@ class WebPageParser:
             #     text = await response.text()
             #     with open('log.html', 'w', encoding='utf-8') as f:
             #         f.write(text.replace(r'"/', '"https://market.yandex.ru/'))
-            data = await PageExtractor.get(url)
+            with METRICS.stage('parse'):
+                options = dict(
+                    regions=self._config.extraction_regions or None,
+                    capture=self._config.api_patterns or None,
+                    # Если все свойства берутся из ответов API, разметка страницы не нужна
+                    capture_only=all(prop.source == 'api' for prop in self._config.all_properties),
+                    selectors=[selector.to_request() for selector in self._config.dom_selectors] or None,
+                    ready_deadline=self.ready_deadline,
+                    source=source
+                )
+                if self.early_extraction:
+                    data = await PageExtractor.get(url, ready=self._ready, **options)
+                else:
+                    data = await PageExtractor.get(url, **options)
 
-            results = [group.pars(data.content, clean_url(url)) for group in self._config.property_groups]
+                # Извлечение выполняется вне цикла событий, чтобы медленная сигнатура не останавливала его
+                results = await asyncio.to_thread(self._extract, data, source)
 
-            return sorted(results, key=lambda x: x.rate, reverse=True)[0]
+                result = sorted(results, key=lambda x: x.rate, reverse=True)[0]
         except Exception as e:
+            METRICS.inc('parse_errors')
             self.logger.error("Ошибка при парсинге страницы %s: %s номер строки %s", url, e, traceback.format_exc())
             return ParseResult.empty()
 
+        METRICS.inc('parse_results', group=result.name)
+        # Вне блока try: ошибка хранилища не должна превращать полученный результат в пустой
+        if self._store is not None:
+            with METRICS.stage('export', target='store'):
+                self._store.add(result)
+        return result
+
+    @property
+    def store(self) -> Optional[ResultStore]:
+        """Хранилище результатов, в которое сохраняется каждый результат парсинга."""
+        return self._store
+
     async def start_watch(self, background: bool = False) -> None:
         """
         Запускает наблюдение за буфером обмена и парсинг веб-страниц.
@@ -179,9 +290,33 @@ class WebPageParser:
 
 if __name__ == "__main__":
     async def main():
-        config = ParserConfig.load('cfg.zip')
-        parser = WebPageParser(config=config)
-        await parser.start_watch()
+        import os
+
+        if os.environ.get('YMPARSER_METRICS_PORT'):
+            from metrics import serve
+            serve(int(os.environ['YMPARSER_METRICS_PORT']))
+        # Трасса по URL в формате Chrome trace-event (открывается в Perfetto)
+        trace_path = os.environ.get('YMPARSER_TRACE')
+        if trace_path:
+            TRACER.enable()
+
+        # Запись полученных страниц или воспроизведение их без браузера.
+        # Браузер запускается в фоне, пока загружается конфигурация
+        prewarm = PageExtractor.prewarm(
+            record_dir=os.environ.get('YMPARSER_RECORD_DIR'),
+            replay_dir=os.environ.get('YMPARSER_REPLAY_DIR'),
+            record_har=bool(os.environ.get('YMPARSER_RECORD_HAR'))
+        )
+
+        config = await asyncio.to_thread(ParserConfig.load, 'cfg.zip')
+        await prewarm
+        try:
+            with ResultStore('results.sqlite3', batch_size=1) as store:
+                parser = WebPageParser(config=config, store=store)
+                await parser.start_watch()
+        finally:
+            if trace_path:
+                TRACER.dump_json(trace_path)
 
 
     asyncio.run(main())
@@ -1,2 +1,22 @@
+from datatype import ParserConfig, ParseResult, PageState
+from datatype._classes import PageResult
+
+
 def clean_url(url: str) -> str:
     return url.split('?', maxsplit=1)[0]
+
+
+def extract(config: ParserConfig, page: PageResult, source: str) -> list[ParseResult]:
+    """
+    Извлекает значения свойств всех групп конфигурации из страницы.
+
+    JSON-состояние страницы разбирается один раз и используется всеми группами.
+
+    :param config: Конфигурация парсера.
+    :param page: Страница.
+    :param source: Источник (URL) для результатов.
+    :return: Результаты по каждой группе.
+    """
+    state = PageState(page.content, page.payloads, page.dom)
+    payloads = page.payload_text
+    return [group.pars(page.content, source, payloads, state) for group in config.property_groups]
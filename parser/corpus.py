@@ -0,0 +1,220 @@
+"""
+Повторное извлечение свойств из архива сохранённых страниц без повторной загрузки.
+
+Страницы архива (:class:`parser.get_page._archive.PageArchive`) распределяются по пулу
+процессов. Конфигурация загружается один раз в каждом процессе, в процесс передаются только
+пути к файлам, а содержимое страницы читается через mmap. Результаты потоково пишутся
+в JSONL или CSV и/или в хранилище результатов.
+
+Пример::
+
+    python -m parser.corpus records/ --config cfg.zip --out results.jsonl --store results.sqlite3
+"""
+import argparse
+import csv
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from typing import Iterator, Optional, TextIO
+
+from datatype import ParserConfig, ParseResult
+from datatype._classes import PageResult
+from parser._utils import extract
+from parser.get_page._archive import PageArchive
+from storage import ResultStore
+
+logger = logging.getLogger(__name__)
+
+# Конфигурация процесса пула, загружается инициализатором один раз
+_worker_config: Optional[ParserConfig] = None
+
+
+def _init_worker(config_path: str) -> None:
+    global _worker_config
+    _worker_config = ParserConfig.load(config_path)
+
+
+def read_mapped(path: str) -> str:
+    """
+    Читает текстовый файл через mmap, без промежуточного буфера чтения.
+
+    :param path: Путь к файлу.
+    :return: Содержимое файла.
+    """
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            # Пустой файл отобразить в память нельзя
+            return ''
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, 'utf-8')
+
+
+def _extract_entry(entry: tuple[str, str]) -> tuple[str, Optional[ParseResult], Optional[float], Optional[str]]:
+    """
+    Извлекает свойства одной страницы архива в процессе пула.
+
+    :param entry: Пути к метаданным и содержимому страницы.
+    :return: URL, лучший результат, время получения страницы и текст ошибки.
+    """
+    meta_path, html_path = entry
+    url = meta_path
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        url = meta['url']
+        page = PageResult(url=url, title=meta.get('title', ''), content=read_mapped(html_path),
+                          payloads=meta.get('payloads') or {}, dom=meta.get('dom') or {})
+        results = extract(_worker_config, page, _worker_config.canonical_url(url))
+        return url, max(results, key=lambda x: x.rate), meta.get('fetched_at'), None
+    except Exception as e:
+        return url, None, None, f'{type(e).__name__}: {e}'
+
+
+class _ResultWriter:
+    """Потоковая запись результатов в JSONL или CSV (по расширению файла)."""
+
+    FIXED_COLUMNS = ['source', 'group', 'rate', 'fetched_at']
+
+    def __init__(self, file_path: str, property_names: list[str], delimiter: str = ';') -> None:
+        self.is_csv = file_path.lower().endswith('.csv')
+        self._file: TextIO = open(file_path, 'w', encoding='utf-8-sig' if self.is_csv else 'utf-8', newline='')
+        self._csv = None
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, self.FIXED_COLUMNS + property_names, delimiter=delimiter,
+                                       extrasaction='ignore')
+            self._csv.writeheader()
+
+    def write(self, result: ParseResult, fetched_at: Optional[float]) -> None:
+        if self._csv is not None:
+            row = {'source': result.source, 'group': result.name, 'rate': round(result.rate, 3),
+                   'fetched_at': fetched_at}
+            row.update((prop.name, prop.value) for prop in result.properties)
+            self._csv.writerow(row)
+        else:
+            self._file.write(json.dumps({**result.to_dict(), 'fetched_at': fetched_at}, ensure_ascii=False,
+                                        default=str))
+            self._file.write('\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CorpusRunner:
+    """
+    Повторное извлечение свойств из архива страниц на всех ядрах.
+
+    :var archive: Архив страниц.
+    :var config_path: Путь к файлу конфигурации парсера.
+    :var workers: Количество процессов.
+    :var chunksize: Количество страниц, передаваемых процессу за раз.
+    """
+
+    archive: PageArchive
+    config_path: str
+    workers: int
+    chunksize: int
+
+    def __init__(self, archive_dir: str, config_path: str, workers: Optional[int] = None, chunksize: int = 16,
+                 _logger: Optional[logging.Logger] = logger) -> None:
+        """
+        Инициализирует обработчик архива.
+
+        :param archive_dir: Каталог архива страниц.
+        :param config_path: Путь к файлу конфигурации парсера.
+        :param workers: Количество процессов. По умолчанию - по числу ядер.
+        :param chunksize: Количество страниц, передаваемых процессу за раз.
+        """
+        if not os.path.isdir(archive_dir):
+            raise FileNotFoundError(f"Каталог архива не найден: {archive_dir}")
+        self.archive = PageArchive(archive_dir)
+        self.config_path = config_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.logger = _logger
+
+    def results(self) -> Iterator[tuple[str, Optional[ParseResult], Optional[float], Optional[str]]]:
+        """
+        Извлекает свойства всех страниц архива. Результаты выдаются по мере готовности, не по порядку.
+
+        :return: Итератор кортежей: URL, лучший результат, время получения страницы, текст ошибки.
+        """
+        with multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=(self.config_path,)) as pool:
+            yield from pool.imap_unordered(_extract_entry, self.archive.entries(), chunksize=self.chunksize)
+
+    def run(self, out_path: Optional[str] = None, store: Optional[ResultStore] = None) -> dict:
+        """
+        Извлекает свойства всех страниц архива и сохраняет результаты.
+
+        :param out_path: Файл результатов (.jsonl или .csv).
+        :param store: Хранилище результатов. Время проверки - время получения страницы.
+        :return: Отчёт: количество страниц и ошибок, время, страниц/с всего и на одно ядро.
+        """
+        writer = None
+        if out_path is not None:
+            config = ParserConfig.load(self.config_path)
+            property_names = list(dict.fromkeys(prop.name for prop in config.all_properties))
+            writer = _ResultWriter(out_path, property_names)
+
+        pages = errors = 0
+        started = time.perf_counter()
+        try:
+            for url, result, fetched_at, error in self.results():
+                pages += 1
+                if error is not None:
+                    errors += 1
+                    self.logger.warning("Ошибка извлечения %s: %s", url, error)
+                    continue
+                if writer is not None:
+                    writer.write(result, fetched_at)
+                if store is not None:
+                    store.add(result, checked_at=fetched_at)
+        finally:
+            if writer is not None:
+                writer.close()
+            if store is not None:
+                store.flush()
+        elapsed = time.perf_counter() - started
+
+        pages_per_sec = pages / elapsed if elapsed else 0.
+        return {
+            'pages': pages,
+            'errors': errors,
+            'workers': self.workers,
+            'elapsed': elapsed,
+            'pages_per_sec': pages_per_sec,
+            'pages_per_sec_per_core': pages_per_sec / self.workers,
+        }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    arg_parser = argparse.ArgumentParser(description='Повторное извлечение свойств из архива страниц')
+    arg_parser.add_argument('archive', help='Каталог архива страниц (YMPARSER_RECORD_DIR)')
+    arg_parser.add_argument('--config', default='cfg.zip', help='Файл конфигурации парсера')
+    arg_parser.add_argument('--out', metavar='PATH', help='Файл результатов (.jsonl или .csv)')
+    arg_parser.add_argument('--store', metavar='PATH', help='Хранилище результатов (SQLite)')
+    arg_parser.add_argument('--workers', type=int, help='Количество процессов (по умолчанию - по числу ядер)')
+    arg_parser.add_argument('--chunksize', type=int, default=16, help='Страниц на одну передачу процессу')
+    args = arg_parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    runner = CorpusRunner(args.archive, args.config, args.workers, args.chunksize)
+    store = ResultStore(args.store) if args.store else None
+    try:
+        report = runner.run(args.out, store)
+    finally:
+        if store is not None:
+            store.close()
+
+    logger.info('Страниц: %s (ошибок %s), процессов: %s, время %.2f с', report['pages'], report['errors'],
+                report['workers'], report['elapsed'])
+    logger.info('Производительность: %.1f страниц/с, %.1f страниц/с на ядро', report['pages_per_sec'],
+                report['pages_per_sec_per_core'])
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,56 @@
 import asyncio
 import logging
-from typing import List, Optional
+import os
+import time
+from typing import Callable, List, Optional, TYPE_CHECKING
+from urllib.parse import urlsplit
 
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+if TYPE_CHECKING:
+    # playwright импортируется при запуске браузера, а не при импорте пакета
+    from playwright.async_api import Playwright, Browser, Page, BrowserContext
 
 from datatype._classes import PageResult
+from metrics import METRICS, TRACER
+from parser.get_page._archive import PageArchive
+from parser.get_page._browser import BrowserSettings
+from parser.get_page._capture import ResponseCapture
+from parser.get_page._governor import GovernorSettings, HostGovernor, RequestOutcome
+from parser.get_page._session import BrowserSession, browser_rss_mb, descendant_pids, launched_browser_pid
+
+# Собирает разметку элементов по списку CSS-селекторов за один вызов evaluate
+_REGIONS_SCRIPT = """
+selectors => {
+    const parts = [];
+    for (const selector of selectors) {
+        for (const element of document.querySelectorAll(selector)) {
+            parts.push(element.outerHTML);
+        }
+    }
+    return parts;
+}
+"""
+
+# Получает значения всех DOM-селекторов за один вызов evaluate: ключ селектора -> текст или атрибут
+_SELECTORS_SCRIPT = """
+selectors => {
+    const values = {};
+    for (const selector of selectors) {
+        let element = null;
+        try {
+            element = selector.kind === 'xpath'
+                ? document.evaluate(selector.query, document, null,
+                                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                : document.querySelector(selector.query);
+        } catch (e) {
+            element = null;
+        }
+        const value = !element ? null
+            : selector.attr ? element.getAttribute(selector.attr) : element.textContent;
+        values[selector.key] = value === null ? null : value.trim();
+    }
+    return values;
+}
+"""
 
 
 class PageExtractor:
@@ -18,82 +64,546 @@ class PageExtractor:
     """
 
     _instance = None
-    _lock = asyncio.Lock()
+    _lock: Optional[asyncio.Lock] = None
+    _lock_loop: Optional[asyncio.AbstractEventLoop] = None
+    _prewarm_task: Optional[asyncio.Task] = None
+
+    # Через сколько страниц проверяется RSS браузера
+    RSS_CHECK_PAGES = 10
 
     patterns: List[str]
-    driver: Optional[async_playwright]
-    browser: Optional[Browser]
-    context: Optional[BrowserContext]
+    driver: Optional["Playwright"]
+    session: Optional[BrowserSession]
     # window: Optional[gw.BaseWindow]
     logger: Optional[logging.Logger]
+    governor_settings: GovernorSettings
+    governors: dict[str, HostGovernor]
+    record: Optional[PageArchive]
+    replay: Optional[PageArchive]
+    har_path: Optional[str]
+    browser_settings: BrowserSettings
+    profile: str
 
     def __init__(
             self,
-            _logger: Optional[logging.Logger] = None
+            _logger: Optional[logging.Logger] = None,
+            governor_settings: Optional[GovernorSettings] = None,
+            record_dir: Optional[str] = None,
+            replay_dir: Optional[str] = None,
+            record_har: bool = False,
+            browser_settings: Optional[BrowserSettings] = None
     ) -> None:
         """
         Инициализирует PageExtractor с заданными параметрами.
+
+        :param governor_settings: Настройки регулятора нагрузки на хост.
+        :param record_dir: Каталог для записи полученных страниц (режим записи).
+        :param replay_dir: Каталог с записанными страницами (режим воспроизведения, без браузера).
+        :param record_har: В режиме записи сохранять сетевые ответы сессии в HAR.
+        :param browser_settings: Настройки запуска браузера. По умолчанию - из переменных окружения.
         """
         self.logger = _logger or logging.getLogger(__name__)
+        self.governor_settings = governor_settings or GovernorSettings()
+        self.browser_settings = browser_settings or BrowserSettings.from_env()
+        # Метка для сравнения первого запуска с запуском на сохранённом профиле
+        self.profile = 'warm' if self.browser_settings.warm else 'cold'
+        self.governors = {}
+        self.driver = self.session = None
+        self._generation = 0
+        self._rss_checked = 0
+        self._rotate_lock = asyncio.Lock()
+        self._retiring: set[asyncio.Task] = set()
+
+        if record_dir and replay_dir:
+            raise ValueError("Режимы записи и воспроизведения не могут быть включены одновременно")
+        self.record = PageArchive(record_dir) if record_dir else None
+        self.replay = PageArchive(replay_dir) if replay_dir else None
+        self.har_path = os.path.join(record_dir, f'session-{int(time.time())}.har') if record_har and record_dir \
+            else None
+
+    def _governor(self, url: str) -> HostGovernor:
+        """Возвращает регулятор нагрузки для хоста URL."""
+        host = urlsplit(url).netloc
+        if host not in self.governors:
+            self.governors[host] = HostGovernor(host, self.governor_settings, _logger=self.logger)
+        return self.governors[host]
+
+    @property
+    def browser(self) -> Optional["Browser"]:
+        """Браузер текущей сессии (None для постоянного профиля)."""
+        return self.session.browser if self.session is not None else None
+
+    @property
+    def context(self) -> Optional["BrowserContext"]:
+        """Контекст браузера текущей сессии."""
+        return self.session.context if self.session is not None else None
+
+    @property
+    def sessions(self) -> int:
+        """Количество сессий браузера, запущенных с момента инициализации (включая текущую)."""
+        return self._generation
+
+    async def _launch(self, browser: Optional["Browser"] = None,
+                      storage_state: Optional[dict] = None) -> BrowserSession:
+        """
+        Запускает новую сессию браузера.
+
+        :param browser: Работающий браузер, в котором создаётся новый контекст. Если не задан,
+            запускается новый браузер.
+        :param storage_state: Состояние (cookies и localStorage), переносимое из предыдущей сессии.
+            Если не задано, загружается файл состояния из настроек.
+        :return: Сессия.
+        """
+        settings = self.browser_settings
+        har_path = self.har_path
+        if har_path and self._generation:
+            # Каждый контекст дописывает свой HAR-файл при закрытии
+            root, ext = os.path.splitext(har_path)
+            har_path = f'{root}-{self._generation}{ext}'
+        self._generation += 1
+        self._rss_checked = 0
+        context_options = {'record_har_path': har_path} if har_path else {}
+        # PID нужен только для проверки RSS; в общем браузере он уже известен
+        browser_pid = self.session.browser_pid if browser is not None and self.session is not None else None
+        before = await asyncio.to_thread(descendant_pids) if browser is None and settings.recycle_rss_mb else None
+
+        if settings.profile_dir:
+            # Постоянный профиль: cookies и дисковый кеш сохраняются между запусками
+            context = await self.driver.chromium.launch_persistent_context(
+                settings.profile_dir, headless=settings.headless, **context_options
+            )
+            if settings.recycle_rss_mb:
+                browser_pid = await self._browser_pid(context.browser, before)
+            return BrowserSession(context, har_path=har_path, browser_pid=browser_pid, _logger=self.logger)
+
+        if browser is None:
+            browser = await self.driver.chromium.launch(headless=settings.headless)
+            if settings.recycle_rss_mb:
+                browser_pid = await self._browser_pid(browser, before)
+        if storage_state is not None:
+            context_options['storage_state'] = storage_state
+        elif settings.storage_state and os.path.isfile(settings.storage_state):
+            context_options['storage_state'] = settings.storage_state
+        context = await browser.new_context(**context_options)
+        return BrowserSession(context, browser, har_path=har_path, browser_pid=browser_pid, _logger=self.logger)
+
+    async def _browser_pid(self, browser: Optional["Browser"], before: Optional[set[int]]) -> Optional[int]:
+        """
+        Определяет PID главного процесса только что запущенного браузера.
+
+        PID запрашивается у самого браузера через CDP (``SystemInfo.getProcessInfo``); если это
+        недоступно, он ищется среди новых процессов, запущенных драйвером Playwright.
+
+        :param browser: Запущенный браузер.
+        :param before: Снимок :func:`descendant_pids` до запуска браузера.
+        :return: PID или None, если его не удалось определить.
+        """
+        from playwright.async_api import Error as PlaywrightError
+
+        if browser is not None:
+            try:
+                cdp = await browser.new_browser_cdp_session()
+                try:
+                    info = await cdp.send('SystemInfo.getProcessInfo')
+                finally:
+                    await cdp.detach()
+                for process in info.get('processInfo', []):
+                    if process.get('type') == 'browser':
+                        return process['id']
+            except PlaywrightError as e:
+                self.logger.debug("PID браузера недоступен через CDP: %s", e)
+
+        browser_pid = await asyncio.to_thread(launched_browser_pid, before)
+        if browser_pid is None:
+            self.logger.warning("Не удалось определить процесс браузера: RSS браузера не проверяется.")
+        return browser_pid
 
     async def _initialize_driver(self) -> None:
         """
         Инициализирует WebDriver с заданными опциями.
         """
+        from playwright.async_api import async_playwright
+
         self.driver = await async_playwright().start()
-        self.browser = await self.driver.chromium.launch(headless=False)
-        self.context = await self.browser.new_context()
+        self.session = await self._launch()
 
         # Thread(target=lambda x: asyncio.run(ww(x)), args=(self.context,)).start()
 
         await self.context.new_page()
         # gw.getActiveWindow().minimize()
-        self.logger.debug("WebDriver инициализирован.")
+        self.logger.debug("WebDriver инициализирован (headless: %s, профиль: %s).",
+                          self.browser_settings.headless, self.profile)
+
+    async def _acquire_session(self) -> BrowserSession:
+        """
+        Возвращает сессию для новой страницы, заменяя упавшую или отслужившую сессию.
+
+        :return: Сессия, в которой учтена открываемая страница.
+        """
+        while True:
+            session = self.session
+            if not session.alive:
+                await self._rotate(session, 'crash')
+            elif session.expired is None and self.browser_settings.recycle_pages \
+                    and session.pages >= self.browser_settings.recycle_pages:
+                session.expired = 'pages'
+            elif session.expired is not None:
+                await self._rotate(session, session.expired)
+            else:
+                # Между проверкой и учётом страницы нет переключения задач
+                session.acquire()
+                return session
+
+    async def _release_session(self, session: BrowserSession) -> None:
+        """
+        Учитывает закрытие страницы и, если пора, проверяет RSS браузера.
+
+        :param session: Сессия, в которой была открыта страница.
+        """
+        session.release()
+        limit = self.browser_settings.recycle_rss_mb
+        if not limit or session is not self.session or session.expired is not None \
+                or session.pages - self._rss_checked < self.RSS_CHECK_PAGES:
+            return
+        self._rss_checked = session.pages
+        rss = await asyncio.to_thread(browser_rss_mb, session.browser_pid)
+        if rss is not None and rss > limit:
+            self.logger.info("RSS браузера %.0f МБ превышает предел %.0f МБ: браузер будет перезапущен.", rss, limit)
+            session.expired = 'rss'
+
+    async def _rotate(self, session: BrowserSession, reason: str) -> None:
+        """
+        Заменяет сессию новой, не обрывая открытые в ней страницы.
+
+        При ``reason='pages'`` в том же браузере создаётся новый контекст, иначе запускается
+        новый браузер. Состояние (cookies) переносится в новую сессию. Старая сессия закрывается
+        в фоне после завершения своих страниц. Постоянный профиль нельзя открыть дважды,
+        поэтому для него новые страницы ждут, пока старая сессия не завершит свои.
+
+        :param session: Заменяемая сессия.
+        :param reason: Причина: ``pages``, ``rss`` или ``crash``.
+        """
+        async with self._rotate_lock:
+            if self.session is not session:
+                # Сессию уже заменил другой запрос
+                return
+            session.retired = True
+            if reason == 'crash':
+                METRICS.inc('browser_crashes')
+            else:
+                METRICS.inc('browser_recycles', reason=reason)
+
+            with METRICS.stage('browser_recycle', reason=reason):
+                if self.browser_settings.profile_dir:
+                    if session.alive:
+                        await session.drained()
+                    await session.close()
+                    self.session = await self._launch()
+                    METRICS.inc('browser_relaunches')
+                else:
+                    storage_state = await session.context.storage_state() if session.alive else None
+                    browser = session.browser if reason == 'pages' and session.alive else None
+                    self.session = await self._launch(browser, storage_state)
+                    if browser is None:
+                        METRICS.inc('browser_relaunches')
+                    else:
+                        # Браузер переходит к новой сессии, старая закроет только свой контекст
+                        session.owns_browser = False
+                    task = asyncio.get_running_loop().create_task(self._retire(session))
+                    self._retiring.add(task)
+                    task.add_done_callback(self._retiring.discard)
+
+            self.logger.info("Сессия браузера заменена (причина: %s, страниц: %d).", reason, session.pages)
+
+    async def _retire(self, session: BrowserSession) -> None:
+        """Закрывает выведенную сессию после завершения открытых в ней страниц."""
+        if session.alive:
+            await session.drained()
+        await session.close()
+
+    @classmethod
+    def _init_lock(cls) -> asyncio.Lock:
+        """
+        Блокировка инициализации для текущего цикла событий.
+
+        asyncio.Lock привязывается к циклу, в котором используется, а цикл может смениться
+        (например, рабочий поток окна создаёт свой), поэтому блокировка создаётся для каждого цикла.
+        """
+        loop = asyncio.get_running_loop()
+        if cls._lock is None or cls._lock_loop is not loop:
+            cls._lock = asyncio.Lock()
+            cls._lock_loop = loop
+        return cls._lock
 
     @classmethod
-    async def init(cls, _logger: Optional[logging.Logger] = None) -> 'PageExtractor':
+    async def init(cls, _logger: Optional[logging.Logger] = None,
+                   governor_settings: Optional[GovernorSettings] = None,
+                   record_dir: Optional[str] = None,
+                   replay_dir: Optional[str] = None,
+                   record_har: bool = False,
+                   browser_settings: Optional[BrowserSettings] = None) -> 'PageExtractor':
         """
         Асинхронно инициализирует PageExtractor.
+
+        :param governor_settings: Настройки регулятора нагрузки на хост.
+        :param record_dir: Каталог для записи полученных страниц (режим записи).
+        :param replay_dir: Каталог с записанными страницами (режим воспроизведения, без браузера).
+        :param record_har: В режиме записи сохранять сетевые ответы сессии в HAR.
+        :param browser_settings: Настройки запуска браузера. По умолчанию - из переменных окружения.
         """
         if cls._instance is None:
-            async with cls._lock:
+            async with cls._init_lock():
                 if cls._instance is None:
-                    cls._instance = PageExtractor(_logger=_logger)
-                    await cls._instance._initialize_driver()
+                    instance = PageExtractor(
+                        _logger=_logger,
+                        governor_settings=governor_settings,
+                        record_dir=record_dir,
+                        replay_dir=replay_dir,
+                        record_har=record_har,
+                        browser_settings=browser_settings
+                    )
+                    if instance.replay is None:
+                        await instance._initialize_driver()
+                    # Экземпляр публикуется только с запущенным браузером: get, вызванный во время
+                    # фонового запуска, дождётся его на блокировке
+                    cls._instance = instance
                     cls._instance.logger.debug("PageExtractor инициализирован.")
         return cls._instance
 
     @classmethod
-    async def get(cls, url: str) -> PageResult:
+    def prewarm(cls, **kwargs) -> "asyncio.Task[PageExtractor]":
+        """
+        Запускает браузер в фоне, чтобы первый запрос не ждал его запуска.
+
+        Должен вызываться в работающем цикле событий. Вызов :meth:`get` до завершения
+        запуска дождётся его, а не запустит второй браузер.
+
+        :param kwargs: Параметры :meth:`init`.
+        :return: Задача инициализации.
+        """
+        async def _prewarm() -> PageExtractor:
+            started = time.monotonic()
+            instance = await cls.init(**kwargs)
+            METRICS.observe_stage('prewarm', time.monotonic() - started)
+            return instance
+
+        # Ссылка на задачу хранится, чтобы её не собрал сборщик мусора до завершения
+        cls._prewarm_task = asyncio.get_running_loop().create_task(_prewarm(), name='page-extractor-prewarm')
+        return cls._prewarm_task
+
+    @staticmethod
+    async def _snapshot(page: "Page", regions: Optional[List[str]] = None) -> str:
+        """
+        Получает содержимое страницы.
+
+        :param page: Страница.
+        :param regions: CSS-селекторы областей извлечения. Если заданы, возвращается только разметка
+            найденных элементов, а если ни один не найден - вся страница.
+        :return: Текст для поиска сигнатур.
+        """
+        if regions:
+            fragments = await page.evaluate(_REGIONS_SCRIPT, regions)
+            if fragments:
+                return '\n'.join(fragments)
+            METRICS.inc('regions_missed')
+        return await page.content()
+
+    @classmethod
+    async def _wait_ready(cls, page: "Page", ready: Callable[[str], bool], deadline: float,
+                          interval: float, regions: Optional[List[str]] = None) -> Optional[str]:
+        """
+        Опрашивает содержимое страницы, пока оно не станет готовым к извлечению.
+
+        :param page: Страница.
+        :param ready: Проверка готовности содержимого (выполняется вне цикла событий).
+        :param deadline: Максимальное время ожидания, с.
+        :param interval: Интервал опроса, с.
+        :param regions: CSS-селекторы областей извлечения.
+        :return: Готовое содержимое или None, если время ожидания истекло.
+        """
+        from playwright.async_api import Error as PlaywrightError
+
+        end = time.monotonic() + deadline
+        while time.monotonic() < end:
+            try:
+                content = await cls._snapshot(page, regions)
+            except PlaywrightError:
+                # Страница ещё переходит по ссылке
+                content = None
+            if content and await asyncio.to_thread(ready, content):
+                return content
+            await asyncio.sleep(interval)
+        return None
+
+    @classmethod
+    async def get(cls, url: str, ready: Optional[Callable[[str], bool]] = None, ready_deadline: float = 10.,
+                  ready_interval: float = .5, regions: Optional[List[str]] = None,
+                  capture: Optional[List[str]] = None, capture_only: bool = False,
+                  selectors: Optional[List[dict]] = None, source: Optional[str] = None) -> PageResult:
         """
         Асинхронно получает веб-страницу по указанному URL.
+
+        Если задана проверка готовности, страница возвращается, как только её содержимое
+        проходит проверку, не дожидаясь события load. По истечении ``ready_deadline``
+        выполняется обычное ожидание полной загрузки.
+
+        :param url: URL страницы.
+        :param ready: Проверка готовности содержимого к извлечению.
+        :param ready_deadline: Максимальное время ожидания готовности, с.
+        :param ready_interval: Интервал опроса содержимого, с.
+        :param regions: CSS-селекторы областей извлечения (теги script, noframes и т.п.). Если заданы,
+            из браузера передаётся только разметка этих элементов, а не вся страница.
+        :param capture: Регулярные выражения URL сетевых ответов, JSON-тела которых сохраняются
+            в ``PageResult.payloads``. Ответы ожидаются не дольше ``ready_deadline``.
+        :param capture_only: Не получать содержимое страницы, если все ответы перехвачены.
+        :param selectors: DOM-селекторы (см. ``DomSelector.to_request``). Их значения получаются одним
+            вызовом evaluate и сохраняются в ``PageResult.dom``.
+        :param source: Канонический URL товара - ключ страницы в архиве записи и воспроизведения.
         """
         if not cls._instance:
             await cls.init()
 
         instance: PageExtractor = cls._instance
-        page: Page = await instance.context.new_page()
 
-        instance.logger.debug(f"Запрашивается веб-страница: {url}")
+        if instance.replay is not None:
+            result = await asyncio.to_thread(instance.replay.load, url, source)
+            if result is None:
+                raise LookupError(f"Страница отсутствует в архиве: {url}")
+            METRICS.inc('pages_replayed')
+            instance.logger.debug(f"Страница воспроизведена из архива: {url}")
+            return result
 
-        # gw.getActiveWindow().minimize()
+        from playwright.async_api import Error as PlaywrightError
 
-        await page.goto(url)
-        await page.wait_for_load_state()
-        if 'вы не робот' in (await page.content()).lower():
-            while 'вы не робот' in (await page.title()).lower():
-                await asyncio.sleep(2)
-            await asyncio.sleep(2)
-            await page.reload()
-            await asyncio.sleep(2)
+        with TRACER.span('get', url=url, profile=instance.profile):
+            async with instance._governor(url).slot() as outcome:
+                for attempt in range(2):
+                    session = await instance._acquire_session()
+                    try:
+                        content, title, payloads, dom = await cls._load(
+                            session, url, outcome, ready, ready_deadline, ready_interval, regions, capture,
+                            capture_only, selectors
+                        )
+                        break
+                    except PlaywrightError:
+                        if session.alive or attempt:
+                            raise
+                        # Браузер упал во время запроса: запрос повторяется в перезапущенном браузере
+                        METRICS.inc('crash_retries')
+                        instance.logger.warning(f"Браузер упал при запросе, запрос будет повторён: {url}")
+                    finally:
+                        await instance._release_session(session)
 
-        instance.logger.info(f"Получена веб-страница: {url}")
+        result = PageResult(url=url, content=content, title=title, payloads=payloads, dom=dom)
+        if instance.record is not None:
+            # Страницы весят мегабайты: запись не должна останавливать цикл событий
+            har = os.path.basename(session.har_path) if session.har_path else None
+            await asyncio.to_thread(instance.record.save, result, har, source)
+        return result
 
-        title = await page.title()
-        content = await page.content()
-        await page.close()
+    @classmethod
+    async def _load(cls, session: BrowserSession, url: str, outcome: RequestOutcome,
+                    ready: Optional[Callable[[str], bool]], ready_deadline: float, ready_interval: float,
+                    regions: Optional[List[str]],
+                    capture: Optional[List[str]], capture_only: bool,
+                    selectors: Optional[List[dict]]) -> tuple[str, str, dict, dict]:
+        """
+        Загружает страницу в сессии браузера. Параметры - как у :meth:`get`.
+
+        :param session: Сессия браузера.
+        :param outcome: Результат запроса для регулятора нагрузки.
+        :return: Содержимое, заголовок, перехваченные ответы и значения DOM-селекторов.
+        """
+        instance: PageExtractor = cls._instance
+
+        page: "Page" = await session.context.new_page()
+        responses = ResponseCapture(capture).attach(page) if capture else None
+        try:
+            instance.logger.debug(f"Запрашивается веб-страница: {url}")
+
+            # gw.getActiveWindow().minimize()
+
+            started = time.monotonic()
+            content = None
+            if ready is None and responses is None:
+                with METRICS.stage('goto'):
+                    response = await page.goto(url)
+            else:
+                with METRICS.stage('goto'):
+                    response = await page.goto(url, wait_until='commit')
+
+            # Перегрузка или ошибка сервера: регулятор должен снизить нагрузку на хост
+            if response is not None and (response.status >= 500 or response.status == 429):
+                outcome.error = True
+                METRICS.inc('http_errors', host=instance._governor(url).host, status=str(response.status))
+                instance.logger.warning(f"Ответ {response.status} при запросе: {url}")
+
+            if responses is not None:
+                with METRICS.stage('capture_wait'):
+                    captured = await responses.wait(ready_deadline)
+                METRICS.inc('capture_complete' if captured else 'capture_incomplete')
+                if captured and capture_only:
+                    # Данные получены из ответов API, разметка страницы не нужна
+                    content = ''
+
+            if ready is not None and content is None:
+                with METRICS.stage('ready_wait'):
+                    content = await cls._wait_ready(page, ready, ready_deadline, ready_interval, regions)
+                METRICS.inc('ready_early' if content is not None else 'ready_fallback')
+
+            if content is None:
+                with METRICS.stage('load_state'):
+                    await page.wait_for_load_state()
+                with METRICS.stage('content'):
+                    content = await cls._snapshot(page, regions)
+            outcome.latency = time.monotonic() - started
+            METRICS.observe_stage('navigation', outcome.latency, profile=instance.profile)
 
-        return PageResult(url=url, content=content, title=title)
+            # Области извлечения могут не содержать текст капчи, поэтому проверяется и заголовок
+            if 'вы не робот' in content.lower() or 'вы не робот' in (await page.title()).lower():
+                outcome.captcha = True
+                METRICS.inc('captcha', host=instance._governor(url).host, profile=instance.profile)
+                instance.logger.warning(f"Капча при запросе: {url}")
+                with METRICS.stage('captcha_wait'):
+                    while 'вы не робот' in (await page.title()).lower():
+                        await asyncio.sleep(2)
+                    await asyncio.sleep(2)
+                    await page.reload()
+                    await asyncio.sleep(2)
+                if responses is not None:
+                    await responses.wait(ready_deadline)
+                if not (capture_only and responses is not None and responses.complete):
+                    with METRICS.stage('content'):
+                        content = await cls._snapshot(page, regions)
+
+            instance.logger.info(f"Получена веб-страница: {url}")
+
+            dom = {}
+            if selectors:
+                with METRICS.stage('dom_values'):
+                    dom = await page.evaluate(_SELECTORS_SCRIPT, selectors)
+
+            title = await page.title()
+            METRICS.inc('pages')
+            METRICS.inc('content_chars', len(content))
+        finally:
+            if responses is not None:
+                await responses.drain()
+            if session.alive:
+                await page.close()
+
+        return content, title, responses.payloads if responses is not None else {}, dom
+
+    @classmethod
+    def governor_stats(cls) -> list[dict]:
+        """
+        Возвращает текущие пределы нагрузки и долю капч по каждому хосту.
+
+        :return: Список словарей со статистикой регуляторов.
+        """
+        if not cls._instance:
+            return []
+        return [governor.stats() for governor in cls._instance.governors.values()]
 
     @classmethod
     async def close(cls) -> None:
@@ -101,9 +611,14 @@ class PageExtractor:
         Закрывает WebDriver.
         """
         instance: PageExtractor = cls._instance
-        await instance.context.close()
-        await instance.browser.close()
-        await instance.driver.stop()
+        if instance.driver is not None:
+            # Выведенные сессии дописывают HAR и закрываются после своих страниц
+            if instance._retiring:
+                await asyncio.gather(*instance._retiring, return_exceptions=True)
+            # Файл состояния используется только обычным контекстом, постоянный профиль хранит его сам
+            storage_state = instance.browser_settings.storage_state if instance.browser is not None else None
+            await instance.session.close(storage_state)
+            await instance.driver.stop()
         instance.logger.debug("WebDriver закрыт.")
         del instance
         cls._instance = None
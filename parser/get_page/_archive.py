@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import time
+from dataclasses import fields
+from typing import Iterator, Optional
+
+from datatype._classes import PageResult
+from datatype._identity import DEFAULT_IDENTITY_RULES, canonical_url
+
+
+class PageArchive:
+    """
+    Архив полученных страниц на диске.
+
+    Каждая страница хранится двумя файлами: ``<ключ>.json`` с метаданными (url, title, время
+    получения, имя HAR-файла сессии) и ``<ключ>.html`` с содержимым. Ключ - SHA-1 от канонического
+    URL товара (``ParserConfig.canonical_url``), поэтому URL, отличающиеся только параметрами
+    отслеживания или завершающей косой чертой, попадают в одну запись. Если канонический URL
+    не передан, он вычисляется по правилам источников по умолчанию.
+
+    :var path: Каталог архива.
+    """
+
+    path: str
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(url: str, source: Optional[str] = None) -> str:
+        """
+        Ключ страницы в архиве.
+
+        :param url: URL страницы.
+        :param source: Канонический URL товара. По умолчанию вычисляется из ``url``.
+        :return: SHA-1 от канонического URL.
+        """
+        if source is None:
+            source = canonical_url(url, DEFAULT_IDENTITY_RULES)
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def html_path(self, url: str, source: Optional[str] = None) -> str:
+        return os.path.join(self.path, f'{self.key(url, source)}.html')
+
+    def save(self, page: PageResult, har: Optional[str] = None, source: Optional[str] = None) -> None:
+        """
+        Сохраняет страницу в архив.
+
+        :param page: Полученная страница.
+        :param har: Имя HAR-файла сессии, в которую попали сетевые ответы страницы.
+        :param source: Канонический URL товара.
+        """
+        key = self.key(page.url, source)
+        meta = {k: v for k, v in page.to_dict().items() if k != 'content'}
+        meta.update(fetched_at=time.time(), har=har)
+
+        with open(os.path.join(self.path, f'{key}.html'), 'w', encoding='utf-8') as file:
+            file.write(page.content)
+        with open(os.path.join(self.path, f'{key}.json'), 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False, indent=2)
+
+    def load(self, url: str, source: Optional[str] = None) -> Optional[PageResult]:
+        """
+        Загружает страницу из архива.
+
+        :param url: URL страницы.
+        :param source: Канонический URL товара.
+        :return: Страница или None, если её нет в архиве.
+        """
+        meta_path = os.path.join(self.path, f'{self.key(url, source)}.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        with open(self.html_path(url, source), 'r', encoding='utf-8') as file:
+            content = file.read()
+
+        names = {f.name for f in fields(PageResult)}
+        return PageResult(**{k: v for k, v in meta.items() if k in names}, content=content)
+
+    def entries(self) -> Iterator[tuple[str, str]]:
+        """Перебирает архив без чтения файлов: пары (путь к метаданным, путь к файлу содержимого)."""
+        for file_name in sorted(os.listdir(self.path)):
+            if file_name.endswith('.json'):
+                html_name = file_name.removesuffix('.json') + '.html'
+                yield os.path.join(self.path, file_name), os.path.join(self.path, html_name)
+
+    def __iter__(self) -> Iterator[tuple[dict, str]]:
+        """Перебирает архив: пары (метаданные, путь к файлу содержимого)."""
+        for meta_path, html_path in self.entries():
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+            yield meta, html_path
+
+    def __len__(self) -> int:
+        return sum(file_name.endswith('.json') for file_name in os.listdir(self.path))
@@ -0,0 +1,50 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class BrowserSettings:
+    """
+    Настройки запуска браузера.
+
+    :var headless: Запускать браузер без окна (для серверов).
+    :var profile_dir: Каталог постоянного профиля Chromium (cookies, localStorage, дисковый кеш).
+        Если задан, используется ``launch_persistent_context``.
+    :var storage_state: Файл состояния (cookies и localStorage) для обычного контекста:
+        загружается при запуске, если существует, и сохраняется при закрытии.
+    :var recycle_pages: Пересоздавать контекст после указанного числа страниц (None - не пересоздавать).
+    :var recycle_rss_mb: Перезапускать браузер, если RSS его процессов превышает указанный предел, МБ.
+        Требует psutil.
+    """
+    headless: bool = False
+    profile_dir: Optional[str] = None
+    storage_state: Optional[str] = None
+    recycle_pages: Optional[int] = None
+    recycle_rss_mb: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "BrowserSettings":
+        """
+        Читает настройки из переменных окружения ``YMPARSER_HEADLESS``,
+        ``YMPARSER_PROFILE_DIR``, ``YMPARSER_STORAGE_STATE``, ``YMPARSER_RECYCLE_PAGES``
+        и ``YMPARSER_RECYCLE_RSS_MB``.
+        """
+        recycle_pages = os.environ.get('YMPARSER_RECYCLE_PAGES')
+        recycle_rss_mb = os.environ.get('YMPARSER_RECYCLE_RSS_MB')
+        return cls(
+            headless=os.environ.get('YMPARSER_HEADLESS', '').lower() in ('1', 'true', 'yes'),
+            profile_dir=os.environ.get('YMPARSER_PROFILE_DIR') or None,
+            storage_state=os.environ.get('YMPARSER_STORAGE_STATE') or None,
+            recycle_pages=int(recycle_pages) if recycle_pages else None,
+            recycle_rss_mb=float(recycle_rss_mb) if recycle_rss_mb else None,
+        )
+
+    @property
+    def warm(self) -> bool:
+        """Есть ли сохранённое состояние с прошлых запусков (профиль или файл состояния)."""
+        if self.profile_dir:
+            return os.path.isdir(self.profile_dir) and bool(os.listdir(self.profile_dir))
+        if self.storage_state:
+            return os.path.isfile(self.storage_state)
+        return False
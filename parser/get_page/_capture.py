@@ -0,0 +1,90 @@
+import asyncio
+import json
+import re
+from typing import Any, Optional, TYPE_CHECKING
+
+from metrics import METRICS
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Response
+
+
+class ResponseCapture:
+    """
+    Перехват JSON-ответов страницы во время навигации.
+
+    Тела ответов, URL которых подходит под один из шаблонов, разбираются как JSON
+    и сохраняются по URL ответа. Когда получен хотя бы один ответ на каждый шаблон,
+    выставляется событие завершения, и навигацию можно не дожидаться.
+
+    :var patterns: Скомпилированные шаблоны URL.
+    :var payloads: Полученные данные: URL ответа -> разобранное тело.
+    """
+
+    patterns: list[re.Pattern]
+    payloads: dict[str, Any]
+
+    def __init__(self, patterns: list[str]) -> None:
+        self.patterns = [re.compile(pattern) for pattern in patterns]
+        self.payloads = {}
+        self._matched: set[int] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._complete = asyncio.Event()
+
+    @property
+    def complete(self) -> bool:
+        """Получены ответы на все шаблоны."""
+        return self._complete.is_set()
+
+    def attach(self, page: "Page") -> "ResponseCapture":
+        """
+        Подписывается на ответы страницы. Вызывается до перехода по ссылке.
+
+        :param page: Страница.
+        :return: Ссылка на текущий экземпляр.
+        """
+        page.on('response', self._on_response)
+        return self
+
+    def _on_response(self, response: "Response") -> None:
+        for index, pattern in enumerate(self.patterns):
+            if pattern.search(response.url):
+                task = asyncio.ensure_future(self._read(response, index))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                return
+
+    async def _read(self, response: "Response", index: int) -> None:
+        from playwright.async_api import Error as PlaywrightError
+
+        if 'json' not in response.headers.get('content-type', ''):
+            return
+        try:
+            payload = await response.json()
+        except (PlaywrightError, json.JSONDecodeError):
+            # Тело недоступно (редирект, закрытая страница) или это не JSON
+            METRICS.inc('capture_errors')
+            return
+        self.payloads[response.url] = payload
+        self._matched.add(index)
+        METRICS.inc('captured_responses')
+        if len(self._matched) == len(self.patterns):
+            self._complete.set()
+
+    async def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Ожидает ответы на все шаблоны.
+
+        :param timeout: Максимальное время ожидания, с.
+        :return: True, если все ответы получены.
+        """
+        try:
+            await asyncio.wait_for(self._complete.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.complete
+
+    async def drain(self) -> None:
+        """Дожидается разбора уже полученных ответов (перед закрытием страницы)."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from metrics import METRICS
+
+
+@dataclass
+class GovernorSettings:
+    """
+    Настройки регулятора нагрузки на один хост.
+
+    :var initial_concurrency: Начальное число одновременных запросов.
+    :var min_concurrency: Минимальное число одновременных запросов.
+    :var max_concurrency: Максимальное число одновременных запросов.
+    :var initial_rate: Начальная частота запросов, запросов в секунду.
+    :var min_rate: Минимальная частота запросов.
+    :var max_rate: Максимальная частота запросов.
+    :var burst: Ёмкость корзины токенов.
+    :var rate_step: Прирост частоты после каждого успешного запроса.
+    :var decrease_factor: Множитель снижения при капче, ошибке или замедлении.
+    :var target_latency: Время загрузки, выше которого запрос считается замедлением, с.
+    :var ewma_alpha: Коэффициент сглаживания задержки и доли капч.
+    """
+    initial_concurrency: float = 2.
+    min_concurrency: float = 1.
+    max_concurrency: float = 8.
+    initial_rate: float = .5
+    min_rate: float = .05
+    max_rate: float = 4.
+    burst: float = 2.
+    rate_step: float = .05
+    decrease_factor: float = .5
+    target_latency: float = 8.
+    ewma_alpha: float = .1
+
+
+class RequestOutcome:
+    """
+    Итог запроса, заполняемый внутри :meth:`HostGovernor.slot`.
+
+    :var latency: Время загрузки страницы без ожидания капчи, с. По умолчанию - длительность слота.
+    :var captcha: Была ли показана капча.
+    :var error: Завершился ли запрос ошибкой.
+    """
+    latency: Optional[float] = None
+    captcha: bool = False
+    error: bool = False
+
+
+class HostGovernor:
+    """
+    Регулятор нагрузки на один хост: корзина токенов ограничивает частоту запросов,
+    а AIMD - число одновременных запросов.
+
+    После каждого чистого запроса с задержкой не выше целевой пределы растут аддитивно,
+    при капче, ошибке или замедлении - мультипликативно снижаются (не чаще одного раза
+    на поколение запросов, начатых до предыдущего снижения).
+    """
+
+    host: str
+    settings: GovernorSettings
+    limit: float
+    rate: float
+    in_flight: int
+
+    def __init__(self, host: str, settings: GovernorSettings, _logger: Optional[logging.Logger] = None) -> None:
+        self.host = host
+        self.settings = settings
+        self.logger = _logger or logging.getLogger(__name__)
+
+        self.limit = settings.initial_concurrency
+        self.rate = settings.initial_rate
+        self.in_flight = 0
+
+        self.requests = 0
+        self.challenges = 0
+        self.errors = 0
+        self.slowdowns = 0
+        self.challenge_rate = 0.
+        self.latency = 0.
+
+        self._tokens = settings.burst
+        self._refilled_at = time.monotonic()
+        self._last_decrease = 0.
+        self._cond = asyncio.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.settings.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    async def acquire(self) -> float:
+        """
+        Ожидает свободный слот и токен.
+
+        :return: Время ожидания, с.
+        """
+        started = time.monotonic()
+        async with self._cond:
+            while True:
+                self._refill()
+                has_slot = self.in_flight < max(int(self.limit), 1)
+                if has_slot and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.in_flight += 1
+                    return time.monotonic() - started
+
+                timeout = (1 - self._tokens) / self.rate if has_slot else None
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, started: float, outcome: RequestOutcome) -> None:
+        """
+        Освобождает слот и корректирует пределы по итогу запроса.
+
+        :param started: Момент получения слота (time.monotonic()).
+        :param outcome: Итог запроса.
+        """
+        settings = self.settings
+        latency = outcome.latency if outcome.latency is not None else time.monotonic() - started
+        slow = latency > settings.target_latency
+
+        async with self._cond:
+            self.in_flight -= 1
+            self.requests += 1
+            self.challenges += outcome.captcha
+            self.errors += outcome.error
+            if outcome.error:
+                METRICS.inc('fetch_errors', host=self.host)
+            self.slowdowns += slow
+            self.challenge_rate += settings.ewma_alpha * (outcome.captcha - self.challenge_rate)
+            self.latency += settings.ewma_alpha * (latency - self.latency)
+
+            if outcome.captcha or outcome.error or slow:
+                if started >= self._last_decrease:
+                    self._refill()
+                    self.limit = max(settings.min_concurrency, self.limit * settings.decrease_factor)
+                    self.rate = max(settings.min_rate, self.rate * settings.decrease_factor)
+                    self._last_decrease = time.monotonic()
+                    self.logger.info("Нагрузка на %s снижена: %.2f одновременно, %.2f запросов/с",
+                                     self.host, self.limit, self.rate)
+            else:
+                self._refill()
+                self.limit = min(settings.max_concurrency, self.limit + 1 / self.limit)
+                self.rate = min(settings.max_rate, self.rate + settings.rate_step)
+
+            self._cond.notify_all()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[RequestOutcome]:
+        """
+        Контекст одного запроса к хосту. Исключение внутри блока учитывается как ошибка.
+
+        :return: Итог запроса для заполнения.
+        """
+        METRICS.observe_stage('queue_wait', await self.acquire())
+        started = time.monotonic()
+        outcome = RequestOutcome()
+        try:
+            yield outcome
+        except Exception:
+            outcome.error = True
+            raise
+        finally:
+            await self.release(started, outcome)
+
+    def stats(self) -> dict:
+        """Текущие пределы и счётчики для мониторинга."""
+        return {
+            'host': self.host,
+            'limit': round(self.limit, 2),
+            'rate': round(self.rate, 3),
+            'in_flight': self.in_flight,
+            'requests': self.requests,
+            'challenges': self.challenges,
+            'errors': self.errors,
+            'slowdowns': self.slowdowns,
+            'challenge_rate': round(self.challenge_rate, 3),
+            'latency': round(self.latency, 3),
+        }
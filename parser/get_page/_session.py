@@ -0,0 +1,180 @@
+import asyncio
+import logging
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext
+
+
+class BrowserSession:
+    """
+    Одно поколение браузера: контекст (и браузер, если он запущен отдельно от контекста)
+    со счётчиками страниц.
+
+    При замене сессии новой старая помечается выведенной и закрывается, когда завершатся
+    все открытые в ней страницы, поэтому запросы в работе не обрываются.
+
+    :var browser: Браузер или None для постоянного профиля (браузером владеет контекст).
+    :var context: Контекст браузера.
+    :var owns_browser: Браузер закрывается вместе с сессией.
+    :var pages: Число страниц, открытых в сессии.
+    :var in_flight: Число страниц, открытых в данный момент.
+    :var retired: Сессия заменена и будет закрыта после завершения открытых страниц.
+    :var crashed: Браузер упал или отключился.
+    :var expired: Причина плановой замены сессии (``pages``, ``rss``) или None.
+    :var har_path: HAR-файл, в который контекст записывает сетевые ответы.
+    :var browser_pid: PID главного процесса браузера сессии или None, если он неизвестен.
+    """
+
+    browser: Optional["Browser"]
+    context: "BrowserContext"
+    owns_browser: bool
+    pages: int
+    in_flight: int
+    retired: bool
+    crashed: bool
+    expired: Optional[str]
+    har_path: Optional[str]
+    browser_pid: Optional[int]
+
+    def __init__(self, context: "BrowserContext", browser: Optional["Browser"] = None,
+                 har_path: Optional[str] = None, browser_pid: Optional[int] = None,
+                 _logger: Optional[logging.Logger] = None) -> None:
+        self.browser = browser
+        self.context = context
+        self.owns_browser = browser is not None
+        self.pages = self.in_flight = 0
+        self.retired = self.crashed = False
+        self.expired = None
+        self.har_path = har_path
+        self.browser_pid = browser_pid
+        self.logger = _logger or logging.getLogger(__name__)
+        self._closing = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+        # Постоянный контекст сам владеет процессом браузера и закрывается при его падении
+        if browser is not None:
+            browser.on('disconnected', self._on_lost)
+        else:
+            context.on('close', self._on_lost)
+
+    def _on_lost(self, *_) -> None:
+        if not self._closing and not self.crashed:
+            self.crashed = True
+            self.logger.warning("Браузер отключился: сессия будет перезапущена.")
+
+    @property
+    def alive(self) -> bool:
+        """Браузер сессии работает."""
+        if self.crashed:
+            return False
+        return self.browser is None or self.browser.is_connected()
+
+    def acquire(self) -> None:
+        """Учитывает открытие страницы."""
+        self.pages += 1
+        self.in_flight += 1
+        self._idle.clear()
+
+    def release(self) -> None:
+        """Учитывает закрытие страницы."""
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def drained(self) -> None:
+        """Дожидается закрытия всех открытых в сессии страниц."""
+        await self._idle.wait()
+
+    async def close(self, storage_state: Optional[str] = None) -> None:
+        """
+        Закрывает контекст и, если сессия им владеет, браузер.
+
+        :param storage_state: Файл, в который сохраняется состояние контекста перед закрытием.
+        """
+        from playwright.async_api import Error as PlaywrightError
+
+        self._closing = True
+        try:
+            if storage_state and self.alive:
+                await self.context.storage_state(path=storage_state)
+                self.logger.debug("Состояние браузера сохранено: %s", storage_state)
+            # HAR-файл дописывается при закрытии контекста
+            await self.context.close()
+            if self.owns_browser:
+                await self.browser.close()
+        except PlaywrightError as e:
+            # Упавший браузер закрыть уже нельзя, достаточно освободить ссылки
+            self.logger.debug("Ошибка при закрытии сессии браузера: %s", e)
+
+
+def descendant_pids() -> Optional[set[int]]:
+    """
+    PID всех потомков текущего процесса.
+
+    :return: Множество PID или None, если psutil не установлен.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return {child.pid for child in psutil.Process().children(recursive=True)}
+
+
+def launched_browser_pid(before: Optional[set[int]]) -> Optional[int]:
+    """
+    Находит главный процесс браузера, запущенного после снимка потомков.
+
+    Процесс браузера запускает драйвер Playwright - прямой потомок текущего процесса, а рендереры
+    и служебные процессы запускает уже сам браузер. Поэтому браузером считается новый процесс,
+    родитель которого - прямой потомок текущего процесса. Новые процессы уже работающих
+    браузеров (их родитель - браузер) при этом не учитываются.
+
+    :param before: Снимок :func:`descendant_pids` до запуска браузера.
+    :return: PID или None, если psutil не установлен или новый браузер не найден однозначно.
+    """
+    if before is None:
+        return None
+    import psutil
+
+    current = psutil.Process()
+    drivers = {child.pid for child in current.children()}
+    launched = []
+    for child in current.children(recursive=True):
+        if child.pid in before or child.pid in drivers:
+            continue
+        try:
+            if child.ppid() in drivers:
+                launched.append(child.pid)
+        except psutil.Error:
+            pass
+    return launched[0] if len(launched) == 1 else None
+
+
+def browser_rss_mb(pid: Optional[int]) -> Optional[float]:
+    """
+    Суммарный RSS процесса браузера и всех его потомков (рендереры, GPU, утилиты), МБ.
+
+    :param pid: PID главного процесса браузера (:attr:`BrowserSession.browser_pid`).
+    :return: RSS или None, если psutil не установлен, PID неизвестен или процесс завершился.
+    """
+    if pid is None:
+        return None
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    try:
+        root = psutil.Process(pid)
+        processes = [root, *root.children(recursive=True)]
+    except psutil.Error:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 2 ** 20
@@ -0,0 +1,214 @@
+import asyncio
+import heapq
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from parser import WebPageParser
+from storage import ResultStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _Entry:
+    due: float
+    url: str = field(compare=False)
+
+
+class RescrapeScheduler:
+    """
+    Планировщик повторного парсинга известных товаров.
+
+    Товары берутся из хранилища результатов и упорядочиваются по времени следующей проверки.
+    Интервал проверки зависит от изменчивости свойства (по умолчанию цены): стабильные товары
+    проверяются раз в ``max_interval``, меняющиеся при каждой проверке - раз в ``min_interval``.
+    Готовые к проверке URL передаются ограниченному пулу обработчиков не чаще ``pages_per_minute``.
+
+    :var pages_per_minute: Бюджет запросов в минуту.
+    :var workers: Количество одновременных обработчиков.
+    :var min_interval: Минимальный интервал проверки, с.
+    :var max_interval: Максимальный интервал проверки, с.
+    :var volatility_property: Имя свойства, по которому оценивается изменчивость.
+    :var volatility_window: Количество последних наблюдений для оценки изменчивости.
+    """
+
+    pages_per_minute: float
+    workers: int
+    min_interval: float
+    max_interval: float
+    volatility_property: str
+    volatility_window: int
+
+    def __init__(
+            self,
+            parser: WebPageParser,
+            store: Optional[ResultStore] = None,
+            pages_per_minute: float = 6.,
+            workers: int = 2,
+            min_interval: float = 60 * 60,
+            max_interval: float = 7 * 24 * 60 * 60,
+            volatility_property: str = 'Цена',
+            volatility_window: int = 10,
+            _logger: Optional[logging.Logger] = logger
+    ) -> None:
+        """
+        Инициализирует планировщик.
+
+        :param parser: Парсер страниц.
+        :param store: Хранилище результатов. По умолчанию - хранилище парсера.
+        :param pages_per_minute: Бюджет запросов в минуту.
+        :param workers: Количество одновременных обработчиков.
+        :param min_interval: Минимальный интервал проверки, с.
+        :param max_interval: Максимальный интервал проверки, с.
+        :param volatility_property: Имя свойства, по которому оценивается изменчивость.
+        :param volatility_window: Количество последних наблюдений для оценки изменчивости.
+        :param _logger: Объект логгера.
+        """
+        self.logger = _logger
+        self._parser = parser
+        self._store = store or parser.store
+        if self._store is None:
+            raise ValueError("Планировщику требуется хранилище результатов")
+
+        self.pages_per_minute = pages_per_minute
+        self.workers = workers
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.volatility_property = volatility_property
+        self.volatility_window = volatility_window
+
+        self._heap: list[_Entry] = []
+        self._scheduled: dict[str, float] = {}
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def interval(self, volatility: float) -> float:
+        """
+        Вычисляет интервал проверки по изменчивости (геометрическая интерполяция между границами).
+
+        :param volatility: Изменчивость от 0 до 1.
+        :return: Интервал, с.
+        """
+        volatility = min(max(volatility, 0.), 1.)
+        return self.max_interval ** (1 - volatility) * self.min_interval ** volatility
+
+    def schedule(self, url: str, due: Optional[float] = None) -> "RescrapeScheduler":
+        """
+        Планирует проверку товара. Повторный вызов переносит проверку.
+
+        URL приводится к каноническому виду, поэтому разные ссылки на один товар
+        планируются как одна проверка.
+
+        :param url: URL товара.
+        :param due: Время проверки (unix time). По умолчанию - немедленно.
+        :return: Ссылка на текущий экземпляр.
+        """
+        url = self._parser.canonical_url(url)
+        due = time.time() if due is None else due
+        self._scheduled[url] = due
+        heapq.heappush(self._heap, _Entry(due, url))
+        self._wakeup.set()
+        return self
+
+    def reload(self) -> "RescrapeScheduler":
+        """
+        Заполняет очередь товарами из хранилища.
+
+        :return: Ссылка на текущий экземпляр.
+        """
+        for url, last_seen in self._store.products():
+            volatility = self._store.volatility(url, self.volatility_property, self.volatility_window)
+            self.schedule(url, last_seen + self.interval(volatility))
+        self.logger.info("В очереди планировщика товаров: %s", len(self._scheduled))
+        return self
+
+    def _pop_due(self) -> tuple[Optional[str], float]:
+        """Извлекает ближайший товар, если он готов к проверке, иначе возвращает время ожидания."""
+        while self._heap:
+            entry = self._heap[0]
+            if self._scheduled.get(entry.url) != entry.due:
+                # Устаревшая запись после переноса проверки
+                heapq.heappop(self._heap)
+                continue
+            delay = entry.due - time.time()
+            if delay > 0:
+                return None, delay
+            heapq.heappop(self._heap)
+            del self._scheduled[entry.url]
+            return entry.url, 0.
+        return None, float('inf')
+
+    async def _dispatch(self, queue: asyncio.Queue) -> None:
+        spacing = 60. / self.pages_per_minute
+        next_slot = time.monotonic()
+        while True:
+            url, delay = self._pop_due()
+            if url is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(delay, 60.))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await asyncio.sleep(max(next_slot - time.monotonic(), 0.))
+            next_slot = max(next_slot, time.monotonic()) + spacing
+            await queue.put(url)
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            url = await queue.get()
+            try:
+                result = await self._parser.parse(url)
+                if not result.source:
+                    self.logger.warning("Повторная проверка %s не удалась, следующая через %s с", url,
+                                        self.min_interval)
+                    self.schedule(url, time.time() + self.min_interval)
+                    continue
+                if self._parser.store is not self._store:
+                    self._store.add(result)
+                volatility = self._store.volatility(url, self.volatility_property, self.volatility_window)
+                interval = self.interval(volatility)
+                self.logger.debug("Товар %s проверен, изменчивость %.2f, следующая проверка через %.0f с",
+                                  url, volatility, interval)
+                self.schedule(url, time.time() + interval)
+            except Exception as e:
+                # Ошибка одного товара не должна останавливать обработчик
+                self.logger.error("Ошибка повторной проверки %s: %s, следующая через %s с", url, e,
+                                  self.min_interval, exc_info=True)
+                self.schedule(url, time.time() + self.min_interval)
+            finally:
+                queue.task_done()
+
+    async def start(self) -> None:
+        """Запускает планировщик и обработчики в фоне."""
+        await self.stop()
+        queue = asyncio.Queue(maxsize=self.workers)
+        self._tasks = [asyncio.create_task(self._dispatch(queue), name="scheduler")]
+        self._tasks.extend(
+            asyncio.create_task(self._work(queue), name=f"scheduler-worker-{i}") for i in range(self.workers)
+        )
+        self.logger.info("Планировщик запущен: %s обработчиков, %s страниц в минуту",
+                         self.workers, self.pages_per_minute)
+
+    async def stop(self) -> None:
+        """Останавливает планировщик."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+if __name__ == "__main__":
+    from datatype import ParserConfig
+
+    async def main():
+        config = ParserConfig.load('cfg.zip')
+        with ResultStore('results.sqlite3') as store:
+            scheduler = RescrapeScheduler(WebPageParser(config=config, store=store)).reload()
+            await scheduler.start()
+            await asyncio.Event().wait()
+
+    asyncio.run(main())
@@ -0,0 +1 @@
+from ._result_store import ResultStore
@@ -0,0 +1,279 @@
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from datatype import ParseResult
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    group_name TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS properties (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS history (
+    product_id INTEGER NOT NULL REFERENCES products (id),
+    property_id INTEGER NOT NULL REFERENCES properties (id),
+    checked_at REAL NOT NULL,
+    value,
+    PRIMARY KEY (product_id, property_id, checked_at)
+) WITHOUT ROWID;
+"""
+
+
+class ResultStore:
+    """
+    Локальное хранилище результатов парсинга в SQLite.
+
+    Товары хранятся по URL источника (``ParseResult.source``), значения свойств - в таблице истории,
+    кластеризованной по (товар, свойство, время). Запись идёт пакетами в одной транзакции,
+    база работает в режиме WAL, поэтому чтение не блокирует запись.
+
+    Ошибка записи не выходит за пределы хранилища: пакет остаётся в очереди и записывается
+    при следующих сбросах, а после ``max_retries`` неудачных попыток записывается по одному
+    результату - те, что записать так и не удалось, откладываются в ``rejected``.
+
+    :var db_path: Путь к файлу базы данных.
+    :var batch_size: Количество результатов, после которого пакет записывается автоматически.
+    :var max_retries: Количество попыток записать пакет целиком.
+    :var rejected: Последние результаты, которые не удалось записать.
+    """
+
+    db_path: str
+    batch_size: int
+    max_retries: int
+    rejected: deque
+
+    _logger: logging.Logger = logging.getLogger(__name__)
+
+    def __init__(self, db_path: str = 'results.sqlite3', batch_size: int = 200, max_retries: int = 3,
+                 max_rejected: int = 1000, logger: Optional[logging.Logger] = None) -> None:
+        """
+        Открывает (или создаёт) хранилище.
+
+        :param db_path: Путь к файлу базы данных.
+        :param batch_size: Размер пакета записи.
+        :param max_retries: Количество попыток записать пакет целиком.
+        :param max_rejected: Количество хранимых незаписанных результатов.
+        :param logger: Объект логгера.
+        """
+        if logger is not None:
+            self._logger = logger
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.rejected = deque(maxlen=max_rejected)
+        self._failures = 0
+
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, str, float, list[tuple[str, Any]]]] = []
+        self._property_ids: dict[str, int] = {}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        self._property_ids = dict(self._conn.execute('SELECT name, id FROM properties').fetchall())
+        self._logger.debug("Хранилище результатов открыто: %s", db_path)
+
+    def add(self, result: ParseResult, checked_at: Optional[float] = None) -> "ResultStore":
+        """
+        Добавляет результат парсинга в очередь записи.
+
+        Пустые результаты и свойства без значения пропускаются.
+
+        :param result: Результат парсинга.
+        :param checked_at: Время проверки (unix time). По умолчанию - текущее.
+        :return: Ссылка на текущий экземпляр.
+        """
+        if not result.source:
+            return self
+
+        values = [(prop.name, prop.value) for prop in result.properties if prop.value is not None]
+        with self._lock:
+            self._pending.append((result.source, result.name, time.time() if checked_at is None else checked_at,
+                                  values))
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+        return self
+
+    def flush(self) -> "ResultStore":
+        """
+        Записывает накопленные результаты одной транзакцией.
+
+        :return: Ссылка на текущий экземпляр.
+        """
+        with self._lock:
+            self._flush_locked()
+        return self
+
+    def _flush_locked(self, final: bool = False) -> None:
+        """
+        Записывает очередь. Исключения не выбрасывает.
+
+        :param final: Не откладывать повторную попытку (при закрытии хранилища).
+        """
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        try:
+            self._write(pending)
+        except Exception as e:
+            self._failures += 1
+            if self._failures < self.max_retries and not final:
+                self._pending = pending + self._pending
+                self._logger.error("Не удалось записать пакет результатов (%s): %s. Попытка %s из %s.",
+                                   len(pending), e, self._failures, self.max_retries)
+                return
+            self._logger.error("Не удалось записать пакет результатов (%s): %s. Запись по одному.", len(pending), e)
+            self._failures = 0
+            self._write_each(pending)
+            return
+        self._failures = 0
+        self._logger.debug("Записано результатов: %s", len(pending))
+
+    def _write(self, pending: list[tuple[str, str, float, list[tuple[str, Any]]]]) -> None:
+        """Записывает результаты одной транзакцией."""
+        try:
+            with self._conn:
+                for url, group_name, checked_at, values in pending:
+                    product_id = self._conn.execute(
+                        'INSERT INTO products (url, group_name, first_seen, last_seen) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (url) DO UPDATE SET group_name = excluded.group_name, '
+                        'last_seen = MAX(last_seen, excluded.last_seen) RETURNING id',
+                        (url, group_name, checked_at, checked_at)
+                    ).fetchone()[0]
+                    self._conn.executemany(
+                        'INSERT OR REPLACE INTO history (product_id, property_id, checked_at, value) '
+                        'VALUES (?, ?, ?, ?)',
+                        [(product_id, self._property_id(name), checked_at, value) for name, value in values]
+                    )
+        except Exception:
+            # Транзакция откатилась: идентификаторы свойств, созданные в ней, больше не существуют
+            self._property_ids.clear()
+            raise
+
+    def _write_each(self, pending: list[tuple[str, str, float, list[tuple[str, Any]]]]) -> None:
+        """Записывает результаты по одному, откладывая в ``rejected`` те, что записать не удалось."""
+        for item in pending:
+            try:
+                self._write([item])
+            except Exception as e:
+                self.rejected.append(item)
+                self._logger.error("Результат %s не записан в хранилище: %s", item[0], e)
+
+    def _property_id(self, name: str) -> int:
+        property_id = self._property_ids.get(name)
+        if property_id is None:
+            property_id = self._conn.execute(
+                'INSERT INTO properties (name) VALUES (?) ON CONFLICT (name) DO UPDATE SET name = name RETURNING id',
+                (name,)
+            ).fetchone()[0]
+            self._property_ids[name] = property_id
+        return property_id
+
+    def product(self, url: str) -> Optional[dict]:
+        """
+        Возвращает сведения о товаре.
+
+        :param url: URL товара.
+        :return: Словарь с полями url, group_name, first_seen, last_seen или None.
+        """
+        self.flush()
+        row = self._conn.execute(
+            'SELECT url, group_name, first_seen, last_seen FROM products WHERE url = ?', (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('url', 'group_name', 'first_seen', 'last_seen'), row))
+
+    def products(self) -> list[tuple[str, float]]:
+        """
+        Возвращает все известные товары.
+
+        :return: Список пар (URL, время последней проверки).
+        """
+        self.flush()
+        return self._conn.execute('SELECT url, last_seen FROM products').fetchall()
+
+    def volatility(self, url: str, property_name: str, window: int = 10) -> float:
+        """
+        Оценивает изменчивость свойства товара как долю изменений между соседними наблюдениями.
+
+        :param url: URL товара.
+        :param property_name: Имя свойства.
+        :param window: Количество последних наблюдений.
+        :return: Число от 0 (не меняется) до 1 (меняется при каждой проверке).
+        """
+        self.flush()
+        values = [value for value, in self._conn.execute(
+            'SELECT h.value FROM history h '
+            'JOIN products pr ON pr.id = h.product_id '
+            'JOIN properties p ON p.id = h.property_id '
+            'WHERE pr.url = ? AND p.name = ? ORDER BY h.checked_at DESC LIMIT ?',
+            (url, property_name, window)
+        )]
+        if len(values) < 2:
+            return 0.
+        return sum(a != b for a, b in zip(values, values[1:])) / (len(values) - 1)
+
+    def latest(self, url: str) -> dict[str, Any]:
+        """
+        Возвращает последние известные значения свойств товара.
+
+        :param url: URL товара.
+        :return: Словарь "имя свойства -> значение".
+        """
+        self.flush()
+        rows = self._conn.execute(
+            'SELECT p.name, h.value, MAX(h.checked_at) FROM history h '
+            'JOIN products pr ON pr.id = h.product_id '
+            'JOIN properties p ON p.id = h.property_id '
+            'WHERE pr.url = ? GROUP BY h.property_id',
+            (url,)
+        ).fetchall()
+        return {name: value for name, value, _ in rows}
+
+    def history(self, url: str, property_name: str, since: Optional[float] = None,
+                until: Optional[float] = None) -> list[tuple[float, Any]]:
+        """
+        Возвращает историю значений свойства товара в порядке времени.
+
+        :param url: URL товара.
+        :param property_name: Имя свойства.
+        :param since: Начало интервала (unix time), включительно.
+        :param until: Конец интервала (unix time), включительно.
+        :return: Список пар (время проверки, значение).
+        """
+        self.flush()
+        return self._conn.execute(
+            'SELECT h.checked_at, h.value FROM history h '
+            'JOIN products pr ON pr.id = h.product_id '
+            'JOIN properties p ON p.id = h.property_id '
+            'WHERE pr.url = ? AND p.name = ? AND h.checked_at BETWEEN ? AND ? '
+            'ORDER BY h.checked_at',
+            (url, property_name, since if since is not None else float('-inf'),
+             until if until is not None else float('inf'))
+        ).fetchall()
+
+    def close(self) -> None:
+        """Записывает очередь и закрывает базу."""
+        with self._lock:
+            self._flush_locked(final=True)
+        self._conn.close()
+        self._logger.debug("Хранилище результатов закрыто: %s", self.db_path)
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
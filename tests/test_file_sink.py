@@ -0,0 +1,50 @@
+import asyncio
+import os
+
+import pytest
+
+from excel import FileTableSink
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def sink(tmp_path):
+    return FileTableSink(str(tmp_path / 'table.csv'), headers=['k', 'a', 'b'])
+
+
+def test_upsert_merges_duplicates_and_appends_keyless(sink):
+    _run(sink.add_rows([{'k': 1, 'a': 'x'}, {'k': 1, 'a': 'y'}, {'k': 2, 'a': 'z'}]))
+    _run(sink.upsert([
+        {'k': 1, 'b': 'B'}, {'k': 1, 'a': 'A'},
+        {'k': None, 'a': 'n1'}, {'k': None, 'a': 'n2'},
+        {'k': 3, 'a': 'c'}, {'k': 3, 'b': 'd'},
+    ], 'k'))
+    assert _run(sink.read_rows()) == [
+        {'k': 1, 'a': 'A', 'b': 'B'},
+        {'k': 1, 'a': 'A', 'b': 'B'},
+        {'k': 2, 'a': 'z', 'b': None},
+        {'k': None, 'a': 'n1', 'b': None},
+        {'k': None, 'a': 'n2', 'b': None},
+        {'k': 3, 'a': 'c', 'b': 'd'},
+    ]
+
+
+def test_list_row_requires_matching_headers(tmp_path):
+    with pytest.raises(ValueError):
+        _run(FileTableSink(str(tmp_path / 'table.csv')).add_row([1, 2]))
+    sink = FileTableSink(str(tmp_path / 'other.csv'), headers=['k', 'a'])
+    with pytest.raises(ValueError):
+        _run(sink.add_row([1, 2, 3]))
+
+
+def test_save_removes_journal_and_reimports(sink):
+    _run(sink.add_rows([['1', 'x', 'y']]))
+    _run(sink.save())
+    assert not os.path.exists(sink._journal_path)
+
+    reopened = FileTableSink(sink.file_path)
+    _run(reopened.add_row({'k': '2', 'a': 'z'}))
+    assert [row['k'] for row in _run(reopened.read_rows())] == ['1', '2']
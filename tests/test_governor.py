@@ -0,0 +1,66 @@
+import asyncio
+from typing import Optional
+
+from parser.get_page._governor import GovernorSettings, HostGovernor
+
+
+def _governor(**kwargs) -> HostGovernor:
+    settings = GovernorSettings(initial_concurrency=4., initial_rate=2., burst=100., **kwargs)
+    return HostGovernor('example.com', settings)
+
+
+async def _request(governor: HostGovernor, captcha: bool = False, error: bool = False,
+                   started: Optional[asyncio.Event] = None) -> None:
+    async with governor.slot() as outcome:
+        if started is not None:
+            await started.wait()
+        outcome.latency = .1
+        outcome.captcha = captcha
+        outcome.error = error
+
+
+def test_success_increases_additively():
+    governor = _governor()
+    asyncio.run(_request(governor))
+    assert governor.limit == 4.25
+    assert governor.rate == 2.05
+
+
+def test_captcha_decreases_multiplicatively():
+    governor = _governor()
+    asyncio.run(_request(governor, captcha=True))
+    assert governor.limit == 2.
+    assert governor.rate == 1.
+    assert governor.challenges == 1
+
+
+def test_decrease_once_per_generation():
+    governor = _governor()
+
+    async def main():
+        # Запросы, начатые до снижения, не снижают пределы повторно
+        started = asyncio.Event()
+        requests = asyncio.gather(*[_request(governor, error=True, started=started) for _ in range(3)])
+        await asyncio.sleep(0)
+        assert governor.in_flight == 3
+        started.set()
+        await requests
+
+    asyncio.run(main())
+    assert governor.limit == 2.
+    assert governor.errors == 3
+
+
+def test_exception_counts_as_error():
+    governor = _governor()
+
+    async def main():
+        try:
+            async with governor.slot():
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+    asyncio.run(main())
+    assert governor.errors == 1
+    assert governor.in_flight == 0
@@ -0,0 +1,40 @@
+import pytest
+
+from datatype import ParseResult, PropertyResult
+from datatype._utils import INTEGER
+from storage import ResultStore
+
+
+def _result(source: str, value) -> ParseResult:
+    return ParseResult(name='Процессоры', source=source,
+                       properties=[PropertyResult(name='Частота', value=value, type=INTEGER)])
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultStore(str(tmp_path / 'results.sqlite3'), batch_size=1) as store:
+        yield store
+
+
+def test_flush_writes_batch(tmp_path):
+    with ResultStore(str(tmp_path / 'results.sqlite3'), batch_size=10) as store:
+        store.add(_result('/a', 4700), checked_at=1.).add(_result('/a', 4800), checked_at=2.)
+        assert store._pending
+        assert store.history('/a', 'Частота') == [(1., 4700), (2., 4800)]
+        assert not store._pending
+
+
+def test_bad_row_does_not_block_later_rows(store):
+    store.add(_result('/bad', [1, 2]))
+    for i in range(store.max_retries + 2):
+        store.add(_result(f'/ok{i}', i))
+    assert [item[0] for item in store.rejected] == ['/bad']
+    assert not store._pending
+    assert store.latest(f'/ok{store.max_retries + 1}') == {'Частота': store.max_retries + 1}
+
+
+def test_close_rejects_unwritable_rows(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite3'), batch_size=10)
+    store.add(_result('/bad', {})).add(_result('/ok', 1))
+    store.close()
+    assert [item[0] for item in store.rejected] == ['/bad']
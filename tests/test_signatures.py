@@ -0,0 +1,79 @@
+import os
+import random
+import re
+
+import pytest
+
+from datatype import ParserConfig, Property
+from datatype._classes import PageResult
+from datatype._utils import STRING
+from parser._utils import extract
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'UI', 'cfg.zip')
+
+# Ответ API в том же виде, что и JSON-состояние в разметке страниц корпуса
+PAYLOAD = {'specs': [
+    {'value': '5 нм', 'name': 'Техпроцесс'},
+    {'value': '4700 МГц', 'name': 'Частота'},
+    {'name': 'Количество потоков', 'value': '24'},
+]}
+
+
+@pytest.fixture
+def config() -> ParserConfig:
+    return ParserConfig.load(CONFIG_PATH)
+
+
+@pytest.mark.parametrize('name', ['Количество потоков', 'Техпроцесс', 'Частота'])
+def test_signature_matches_payload(config, name):
+    page = PageResult(url='/product/1', title='', content='', payloads={'/api/product/1': PAYLOAD})
+    prop = next(prop for prop in config.all_properties if prop.name == name)
+    prop.source = 'api'
+    assert prop.match(page.payload_text) is not None
+
+
+def test_extract_reads_payloads(config):
+    for prop in config.all_properties:
+        if prop.name in ('Количество потоков', 'Техпроцесс', 'Частота'):
+            prop.source = 'api'
+    page = PageResult(url='/product/1', title='', content='', payloads={'/api/product/1': PAYLOAD})
+    result = max(extract(config, page, '/product/1'), key=lambda x: x.rate)
+    values = {prop.name: prop.value for prop in result.properties}
+    assert values['Количество потоков'] == 24
+    assert values['Частота'] == 4700
+
+
+def _property() -> Property:
+    # Общая сигнатура стоит раньше частных и совпадает вместе с ними
+    return Property(name='Значение', type=STRING, signatures=[
+        re.compile(r'common=(\w+)'),
+        re.compile(r'a=(\w+)'),
+        re.compile(r'b=(\w+)'),
+        re.compile(r'c=(\w+)'),
+    ])
+
+
+def test_adaptive_order_preserves_results():
+    rng = random.Random(1)
+    texts = []
+    for i in range(3000):
+        parts = [f'{key}={key}{i}' for key in ('a', 'b', 'c') if rng.random() < .5]
+        if rng.random() < .1:
+            parts.append(f'common=x{i}')
+        rng.shuffle(parts)
+        texts.append(' '.join(parts))
+
+    reference = _property()
+    adaptive = _property().enable_profiling(adaptive=True)
+    for text in texts:
+        assert adaptive.match(text) == reference.match(text)
+    # Порядок действительно менялся, а общая сигнатура осталась раньше совпадавших с ней
+    assert adaptive._order is not None
+    assert {(0, 1), (0, 2), (0, 3)} <= adaptive._conflicts
+
+
+def test_probe_runs_on_interval():
+    prop = _property().enable_profiling(adaptive=True)
+    for _ in range(prop.probe_interval * 3):
+        prop.match('a=1')
+    assert prop._probes == 3